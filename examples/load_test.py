@@ -0,0 +1,81 @@
+"""
+Measure the throughput of a running `rissa_plotter.server.DataServer`.
+
+Every worker keeps one connection open and requests the paths in turn. With
+--conditional, the ETag of the first response is sent back as If-None-Match, which
+measures the 304 path.
+
+    python examples/load_test.py http://127.0.0.1:8000 --path /city/total_adults?year=2025
+"""
+
+import argparse
+import http.client
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+def worker(url, paths, n_requests, conditional):
+    target = urlsplit(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port, timeout=60)
+    etags = {}
+    latencies, statuses = [], Counter()
+
+    for i in range(n_requests):
+        path = paths[i % len(paths)]
+        headers = {"If-None-Match": etags[path]} if path in etags else {}
+
+        start = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+
+        statuses[response.status] += 1
+        if conditional:
+            etags[path] = response.getheader("ETag")
+
+    connection.close()
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("url", help="Base URL of the server")
+    parser.add_argument(
+        "--path", action="append", help="Path to request, can be repeated"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--conditional", action="store_true")
+    args = parser.parse_args()
+
+    paths = args.path or ["/city/total_adults", "/hotel/total_aons"]
+    per_worker = args.requests // args.concurrency
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(
+            pool.map(
+                lambda _: worker(args.url, paths, per_worker, args.conditional),
+                range(args.concurrency),
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([result[0] for result in results]) * 1000
+    statuses = sum((result[1] for result in results), Counter())
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+
+    print(
+        f"{len(latencies)} requests in {elapsed:.2f}s: {len(latencies) / elapsed:.0f} req/s"
+    )
+    print(f"latency p50 {p50:.2f}ms, p95 {p95:.2f}ms, p99 {p99:.2f}ms")
+    print("status codes:", dict(statuses))
+
+
+if __name__ == "__main__":
+    main()
@@ -167,78 +167,73 @@ plt.show()
 # %%
 from rissa_plotter import CityData, HotelData
 
-group_1 = ["15a", "15b", "15", "14a", "14", "13a", "13b", "12", "11", "10", "09"]
-group_2 = [
-    "05a",
-    "06",
-    "06a",
-    "07",
-    "08",
-    "08b",
-    "16a",
-    "16b",
-    "16c",
-    "16d",
-    "16",
-    "17",
-    "19",
-]
-group_3 = [
-    "01",
-    "02",
-    "02b",
-    "04b",
-    "04",
-    "20",
-    "20b",
-    "20d",
-    "20e",
-    "21",
-    "22",
-    "22b",
-    "16e",
-    "16f",
-]
-
-group_4 = ["23", "24", "25", "26", "26b", "26c", "27", "28", "28b", "29"]
-
-group_5 = [
-    "30",
-    "31",
-    "31a",
-    "31b",
-    "31c",
-    "31d",
-    "32",
-    "32a",
-    "32b",
-    "32c",
-    "32d",
-    "32e",
-    "32f",
-    "33",
-    "34",
-]
-
-
 path_city = r"c:\work_projects\RissaCS\Kittiwalkers\city_data.csv"
 df = pd.read_csv(path_city, parse_dates=["timestamp"])
 city_data = CityData.from_dataframe(df=df)
 
-for group in [group_1, group_2, group_3, group_4, group_5]:
-    print(f"Group: {group}")
-    print(
-        "Total Adults:",
-        city_data.total_adults(station=group, percentile=0.75, year=2025)
-        .isel(timestamp=-2)
-        .item(),
-    )
-    print(
-        "Total AONs:",
-        city_data.total_aons(station=group, percentile=0.75, year=2025)
-        .isel(timestamp=-2)
-        .item(),
-    )
+# The reporting zones. station_locations.tsv does not have every station (e.g. 09-13
+# and 32d-32f), so `util.SpatialIndex.stations().zones(radius=60,
+# entities=city_data.entities)` cannot reproduce them; it would put those stations in
+# an 'Unlocated' zone.
+zones = {
+    "Zone 1": ["15a", "15b", "15", "14a", "14", "13a", "13b", "12", "11", "10", "09"],
+    "Zone 2": [
+        "05a",
+        "06",
+        "06a",
+        "07",
+        "08",
+        "08b",
+        "16a",
+        "16b",
+        "16c",
+        "16d",
+        "16",
+        "17",
+        "19",
+    ],
+    "Zone 3": [
+        "01",
+        "02",
+        "02b",
+        "04b",
+        "04",
+        "20",
+        "20b",
+        "20d",
+        "20e",
+        "21",
+        "22",
+        "22b",
+        "16e",
+        "16f",
+    ],
+    "Zone 4": ["23", "24", "25", "26", "26b", "26c", "27", "28", "28b", "29"],
+    "Zone 5": [
+        "30",
+        "31",
+        "31a",
+        "31b",
+        "31c",
+        "31d",
+        "32",
+        "32a",
+        "32b",
+        "32c",
+        "32d",
+        "32e",
+        "32f",
+        "33",
+        "34",
+    ],
+}
+
+adults = city_data.group_totals("adultCount", zones, year=2025)
+aons = city_data.group_totals("aonCount", zones, year=2025)
+for zone, stations in zones.items():
+    print(f"{zone}: {stations}")
+    print("Total Adults:", adults.sel(group=zone).isel(timestamp=-2).item())
+    print("Total AONs:", aons.sel(group=zone).isel(timestamp=-2).item())
     print()
 
 path_hotel = r"c:\work_projects\RissaCS\Kittiwalkers\hotel_data.csv"
@@ -267,20 +262,24 @@ group_4h = [
     "Hotel 7R",
 ]
 
-for group in [group_4h, group_5h]:
-    print(f"Group: {group}")
-    print(
-        "Total Adults:",
-        hotel_data.total_adults(hotel=group, percentile=0.75, year=2025)
-        .isel(timestamp=-2)
-        .item(),
-    )
-    print(
-        "Total AONs:",
-        hotel_data.total_aons(hotel=group, percentile=0.75, year=2025)
-        .isel(timestamp=-2)
-        .item(),  # take last instead of max count
-    )
+# No hotel locations are shipped, so the hotel zones are listed by hand
+hotel_zones = {"Zone 4": group_4h, "Zone 5": group_5h}
+
+adults = hotel_data.group_totals("adultCount", hotel_zones, year=2025)
+aons = hotel_data.group_totals("aonCount", hotel_zones, year=2025)
+for zone, hotels in hotel_zones.items():
+    print(f"{zone}: {hotels}")
+    print("Total Adults:", adults.sel(group=zone).isel(timestamp=-2).item())
+    # take last instead of max count
+    print("Total AONs:", aons.sel(group=zone).isel(timestamp=-2).item())
     print()
 
 # %%
+from rissa_plotter.visualize import MapPlotter, TileCache
+
+# Tiles are downloaded into the cache on the first run; later runs can be offline
+mp = MapPlotter(tiles=TileCache(offline=False), transparent=True)
+fig = mp.plot_counts(city_data, variable="aonCount", year=2025, figsize=(6, 8))
+fig = mp.plot_submissions(city_data, year=2025, figsize=(6, 8))
+
+# %%
@@ -61,9 +61,7 @@ for idx, perct in enumerate(np.arange(0.1, 1.1, 0.1)):
 city_data.total_adults(station=[station], percentile=0.75).plot(
     ax=ax, color="black", label="Percentile 0.75"
 )
-raw.plot.scatter(
-    x="timestamp", y="adultCount", ax=ax, color="grey", label="Raw data", s=10
-)
+visualize.plot_raw_data(ax, raw, y="adultCount", color="grey", label="Raw data", s=10)
 
 # Draw vertical lines every 1st and 15th of the month
 date_min = raw["timestamp"].min()
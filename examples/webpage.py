@@ -1,8 +1,21 @@
 # %%
 from rissa_plotter import visualize, readers, CityData, HotelData
+from rissa_plotter.service import DataService
 import streamlit as st
 import pandas as pd
 import ast
+import contextlib
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows; run a single worker process there
+    fcntl = None
 
 
 # ---- Load Data ----
@@ -17,6 +30,86 @@ def load_data_firebase():
     return city_data, hotel_data
 
 
+# One Arrow store per host, memory-mapped by every worker process
+STORE = Path(tempfile.gettempdir()) / "rissa_plotter"
+MAX_AGE = 86400
+
+
+def store_time() -> float:
+    # Time the current version of the store was written, by any worker process
+    marker = STORE / "hotels" / "current"
+    return marker.stat().st_mtime if marker.exists() else 0.0
+
+
+@contextlib.contextmanager
+def store_lock():
+    # Only one worker process downloads and writes the store, the others wait for it
+    STORE.mkdir(parents=True, exist_ok=True)
+    with open(STORE / "lock", "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def load_data_shared(max_age: int = MAX_AGE):
+    city_store, hotel_store = STORE / "city", STORE / "hotels"
+
+    if time.time() - store_time() > max_age:
+        with store_lock():
+            # Another process may have written the store while this one waited
+            if time.time() - store_time() > max_age:
+                city_data, hotel_data = load_data_firebase()
+                readers.save_arrow_table(city_data, city_store)
+                readers.save_arrow_table(hotel_data, hotel_store)
+
+    written = store_time()
+    city_data = readers.open_arrow_table(city_store)
+    hotel_data = readers.open_arrow_table(hotel_store)
+    return city_data, hotel_data, written
+
+
+@dataclass
+class SharedService:
+    service: Optional[DataService] = None
+    # Time the store was written that the service last loaded; 0.0 for live updates
+    written: float = 0.0
+
+
+@st.cache_resource
+def data_service() -> SharedService:
+    # Shared by all sessions; identical requests are computed once
+    shared = SharedService()
+    if not st.secrets.get("live_updates", False):
+
+        def load():
+            city_data, hotel_data, shared.written = load_data_shared()
+            return city_data, hotel_data
+
+        shared.service = DataService(load)
+        return shared
+
+    # Push new submissions into the service as they arrive instead of reloading daily
+    live = readers.LiveTables(dict(st.secrets["firebase"]))
+    shared.service = DataService(live.wait)
+    live.publish = shared.service.swap
+    live.start()
+    return shared
+
+
+def current_service(max_age: int = MAX_AGE) -> DataService:
+    shared = data_service()
+    service = shared.service
+    if st.secrets.get("live_updates", False):
+        return service
+
+    # The service is shared for the lifetime of the process, so reload when the store
+    # is older than max_age, or when another worker process has written a newer one
+    written = store_time()
+    if time.time() - written > max_age or written > shared.written:
+        service.refresh()
+    return service
+
+
 def load_data_local():
     path = r"c:\work_projects\RissaCS\Kittiwalkers\ontvangen_phillip\rissa-app-firebase-adminsdk-fbsvc-c66690f67d.json"
     city_data = readers.open_city_table(path)
@@ -91,7 +184,9 @@ st.markdown(
 )
 
 
-city_data, hotel_data = load_data_firebase()
+service = current_service()
+# Both from one snapshot, which stays the same for the whole rerun
+city_data, hotel_data = service.proxies()
 
 st.sidebar.header("Figure appearance")
 transparent = st.sidebar.checkbox("Transparent background", value=True)
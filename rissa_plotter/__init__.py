@@ -1,3 +1,19 @@
-import rissa_plotter.util
+import importlib
 
-from .base import CityData, HotelData
+__all__ = ["CityData", "HotelData", "util"]
+
+# The data classes and util are imported on first access, so that light entry points
+# such as the command line client do not import pandas, xarray and matplotlib.
+_LAZY = {"CityData": ".base", "HotelData": ".base", "util": None}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if _LAZY[name] is None:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -1,3 +1,7 @@
+import sys
+import threading
+import warnings
+from concurrent.futures import Future
 from typing import Optional
 
 import numpy as np
@@ -6,15 +10,69 @@ import xarray as xr
 
 from rissa_plotter import util
 
+# Integer time columns derived once from 'timestamp' (see util.add_time_columns)
+TIME_COLUMNS = ["year"]
+
+# Estimated peak bytes per row of the data, and per cell of one variable of a dense
+# grid, while resampling (see KittiwalkersData.memory_budget)
+ROW_BYTES = 64
+CELL_BYTES = 32
+
+
+def _nbytes(obj) -> int:
+    """
+    Estimates the memory held by a table, array or a (nested) container of them.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(_nbytes(value) for value in obj.values())
+    if isinstance(obj, (tuple, list)):
+        return sum(_nbytes(value) for value in obj)
+    return sys.getsizeof(obj)
+
 
 class KittiwalkersData:
     dimension_name = "entity"  # Override in subclass
 
-    def __init__(self, data: pd.DataFrame, submissions: pd.DataFrame):
-        self.data = data.copy()
-        self.submissions = submissions.copy()
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        submissions: pd.DataFrame,
+        copy: bool = True,
+        sparse: bool = False,
+        memory_budget: Optional[int] = None,
+    ):
+        # Memory-mapped tables (see readers.open_arrow_table) are passed with
+        # copy=False, so every process keeps reading the shared pages.
+        self.data = data.copy() if copy else data
+        self.submissions = submissions.copy() if copy else submissions
+        for df in (self.data, self.submissions):
+            if not set(TIME_COLUMNS).issubset(df.columns):
+                util.add_time_columns(df)
+
         self._entities = np.unique(self.submissions[self.dimension_name])
-        self._years = np.unique(self.submissions["timestamp"].dt.year)
+        self._years = np.unique(self.submissions["year"])
+
+        # Derived tables that only depend on the (immutable) data of this instance
+        self._cache = {}
+        self._sizes: dict[tuple, int] = {}
+        self._pending: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+        # Reduce totals from util.SparseGrid, and make dense grids only for the selected
+        # window, instead of building the dense grid of all bins
+        self.sparse = sparse
+
+        # Bytes that cached results and resampling to a dense grid may take together.
+        # Cached results are kept within half of it, oldest dropped first, and grids
+        # that do not fit next to them are built one year and a group of entities at a
+        # time. None means no limit.
+        self.memory_budget = memory_budget
 
     def __repr__(self):
         return f"<{self.__class__.__name__} with {len(self.entities)} {self.dimension_name}s covering {self.years}>"
@@ -27,6 +85,69 @@ class KittiwalkersData:
     def years(self):
         return self._years
 
+    def _cached(self, key: tuple, func, *args):
+        """
+        Returns the cached result for `key`, computing it with `func(*args)` on first use.
+
+        Cached results are read without locking. Threads that ask for a result that is
+        being computed wait for it, so it is computed once, while results of other keys
+        are computed concurrently. Results are shared between callers and should not
+        be modified.
+        """
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func(*args)
+        except BaseException as error:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            self._cache[key] = result
+            del self._pending[key]
+            if self.memory_budget is not None:
+                self._trim_cache(self.memory_budget // 2)
+        future.set_result(result)
+        return result
+
+    def _cache_size(self, key: tuple) -> int:
+        size = self._sizes.get(key)
+        if size is None:
+            size = self._sizes[key] = _nbytes(self._cache[key])
+        return size
+
+    def _trim_cache(self, limit: int):
+        """
+        Drops the oldest cached results until they take at most `limit` bytes. The
+        newest result is always kept. Call with the lock held.
+        """
+        total = sum(self._cache_size(key) for key in self._cache)
+        for key in list(self._cache)[:-1]:
+            if total <= limit:
+                break
+            total -= self._cache_size(key)
+            del self._cache[key], self._sizes[key]
+
+    def _cache_bytes(self) -> int:
+        with self._lock:
+            return sum(self._cache_size(key) for key in self._cache)
+
     def _to_xarray(
         self,
         parameter: str,
@@ -50,26 +171,417 @@ class KittiwalkersData:
             A DataArray indexed by timestamp and the object's dimension, containing the resampled parameter values.
 
         """
-        df = self.data.copy()
+        ds = self._to_dataset([parameter], frequency, percentile)
+        return ds[parameter].rename(None)
+
+    def _to_dataset(
+        self,
+        parameters: list[str],
+        frequency: str,
+        percentile: float,
+    ) -> xr.Dataset:
+        """
+        Resamples several parameters at once, see `_to_xarray`.
+
+        Returns
+        -------
+        xr.Dataset
+            A Dataset indexed by timestamp and the object's dimension, with one variable per parameter.
+
+        """
+        resampled, fixed_dates = self._resample(parameters, frequency, percentile)
+        return self._to_grid(resampled, fixed_dates)
+
+    def _to_grid(self, df: pd.DataFrame, fixed_dates: pd.DatetimeIndex) -> xr.Dataset:
+        """
+        Converts values in long form to a Dataset with all bins of the frequency.
+        """
+        ds = df.set_index(["timestamp", self.dimension_name]).to_xarray()
+        ds = ds.sortby("timestamp").astype(float)
+        ds = ds.reindex(timestamp=fixed_dates)
+        return util.assign_plotting_date(ds)
+
+    def _chunk_plan(
+        self, parameters: list[str], frequency: str, year: Optional[int] = None
+    ) -> Optional[tuple[np.ndarray, int]]:
+        """
+        Plans building the dense grid of `_to_dataset` in pieces within `memory_budget`.
+
+        Returns
+        -------
+        tuple[np.ndarray, int] or None
+            The years of the pieces and the number of entities per piece, or None if
+            the whole grid fits.
+
+        """
+        if self.memory_budget is None:
+            return None
+
+        fixed_dates = self._daterange(frequency)
+        years, bins = np.unique(fixed_dates.year, return_counts=True)
+        if year is not None:
+            years, bins = years[years == year], bins[years == year]
+        if len(years) == 0:
+            return None
+
+        # cached results count against the budget
+        budget = self.memory_budget - self._cache_bytes()
+        rows = ROW_BYTES * len(self.data)
+        cell = CELL_BYTES * len(parameters)
+        if rows + cell * bins.sum() * len(self.entities) <= budget:
+            return None
+
+        # one year at a time, with as many entities as fit next to the rows
+        size = max(1, (budget - rows) // (cell * bins.max()))
+        return years, int(size)
+
+    def _grid_chunks(
+        self,
+        parameters: list[str],
+        frequency: str,
+        percentile: float,
+        plan: tuple[np.ndarray, int],
+        entities: Optional[np.ndarray] = None,
+    ):
+        """
+        Yields the dense grid of `_to_dataset` as (year, grid) pieces, see `_chunk_plan`.
+
+        The pieces of a year are in the order of their entities, and every piece holds
+        all bins of its year and all of its entities.
+        """
         dim = self.dimension_name
+        years, size = plan
+        resampled, fixed_dates = self._resample(parameters, frequency, percentile)
 
-        fixed_dates = util.expanded_daterange(
-            df["timestamp"].min(),
-            df["timestamp"].max(),
-            frequency,
+        codes, known = pd.factorize(resampled[dim], sort=True)
+        selected = np.arange(len(known))
+        if entities is not None:
+            selected = known.get_indexer(np.unique(entities))
+            if np.any(selected < 0):
+                raise KeyError(f"not all values found in index '{dim}'")
+
+        row_years = resampled["timestamp"].dt.year.to_numpy()
+        for year in years:
+            dates = fixed_dates[fixed_dates.year == year]
+            for start in range(0, len(selected), size):
+                chunk = selected[start : start + size]
+                in_chunk = np.zeros(len(known), dtype=bool)
+                in_chunk[chunk] = True
+                rows = resampled[(row_years == year) & in_chunk[codes]]
+                grid = self._to_grid(rows, dates)
+                yield year, grid.reindex({dim: np.asarray(known[chunk])})
+
+    def _entity_sum(
+        self,
+        parameters: list[str],
+        frequency: str,
+        percentile: float,
+        entity: Optional[str] | Optional[list[str]] = None,
+        year: Optional[int] = None,
+    ) -> xr.Dataset:
+        """
+        Sums the dense grid of `_to_dataset` over (the selected) entities, in pieces if
+        it does not fit `memory_budget`, or the sparse grids if `sparse` is set.
+        """
+        dimension = self.dimension_name
+        entities = None if entity is None else np.atleast_1d(entity)
+
+        plan = None if self.sparse else self._chunk_plan(parameters, frequency, year)
+        if self.sparse:
+            sums = self._sparse_sum(parameters, frequency, percentile, entities)
+        elif plan is None:
+            ds = self._to_dataset(parameters, frequency, percentile)
+            if entities is not None:
+                ds = ds.sel({dimension: entities})
+            sums = ds.sum(dim=dimension)
+        else:
+            pieces = {}
+            chunks = self._grid_chunks(
+                parameters, frequency, percentile, plan, entities
+            )
+            for piece_year, grid in chunks:
+                piece = grid.sum(dim=dimension)
+                if piece_year in pieces:
+                    piece = pieces[piece_year] + piece
+                pieces[piece_year] = piece
+            sums = xr.concat(list(pieces.values()), dim="timestamp")
+
+        if year is not None:
+            sums = sums.isel(timestamp=(sums["timestamp"].dt.year == year).values)
+        return sums
+
+    def memory_report(self) -> pd.DataFrame:
+        """
+        Lists the memory held by this instance.
+
+        Returns
+        -------
+        pd.DataFrame
+            The 'kind' and size in 'bytes' of the tables ('data'), the indexes and
+            summaries of the aggregate pyramid ('grid') and the other cached results
+            ('cache'), indexed by name. Memory-mapped tables count in full.
+
+        """
+        items = [
+            ("data", "data", _nbytes(self.data)),
+            ("submissions", "data", _nbytes(self.submissions)),
+        ]
+        for key, value in list(self._cache.items()):
+            kind = "grid" if key[0] == "pyramid" else "cache"
+            items.append((" ".join(map(str, key)), kind, _nbytes(value)))
+
+        report = pd.DataFrame(items, columns=["name", "kind", "bytes"])
+        return report.set_index("name")
+
+    def _to_sparse(
+        self,
+        parameter: str,
+        frequency: str,
+        percentile: float,
+    ) -> util.SparseGrid:
+        """
+        Resamples a parameter like `_to_xarray`, but keeps only the observed cells.
+
+        Returns
+        -------
+        util.SparseGrid
+            The resampled values in coordinate form.
+
+        """
+        resampled, fixed_dates = self._resample([parameter], frequency, percentile)
+        return util.SparseGrid.from_frame(
+            resampled, parameter, self.dimension_name, fixed_dates
+        )
+
+    def _sparse_sum(
+        self,
+        parameters: list[str],
+        frequency: str,
+        percentile: float,
+        entities: Optional[np.ndarray] = None,
+    ) -> xr.Dataset:
+        """
+        Sums the sparse grids of several parameters over (the selected) entities.
+        """
+        grids = {p: self._to_sparse(p, frequency, percentile) for p in parameters}
+        sums = xr.Dataset(
+            {p: ("timestamp", grid.sum(entities)) for p, grid in grids.items()},
+            coords={"timestamp": self._daterange(frequency)},
         )
-        df["timestamp"] = util.assign_to_nearest(df["timestamp"], fixed_dates).values
+        return util.assign_plotting_date(sums)
+
+    def _sparse_window(
+        self,
+        parameters: list[str],
+        frequency: str,
+        percentile: float,
+        year: Optional[int] = None,
+    ) -> xr.Dataset:
+        """
+        Creates the dense grid of `_to_dataset` for the bins of `year` only, from the
+        sparse grids.
+        """
+        start = end = None
+        if year is not None:
+            start = pd.Timestamp(year=year, month=1, day=1)
+            end = pd.Timestamp(year=year + 1, month=1, day=1) - pd.Timedelta(1, "ns")
+
+        ds = xr.Dataset(
+            {
+                p: self._to_sparse(p, frequency, percentile).to_dense(start, end)
+                for p in parameters
+            }
+        )
+        return util.assign_plotting_date(ds)
+
+    def _bins(self, frequency: str) -> tuple[np.ndarray, pd.DatetimeIndex]:
+        """
+        Assigns every submission to the nearest bin of the given frequency.
+
+        Returns
+        -------
+        tuple[np.ndarray, pd.DatetimeIndex]
+            The bin of every submission, and all bins of the frequency.
+
+        """
+        fixed_dates = self._daterange(frequency)
+        bins = util.assign_to_nearest(self.data["timestamp"], fixed_dates).values
+        return bins, fixed_dates
+
+    def _daterange(self, frequency: str) -> pd.DatetimeIndex:
+        timestamps = self.data["timestamp"]
+        return util.expanded_daterange(timestamps.min(), timestamps.max(), frequency)
+
+    def _pyramid(self) -> util.AggregatePyramid:
+        return self._cached(
+            ("pyramid",),
+            util.AggregatePyramid,
+            self.data["timestamp"],
+            self.data[self.dimension_name],
+        )
+
+    def _level(self, frequency: str):
+        """
+        Groups the records of the pyramid per (bin, entity) of the given frequency.
+
+        Returns
+        -------
+        tuple[util.pyramid.Level | None, pd.DatetimeIndex]
+            The groups (None if the bins do not follow the cells of the pyramid), and
+            all bins of the frequency.
+
+        """
+
+        def level():
+            fixed_dates = self._daterange(frequency)
+            return self._pyramid().level(fixed_dates), fixed_dates
+
+        return self._cached(("pyramid", frequency), level)
+
+    def _values(self, parameter: str) -> np.ndarray:
+        return self.data[parameter].to_numpy(dtype=float, na_value=np.nan)
+
+    def _summaries(self, parameter: str) -> dict[str, np.ndarray]:
+        return self._cached(
+            ("pyramid", "summaries", parameter),
+            lambda: self._pyramid().summarize(self._values(parameter)),
+        )
+
+    def _sorted_values(self, parameter: str) -> tuple[np.ndarray, np.ndarray]:
+        return self._cached(
+            ("pyramid", "sorted", parameter),
+            lambda: self._pyramid().sort_values(self._values(parameter)),
+        )
+
+    def _from_level(self, level, fixed_dates, columns: dict) -> pd.DataFrame:
+        # groups are sorted by entity, util.resample sorts by timestamp first
+        order = np.lexsort((level.entity, level.bin))
+        df = pd.DataFrame(
+            {
+                "timestamp": fixed_dates[level.bin[order]],
+                self.dimension_name: self._pyramid().entities[level.entity[order]],
+            }
+        )
+        for name, values in columns.items():
+            df[name] = values[order]
+        return df
+
+    def _resample(
+        self,
+        parameters: list[str],
+        frequency: str,
+        percentile: float,
+    ) -> tuple[pd.DataFrame, pd.DatetimeIndex]:
+        """
+        Assigns the data to the nearest bin of the given frequency and computes the percentile per (bin, entity).
+
+        Returns
+        -------
+        tuple[pd.DataFrame, pd.DatetimeIndex]
+            The resampled values in long form, and all bins of the frequency.
+
+        """
+        level, fixed_dates = self._level(frequency)
+        if level is not None:
+            return self._resample_level(level, fixed_dates, parameters, percentile)
+
+        dim = self.dimension_name
+        bins, fixed_dates = self._bins(frequency)
+        df = self.data[[dim, *parameters]].assign(timestamp=bins)
 
         resampled = util.resample(
             df,
             by=["timestamp", dim],
-            columns=[parameter],
+            columns=parameters,
             percentile=percentile,
         )
-        pivoted = resampled.pivot(index="timestamp", columns=dim, values=parameter)
-        da = xr.DataArray(pivoted).sortby("timestamp").astype(float)
-        da = da.reindex(timestamp=fixed_dates)
-        return da
+        return resampled, fixed_dates
+
+    def _resample_level(self, level, fixed_dates, parameters, percentile):
+        """
+        Computes the percentiles of `_resample` from the pyramid instead of the rows.
+
+        The minimum (percentile 0) and maximum (percentile 1) are reduced from the
+        summaries per record; other percentiles are picked from the values sorted per
+        entity. Both are cached per parameter and shared by all frequencies.
+        """
+        if not 0.0 <= percentile <= 1.0:
+            raise ValueError("Percentile should be strictly between 0.0 and 1.0")
+
+        pyramid = self._pyramid()
+        columns = {}
+        for parameter in parameters:
+            if percentile in (0.0, 1.0):
+                statistic = "min" if percentile == 0.0 else "max"
+                summaries = self._summaries(parameter)
+                columns[parameter] = pyramid.combine(summaries, level, statistic)
+            else:
+                sorted_values = self._sorted_values(parameter)
+                columns[parameter] = pyramid.quantile(sorted_values, level, percentile)
+        return self._from_level(level, fixed_dates, columns), fixed_dates
+
+    def aggregated(
+        self,
+        variables: list[str],
+        statistic: str = "count",
+        frequency: str = "SME",
+        year: Optional[int] = None,
+    ) -> xr.Dataset:
+        """
+        Counts, sums, minima or maxima of several variables per entity and bin.
+
+        These statistics are reduced from per-(entity, half day) summaries that are
+        computed once per variable, so switching between frequencies such as 'D', 'W',
+        'SME' and 'ME' does not touch the submissions again, see `util.AggregatePyramid`.
+
+        Parameters
+        ----------
+        variables : list[str]
+            The names of the variables to aggregate.
+        statistic : str, default="count"
+            'count' (number of values), 'sum', 'min' or 'max'.
+        frequency : str, default="SME"
+            The frequency at which the data is aggregated.
+        year : Optional[int], default=None
+            The specific year to filter by. If None, includes all years.
+        Returns
+        -------
+        xr.Dataset
+            One variable per parameter with dimensions (timestamp, entity). Bins without
+            submissions are NaN, as are sums, minima and maxima of bins without values.
+
+        """
+        if statistic not in util.pyramid.STATISTICS:
+            raise ValueError(
+                f"Statistic should be one of {util.pyramid.STATISTICS}, got '{statistic}'"
+            )
+
+        level, fixed_dates = self._level(frequency)
+        if level is not None:
+            pyramid = self._pyramid()
+            columns = {
+                variable: pyramid.combine(self._summaries(variable), level, statistic)
+                for variable in variables
+            }
+            df = self._from_level(level, fixed_dates, columns)
+        else:
+            dim = self.dimension_name
+            bins, fixed_dates = self._bins(frequency)
+            grouped = (
+                self.data[[dim, *variables]]
+                .assign(timestamp=bins)
+                .groupby(["timestamp", dim])[variables]
+            )
+            df = (
+                grouped.sum(min_count=1)
+                if statistic == "sum"
+                else grouped.agg(statistic)
+            ).reset_index()
+
+        ds = self._to_grid(df, fixed_dates)
+        if year is not None:
+            ds = ds.isel(timestamp=(ds["timestamp"].dt.year == year).values)
+        return ds
 
     def total(
         self,
@@ -99,36 +611,483 @@ class KittiwalkersData:
             The aggregated data array, filtered and summed according to the specified parameters.
 
         """
-        data_var = self._to_xarray(var, frequency, percentile)
+        sums = self._entity_sum([var], frequency, percentile, entity, year)
+        selection = sums[var].rename(None)
+        return selection.where(selection != 0)
+
+    def bootstrap_total(
+        self,
+        var: str,
+        frequency: str = "SME",
+        percentile: float = 0.75,
+        entity: Optional[str] | Optional[list[str]] = None,
+        year: Optional[int] = None,
+        quantiles: tuple[float, ...] = (0.05, 0.95),
+        n_boot: int = 1000,
+        seed: int = 0,
+        workers: Optional[int] = None,
+    ) -> xr.DataArray:
+        """
+        Calculates bootstrap confidence bands of `total`.
+
+        Every replicate resamples the submissions within each (bin, entity) cell with
+        replacement, takes their percentile and sums over entities, see
+        `util.bootstrap_percentiles`. The bands are quantiles of the replicated totals.
+        Results are cached and reproducible for a given `seed`.
+
+        Parameters
+        ----------
+        var : str
+            The name of the variable to aggregate.
+        frequency : str, default="SME"
+            The frequency at which the data is aggregated.
+        percentile : float, default=0.75
+            The percentile to use when selecting the data.
+        entity : Optional[str] | Optional[list[str]], default=None
+            The specific entity to filter by. If None, aggregates over all entities.
+        year : Optional[int], default=None
+            The specific year to filter by. If None, includes all years.
+        quantiles : tuple[float, ...], default=(0.05, 0.95)
+            Quantiles of the replicated totals, e.g. the bounds of a 90% band.
+        n_boot : int, default=1000
+            Number of bootstrap replicates.
+        seed : int, default=0
+            Seed of the random generators.
+        workers : Optional[int], default=None
+            Number of threads. If None, one per processor.
+        Returns
+        -------
+        xr.DataArray
+            Bands with dimensions (timestamp, quantile). Bins where `total` is NaN are
+            NaN.
+
+        """
+        entities = None if entity is None else tuple(np.atleast_1d(entity))
+        key = (
+            "bootstrap_total",
+            var,
+            frequency,
+            percentile,
+            entities,
+            tuple(quantiles),
+            n_boot,
+            seed,
+        )
+        bands = self._cached(
+            key,
+            self._bootstrap_total,
+            var,
+            frequency,
+            percentile,
+            entities,
+            quantiles,
+            n_boot,
+            seed,
+            workers,
+        )
+
+        if year is not None:
+            bands = bands.isel(timestamp=(bands["timestamp"].dt.year == year).values)
+        return bands
+
+    def _bootstrap_total(
+        self, var, frequency, percentile, entities, quantiles, n_boot, seed, workers
+    ) -> xr.DataArray:
+        dim = self.dimension_name
+        bins, fixed_dates = self._bins(frequency)
+
+        keep = np.ones(len(self.data), dtype=bool)
+        if entities is not None:
+            keep = self.data[dim].isin(entities).to_numpy()
+        bin_codes = fixed_dates.get_indexer(bins[keep])
+        entity_codes, uniques = pd.factorize(self.data[dim][keep], sort=True)
+        values = self.data[var][keep].to_numpy(dtype=float, na_value=np.nan)
+
+        # one group per (bin, entity) cell, sorted by bin
+        valid = (bin_codes >= 0) & (entity_codes >= 0)
+        cells, codes = np.unique(
+            np.ravel_multi_index(
+                (bin_codes[valid], entity_codes[valid]),
+                (len(fixed_dates), len(uniques)),
+            ),
+            return_inverse=True,
+        )
+        replicates = util.bootstrap_percentiles(
+            codes, values[valid], len(cells), percentile, n_boot, seed, workers
+        )
+
+        # sum the cells of every bin per replicate; cells without values count as zero
+        cell_bins = cells // len(uniques)
+        filled, starts = np.unique(cell_bins, return_index=True)
+        totals = np.zeros((n_boot, len(fixed_dates)))
+        if len(cells):
+            totals[:, filled] = np.add.reduceat(
+                np.nan_to_num(replicates), starts, axis=1
+            )
+
+        estimate = self.total(var, frequency, percentile, entity=entities)
+        bands = xr.DataArray(
+            np.quantile(totals, quantiles, axis=0).T,
+            dims=("timestamp", "quantile"),
+            coords={"timestamp": fixed_dates, "quantile": list(quantiles)},
+            name=var,
+        )
+        bands = bands.where(estimate.notnull().values[:, None])
+        return util.assign_plotting_date(bands)
+
+    def resampled(
+        self,
+        variables: list[str],
+        frequency: str = "SME",
+        percentile: float = 0.75,
+        year: Optional[int] = None,
+    ) -> xr.Dataset:
+        """
+        Resamples several variables per entity at once, without summing over entities.
+
+        Parameters
+        ----------
+        variables : list[str]
+            The names of the variables to resample.
+        frequency : str, default="SME"
+            The frequency at which the data is aggregated.
+        percentile : float, default=0.75
+            The percentile to use when selecting the data.
+        year : Optional[int], default=None
+            The specific year to filter by. If None, includes all years.
+        Returns
+        -------
+        xr.Dataset
+            One variable per parameter with dimensions (timestamp, entity). Zero values
+            and missing bins are NaN, as in `total` for a single entity.
+
+        """
+        if self.sparse:
+            ds = self._sparse_window(variables, frequency, percentile, year)
+            return ds.where(ds != 0)
+
+        plan = self._chunk_plan(variables, frequency, year)
+        if plan is not None:
+            pieces = {}
+            for piece_year, grid in self._grid_chunks(
+                variables, frequency, percentile, plan
+            ):
+                pieces.setdefault(piece_year, []).append(grid.where(grid != 0))
+            years = [
+                xr.concat(grids, dim=self.dimension_name) for grids in pieces.values()
+            ]
+            return xr.concat(years, dim="timestamp")
+
+        ds = self._to_dataset(variables, frequency, percentile)
+        ds = ds.where(ds != 0)
+
+        if year is not None:
+            ds = ds.isel(timestamp=(ds["timestamp"].dt.year == year).values)
+        return ds
+
+    def _membership(self, groups: dict[str, list[str]]) -> xr.DataArray:
+        """
+        Matrix of ones and zeros with dimensions (group, entity) that marks the entities of every group.
+        """
+        names = list(groups)
+        entities = sorted(set().union(*groups.values()))
+        return xr.DataArray(
+            [[entity in groups[name] for entity in entities] for name in names],
+            dims=("group", self.dimension_name),
+            coords={"group": names, self.dimension_name: entities},
+        ).astype(float)
+
+    def group_totals(
+        self,
+        var: str,
+        groups: dict[str, list[str]],
+        frequency: str = "SME",
+        percentile: float = 0.75,
+        year: Optional[int] = None,
+    ) -> xr.DataArray:
+        """
+        Calculates the total of a variable for several groups of entities from a single resample.
+
+        Parameters
+        ----------
+        var : str
+            The name of the variable to aggregate.
+        groups : dict[str, list[str]]
+            Entities that make up each group, e.g. the zones of `util.SpatialIndex.zones`.
+            Entities without data count as zero. A warning lists the entities with data
+            that are in no group, as they are not counted.
+        frequency : str, default="SME"
+            The frequency at which the data is aggregated.
+        percentile : float, default=0.75
+            The percentile to use when selecting the data.
+        year : Optional[int], default=None
+            The specific year to filter by. If None, includes all years.
+        Returns
+        -------
+        xr.DataArray
+            Totals with dimensions (timestamp, group), equal to `total` with the entities
+            of each group. Zero totals are NaN.
+
+        """
+        membership = self._membership(groups)
         dimension = self.dimension_name
 
-        if entity is None:
-            selection = data_var.sum(dim=dimension)
-        else:
-            selection = data_var.sel({dimension: entity}).sum(dim=dimension)
-        selection = selection.where(selection != 0)
+        resampled, _ = self._resample([var], frequency, percentile)
+        counted = resampled[var].notna().to_numpy()
+        if year is not None:
+            counted = counted & (resampled["timestamp"].dt.year == year).to_numpy()
+        counted = resampled[dimension][counted]
+        ungrouped = sorted(set(counted) - set(membership[dimension].values))
+        if ungrouped:
+            warnings.warn(
+                f"{len(ungrouped)} {dimension}s with {var} values are in no group and "
+                f"are not counted: {', '.join(map(str, ungrouped))}",
+                stacklevel=2,
+            )
 
+        totals = self._group_sum(var, frequency, percentile, membership)
         if year is not None:
-            selection = selection.where(
-                selection["timestamp"].dt.year == year, drop=True
+            totals = totals.isel(timestamp=(totals["timestamp"].dt.year == year).values)
+        return totals.where(totals != 0).transpose("timestamp", "group")
+
+    def _group_sum(
+        self,
+        parameter: str,
+        frequency: str,
+        percentile: float,
+        membership: xr.DataArray,
+    ) -> xr.DataArray:
+        """
+        Sums a parameter per group of `_membership`, from the sparse grid if `sparse`
+        is set, or from the dense grid, in pieces if it does not fit `memory_budget`.
+
+        Returns
+        -------
+        xr.DataArray
+            Sums with dimensions (timestamp, group), zero where a group has no values.
+
+        """
+        if self.sparse:
+            return self._sparse_group_sum(parameter, frequency, percentile, membership)
+
+        dimension = self.dimension_name
+        plan = self._chunk_plan([parameter], frequency)
+        if plan is None:
+            grid = self._to_xarray(parameter, frequency, percentile)
+            grid = grid.reindex({dimension: membership[dimension].values})
+            return xr.dot(grid.fillna(0), membership, dim=dimension)
+
+        pieces = {}
+        for piece_year, grid in self._grid_chunks(
+            [parameter], frequency, percentile, plan
+        ):
+            weights = membership.reindex({dimension: grid[dimension]}, fill_value=0)
+            values = grid[parameter].rename(None).fillna(0)
+            piece = xr.dot(values, weights, dim=dimension)
+            if piece_year in pieces:
+                piece = pieces[piece_year] + piece
+            pieces[piece_year] = piece
+        return xr.concat(list(pieces.values()), dim="timestamp")
+
+    def _sparse_group_sum(
+        self,
+        parameter: str,
+        frequency: str,
+        percentile: float,
+        membership: xr.DataArray,
+    ) -> xr.DataArray:
+        """
+        Sums the sparse grid of a parameter per group of `_membership`.
+        """
+        grid = self._to_sparse(parameter, frequency, percentile)
+        weights = membership.reindex(
+            {self.dimension_name: grid.entities}, fill_value=0
+        ).values
+        values = np.nan_to_num(grid.values)
+        sums = [
+            np.bincount(
+                grid.time_index,
+                weights=values * group[grid.entity_index],
+                minlength=len(grid.timestamps),
             )
-        return selection
+            for group in weights
+        ]
+        totals = xr.DataArray(
+            np.stack(sums, axis=1).reshape(len(grid.timestamps), len(weights)),
+            dims=("timestamp", "group"),
+            coords={"timestamp": grid.timestamps, "group": membership["group"].values},
+        )
+        return util.assign_plotting_date(totals)
+
+    def yearly_totals(
+        self,
+        variables: list[str],
+        frequency: str = "SME",
+        percentile: float = 0.75,
+        entity: Optional[str] | Optional[list[str]] = None,
+    ) -> xr.DataArray:
+        """
+        Calculates the totals of several variables for every year from a single resample.
+
+        The timestamps of the resampled grid are split into the year and the day of the
+        season (see `util.day_of_season`), so that all years share one calendar axis.
+
+        Parameters
+        ----------
+        variables : list[str]
+            The names of the variables to aggregate.
+        frequency : str, default="SME"
+            The frequency at which the data is aggregated. Should be daily or coarser.
+        percentile : float, default=0.75
+            The percentile to use when selecting the data.
+        entity : Optional[str] | Optional[list[str]], default=None
+            The specific entity or entities to filter by. If None, aggregates over all entities.
+        Returns
+        -------
+        xr.DataArray
+            Totals with dimensions (year, day_of_season, variable), with a 'plot_date'
+            coordinate along day_of_season. Zero totals and missing bins are NaN.
+
+        Raises
+        ------
+        ValueError
+            If the frequency is finer than daily.
+        """
+        # Bins within one day would share a day of the season
+        offset = pd.tseries.frequencies.to_offset(frequency)
+        if isinstance(offset, pd.offsets.Tick) and offset < pd.Timedelta(days=1):
+            raise ValueError(
+                f"Frequency should be daily or coarser for yearly totals, got '{frequency}'"
+            )
+
+        totals = self._entity_sum(variables, frequency, percentile, entity)
+        totals = totals.where(totals != 0).to_array("variable")
+
+        timestamps = totals["timestamp"]
+        index = pd.MultiIndex.from_arrays(
+            [timestamps.dt.year.values, util.day_of_season(timestamps)],
+            names=["year", "day_of_season"],
+        )
+        coords = xr.Coordinates.from_pandas_multiindex(index, "timestamp")
+        cube = totals.drop_vars(["timestamp", "plot_date"]).assign_coords(coords)
+        cube = cube.unstack("timestamp").transpose("year", "day_of_season", "variable")
+
+        plot_date = util.PLOT_EPOCH + cube["day_of_season"].values.astype(
+            "timedelta64[D]"
+        )
+        return cube.assign_coords(
+            plot_date=("day_of_season", plot_date.astype("datetime64[ns]"))
+        )
+
+    def submission_counts(self, frequency: Optional[str] = None) -> xr.Dataset:
+        """
+        Returns the number of submissions per entity and time bin.
+
+        The counts are built once per frequency with a single `np.bincount` over
+        (entity, bin) codes and cached, so the submission methods below are lookups
+        or slices of the result.
+
+        Parameters
+        ----------
+        frequency : Optional[str], default=None
+            The frequency string (e.g., 'D', 'SME') used to bin the timestamps to the
+            nearest bin. If None, submissions are counted per calendar day.
+
+        Returns
+        -------
+        xr.Dataset
+            Dataset with dimensions (entity, timestamp), containing 'count' and the
+            running total within each year, 'cumulative'. The 'year' coordinate along
+            timestamp gives the year of each bin.
+
+        """
+        return self._cached(
+            ("submission_counts", frequency), self._count_submissions, frequency
+        )
+
+    def _count_submissions(self, frequency: Optional[str]) -> xr.Dataset:
+        dim = self.dimension_name
+        timestamps = self.submissions["timestamp"]
+
+        if frequency is None:
+            days = timestamps.to_numpy().astype("datetime64[D]")
+            bins = pd.date_range(days.min(), days.max(), freq="D")
+            bin_codes = (days - days.min()).astype(int)
+        else:
+            bins = util.expanded_daterange(
+                timestamps.min(),
+                timestamps.max(),
+                frequency,
+            )
+            binned = util.assign_to_nearest(timestamps, bins)
+            bin_codes = bins.get_indexer(binned.to_numpy())
+
+        entity_codes = np.searchsorted(self.entities, self.submissions[dim].to_numpy())
+
+        shape = (len(self.entities), len(bins))
+        counts = np.bincount(
+            np.ravel_multi_index((entity_codes, bin_codes), shape),
+            minlength=shape[0] * shape[1],
+        ).reshape(shape)
+
+        # Running total that restarts at the first bin of every year
+        cumulative = counts.cumsum(axis=1)
+        years = bins.year.to_numpy()
+        first_bin = np.searchsorted(years, years)
+        offset = np.where(first_bin > 0, cumulative[:, first_bin - 1], 0)
+
+        return xr.Dataset(
+            {
+                "count": ((dim, "timestamp"), counts),
+                "cumulative": ((dim, "timestamp"), cumulative - offset),
+            },
+            coords={
+                dim: self.entities,
+                "timestamp": bins,
+                "year": ("timestamp", years),
+            },
+        )
 
     def yearly_submissions(self) -> pd.DataFrame:
-        df = self.submissions.copy()
-        df["year"] = df["timestamp"].dt.year
+        """
+        Returns the number of submissions per year and entity.
+        """
+        return self._cached(("yearly_submissions",), self._yearly_submissions)
+
+    def _yearly_submissions(self) -> pd.DataFrame:
         dim = self.dimension_name
-        df[dim] = pd.Categorical(df[dim], categories=self.entities, ordered=True)
-        yearly_counts = df.groupby(["year", dim]).size()
-        return yearly_counts.reset_index(name="count")
+        counts = self.submission_counts()["count"]
+        yearly = counts.groupby("year").sum().sel(year=self.years)
+
+        return pd.DataFrame(
+            {
+                "year": np.repeat(self.years, len(self.entities)),
+                dim: pd.Categorical(
+                    np.tile(self.entities, len(self.years)),
+                    categories=self.entities,
+                    ordered=True,
+                ),
+                "count": yearly.transpose("year", dim).values.ravel(),
+            }
+        )
 
     def daily_submissions(self) -> pd.DataFrame:
-        df = self.submissions.copy()
-        df["year"] = df["timestamp"].dt.year
-        df["timestamp"] = df["timestamp"].dt.floor("D")
-        df["count"] = 1
-        df["count"] = df.groupby(["year"])["count"].cumsum()
-        return df[["timestamp", "year", "count"]]
+        """
+        Returns the cumulative number of submissions per year at the end of each day with submissions.
+        """
+        return self._cached(("daily_submissions",), self._daily_submissions)
+
+    def _daily_submissions(self) -> pd.DataFrame:
+        daily = self.submission_counts().sum(dim=self.dimension_name)
+        daily = daily.isel(timestamp=daily["count"].values > 0)
+
+        return pd.DataFrame(
+            {
+                "timestamp": daily["timestamp"].values,
+                "year": daily["year"].values,
+                "count": daily["cumulative"].values,
+            }
+        )
 
     def submissions_per_bin(self, frequency: str, date: str) -> pd.DataFrame:
         """
@@ -147,34 +1106,14 @@ class KittiwalkersData:
             DataFrame indexed by station with a 'count' column for submissions in the specified bin.
 
         """
-        df = self.submissions.copy()
-        dim = self.dimension_name
-
-        # Generate fixed bins and assign each timestamp to the nearest bin
-        fixed_dates = util.expanded_daterange(
-            df["timestamp"].min(),
-            df["timestamp"].max(),
-            frequency,
-        )
-        df["binned_timestamp"] = util.assign_to_nearest(
-            df["timestamp"], fixed_dates
-        ).values
+        counts = self.submission_counts(frequency)["count"]
 
         # Parse the date string and match only the date part of the bin
-        target_date = pd.to_datetime(date, format="%d-%m-%Y").date()
-        mask = df["binned_timestamp"].dt.date == target_date
-
-        # Count submissions per entity (station/hotel/etc.) for the selected bin
-        counts = (
-            df[mask]
-            .groupby(dim)
-            .size()
-            .reindex(self.entities, fill_value=0)
-            .rename("count")
-            .reset_index()
-        )
+        target_date = pd.to_datetime(date, format="%d-%m-%Y").normalize()
+        mask = counts["timestamp"].dt.floor("D").values == target_date.to_datetime64()
 
-        return counts.set_index(dim)
+        selection = counts.isel(timestamp=mask).sum(dim="timestamp")
+        return selection.to_series().rename("count").to_frame()
 
 
 class CityData(KittiwalkersData):
@@ -197,11 +1136,12 @@ class CityData(KittiwalkersData):
         """
         Create a CityData instance from a DataFrame as downloaded from the Firebase database.
         """
-        submissions = df[["timestamp", "station"]].copy()
-
         columns = ["timestamp", "station", "adultCount", "aonCount"]
-        data = df[columns].copy()
-        return cls(data=data, submissions=submissions)
+        data = util.add_time_columns(df[columns].copy())
+
+        submissions = data[["timestamp", "station", *TIME_COLUMNS]]
+        # both tables are new, so they are not copied again
+        return cls(data=data, submissions=submissions, copy=False)
 
     def total_adults(
         self,
@@ -271,10 +1211,11 @@ class HotelData(KittiwalkersData):
         """
         Create a HotelData instance from a DataFrame as downloaded from the Firebase database.
         """
-        data = df.copy()
-        submissions = df[["timestamp", "hotel"]].copy()
+        data = util.add_time_columns(df.copy())
+        submissions = data[["timestamp", "hotel", *TIME_COLUMNS]]
 
-        return cls(data=data, submissions=submissions)
+        # both tables are new, so they are not copied again
+        return cls(data=data, submissions=submissions, copy=False)
 
     def total_adults(
         self,
@@ -336,6 +1277,76 @@ class HotelData(KittiwalkersData):
             frequency=frequency,
         )
 
+    def capacity_table(
+        self,
+        frequency: str = "SME",
+        percentile: float = 0.75,
+        capacity: Optional[dict[str, int]] = None,
+        groups: Optional[dict[str, list[str]]] = None,
+    ) -> xr.Dataset:
+        """
+        Calculates the AONs and the percentage of nesting capacity used for every group of hotels, in every bin of every year.
+
+        Parameters
+        ----------
+        frequency : str, default="SME"
+            The frequency at which the data is aggregated.
+        percentile : float, default=0.75
+            The percentile which used to resample the data.
+        capacity : Optional[dict[str, int]], default=None
+            Number of nesting places per hotel. If None, `visualize.constants.CAPACITY` is used.
+        groups : Optional[dict[str, list[str]]], default=None
+            Hotels that make up each group. If None, `visualize.constants.SUBHOTELS` is used.
+
+        Returns
+        -------
+        xr.Dataset
+            Dataset with dimensions (timestamp, group), containing 'aons', 'capacity' and
+            'percentage', and a 'year' coordinate along timestamp.
+        """
+        if capacity is None and groups is None:
+            return self._cached(
+                ("capacity_table", frequency, percentile),
+                self._capacity_table,
+                frequency,
+                percentile,
+            )
+        return self._capacity_table(frequency, percentile, capacity, groups)
+
+    def _capacity_table(
+        self,
+        frequency: str,
+        percentile: float,
+        capacity: Optional[dict[str, int]] = None,
+        groups: Optional[dict[str, list[str]]] = None,
+    ) -> xr.Dataset:
+        from rissa_plotter.visualize import constants
+
+        capacity = constants.CAPACITY if capacity is None else capacity
+        groups = constants.SUBHOTELS if groups is None else groups
+
+        membership = self._membership(groups)
+        hotels = membership["hotel"].values
+        capacity = xr.DataArray(
+            [capacity.get(hotel, np.nan) for hotel in hotels],
+            dims="hotel",
+            coords={"hotel": hotels},
+        )
+
+        aons = self._group_sum("aonCount", frequency, percentile, membership)
+        aons = aons.drop_vars("plot_date").transpose("timestamp", "group")
+        aons = aons.where(aons != 0)
+
+        capacity = xr.dot(capacity, membership, dim="hotel")
+        return xr.Dataset(
+            {
+                "aons": aons,
+                "capacity": capacity,
+                "percentage": aons / capacity * 100,
+            },
+            coords={"year": aons["timestamp"].dt.year},
+        )
+
     def chicks_per_nest(
         self,
         hotel: str,
@@ -345,6 +1356,16 @@ class HotelData(KittiwalkersData):
 
         mask = self.data["hotel"] == hotel
         selection = self.data[mask]
-        grouped = selection.groupby(selection["timestamp"].dt.year)
 
-        return grouped.apply(util.max_nestcount, columns=columns)
+        # per year, the row of `util.max_nestcount` in one pass over all years
+        codes, years = pd.factorize(selection["year"], sort=True)
+        rows = util.kernels.grouped_argmax(
+            codes,
+            selection["nestCount"].to_numpy(dtype=float, na_value=np.nan),
+            selection["three_chicks"].to_numpy(dtype=float, na_value=np.nan),
+            len(years),
+        )
+
+        result = selection[columns].iloc[rows]
+        result.index = pd.Index(years, name="year")
+        return result
@@ -0,0 +1,306 @@
+"""
+Command line interface: `rissa-plotter serve | render | refresh | stop`.
+
+`serve` starts a daemon that keeps the data and the plotters loaded and listens on a
+local Unix socket. `render` and `refresh` send a job to the daemon. When no daemon is
+running, `render` loads the data and renders in its own process instead.
+
+This module only imports the standard library at the top level, so that the client
+commands start quickly.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+DEFAULT_SOCKET = Path(
+    os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+    f"rissa-plotter-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock",
+)
+
+
+def _parse_value(value: str) -> Any:
+    # 2025 -> int, ["Hotel 3", "Hotel 4"] -> list, anything else stays a string
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def _data_loader(args: argparse.Namespace) -> Callable:
+    """
+    Create the loader of the DataService from the data source arguments.
+    """
+    if args.credentials is None and (args.city is None or args.hotel is None):
+        raise SystemExit("Give --credentials, or both --city and --hotel")
+
+    def load():
+        import pandas as pd
+
+        from rissa_plotter import CityData, HotelData, readers
+
+        if args.credentials is not None:
+            return (
+                readers.open_city_table(args.credentials),
+                readers.open_hotel_table(args.credentials),
+            )
+
+        data = []
+        for path, cls in [(args.city, CityData), (args.hotel, HotelData)]:
+            if Path(path).is_dir():
+                data.append(readers.open_arrow_table(path))
+            else:
+                df = pd.read_csv(path, parse_dates=["timestamp"])
+                data.append(cls.from_dataframe(df=df))
+        return tuple(data)
+
+    return load
+
+
+class Renderer:
+    def __init__(self, loader: Callable):
+        """
+        Render jobs with plotters that are kept per data version.
+
+        The daemon and the cold fallback of the client both render through a Renderer,
+        so a job gives the same file in both cases.
+
+        Parameters
+        ----------
+        loader : Callable
+            Loader of the DataService, see `DataService`.
+        """
+        import matplotlib
+
+        matplotlib.use("Agg")
+
+        from rissa_plotter.service import DataService
+
+        self.service = DataService(loader)
+        self._plotters = {}
+        # pyplot is not thread-safe, so jobs are rendered one at a time
+        self._lock = threading.Lock()
+
+    def plotter(self, kind: str, transparent: bool):
+        from rissa_plotter.visualize import CityPlotter, HotelPlotter
+
+        snapshot = self.service.snapshot
+        key = (snapshot.version, kind, transparent)
+        if key not in self._plotters:
+            self._plotters = {
+                k: v for k, v in self._plotters.items() if k[0] == snapshot.version
+            }
+            if kind == "city":
+                plotter = CityPlotter(snapshot.city, transparent=transparent)
+            else:
+                plotter = HotelPlotter(snapshot.hotel, transparent=transparent)
+            self._plotters[key] = plotter
+        return self._plotters[key]
+
+    def handle(self, job: dict) -> dict:
+        """
+        Run a job and return its result.
+
+        Jobs are dicts with a 'command': 'render' (with 'kind', 'method', 'kwargs',
+        'output' and optionally 'spec' and 'transparent'), 'refresh' or 'status'.
+        """
+        command = job.get("command")
+        if command == "status":
+            return {"ok": True, "version": self.service.version, "pid": os.getpid()}
+        if command == "refresh":
+            return {"ok": True, "version": self.service.refresh().version}
+        if command == "render":
+            return self._render(job)
+        return {"ok": False, "error": f"Unknown command '{command}'"}
+
+    def _render(self, job: dict) -> dict:
+        import matplotlib.pyplot as plt
+
+        from rissa_plotter.server import FIGURES
+
+        kind, method = job["kind"], job["method"]
+        if method not in FIGURES.get(kind, []):
+            return {"ok": False, "error": f"Unknown figure '{kind} {method}'"}
+
+        plotter = self.plotter(kind, job.get("transparent", False))
+        spec = job.get("spec")
+        with self._lock:
+            try:
+                result = getattr(plotter, method)(
+                    output=spec or "figure", **job.get("kwargs", {})
+                )
+            except Exception as error:
+                plt.close("all")
+                return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+            if spec is None:
+                result.savefig(job["output"])
+                plt.close(result)
+            else:
+                Path(job["output"]).write_text(json.dumps(result, default=str))
+
+        return {"ok": True, "output": job["output"], "version": self.service.version}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            job = json.loads(self.rfile.readline())
+            if job.get("command") == "stop":
+                response = {"ok": True}
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                response = self.server.renderer.handle(job)
+        except Exception as error:
+            response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def send(job: dict, path: str | Path = DEFAULT_SOCKET, timeout: float = 600) -> dict:
+    """
+    Send a job to the daemon listening on `path` and return its response.
+
+    Raises
+    ------
+    ConnectionError
+        If no daemon is listening on `path`.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise ConnectionError("Unix sockets are not available on this platform")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError) as error:
+            raise ConnectionError(f"No daemon listening on {path}") from error
+        client.sendall(json.dumps(job).encode() + b"\n")
+        with client.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def serve(renderer: Renderer, path: str | Path = DEFAULT_SOCKET):
+    """
+    Listen for jobs on the Unix socket `path` until a 'stop' job arrives.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("Unix sockets are not available on this platform")
+
+    path = Path(path)
+    if path.exists():
+        try:
+            send({"command": "status"}, path, timeout=5)
+        except ConnectionError:
+            path.unlink()  # left behind by a daemon that did not stop cleanly
+        else:
+            raise SystemExit(f"A daemon is already listening on {path}")
+
+    server = socketserver.ThreadingUnixStreamServer(str(path), _Handler)
+    server.daemon_threads = True
+    server.renderer = renderer
+    os.chmod(path, 0o600)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+def _render_job(args: argparse.Namespace) -> dict:
+    kwargs = {}
+    for item in args.set or []:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"Expected NAME=VALUE, got '{item}'")
+        kwargs[name] = _parse_value(value)
+
+    return {
+        "command": "render",
+        "kind": args.kind,
+        "method": args.method,
+        "kwargs": kwargs,
+        "output": str(Path(args.output).resolve()),
+        "spec": args.spec,
+        "transparent": args.transparent,
+    }
+
+
+def _report(response: dict) -> int:
+    if not response.get("ok"):
+        print(f"error: {response.get('error')}", file=sys.stderr)
+        return 1
+    print(" ".join(f"{key}={value}" for key, value in response.items() if key != "ok"))
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="rissa-plotter", description=__doc__)
+    parser.add_argument(
+        "--socket", default=DEFAULT_SOCKET, help=f"default is {DEFAULT_SOCKET}"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    source = argparse.ArgumentParser(add_help=False)
+    group = source.add_argument_group("data source")
+    group.add_argument("--credentials", help="Firebase service account key file")
+    group.add_argument("--city", help="City data as CSV file or Arrow directory")
+    group.add_argument("--hotel", help="Hotel data as CSV file or Arrow directory")
+
+    commands.add_parser("serve", parents=[source], help="Keep data and plotters loaded")
+
+    render = commands.add_parser(
+        "render",
+        parents=[source],
+        help="Render a figure",
+        description="Render a figure through the daemon, or in this process when no "
+        "daemon is running (then a data source is needed).",
+    )
+    render.add_argument("kind", choices=["city", "hotel"])
+    render.add_argument("method", help="Plot method, e.g. plot_timeseries")
+    render.add_argument("-o", "--output", required=True, help="Output file")
+    render.add_argument(
+        "--set",
+        action="append",
+        metavar="NAME=VALUE",
+        help="Argument of the plot method, e.g. year=2025 or figsize=[8,4]",
+    )
+    render.add_argument(
+        "--spec",
+        choices=["dict", "vega-lite"],
+        help="Write the spec of the plot as JSON instead of rendering it",
+    )
+    render.add_argument("--transparent", action="store_true")
+
+    commands.add_parser("refresh", help="Reload the data of the daemon")
+    commands.add_parser("status", help="Show the data version of the daemon")
+    commands.add_parser("stop", help="Stop the daemon")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        renderer = Renderer(_data_loader(args))
+        renderer.service.refresh()  # load before accepting jobs
+        serve(renderer, args.socket)
+        return 0
+
+    job = _render_job(args) if args.command == "render" else {"command": args.command}
+    try:
+        return _report(send(job, args.socket))
+    except ConnectionError as error:
+        if args.command != "render":
+            print(f"error: {error}", file=sys.stderr)
+            return 1
+
+    # Cold fallback: load the data and render in this process
+    return _report(Renderer(_data_loader(args)).handle(job))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,9 @@
-from .firebase import FireBase
-from .tables import open_city_table, open_hotel_table
+from .firebase import AsyncFireBase, FireBase, shutdown_clients
+from .tables import (
+    open_city_table,
+    open_city_table_async,
+    open_hotel_table,
+    open_hotel_table_async,
+)
+from .arrow import open_arrow_table, save_arrow_table
+from .live import LiveTables
@@ -0,0 +1,146 @@
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from rissa_plotter import CityData, HotelData
+from rissa_plotter.base import KittiwalkersData
+
+CLASSES = {"CityData": CityData, "HotelData": HotelData}
+TABLES = ["data", "submissions"]
+# File in the store with the name of the version directory to read
+CURRENT = "current"
+
+
+def _write_ipc(df: pd.DataFrame, file: Path, metadata: dict[str, str]):
+    """
+    Write a DataFrame to an uncompressed Arrow IPC file.
+
+    Uncompressed record batches can be memory-mapped without decoding.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    with pa.OSFile(str(file), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _replace_text(file: Path, text: str):
+    # Written under a unique name and swapped in, so readers see the old or new text
+    tmp = file.with_name(f".{file.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_text(text)
+        os.replace(tmp, file)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _remove_old_versions(path: Path, keep: int = 2):
+    # Old versions stay mapped by the processes that opened them (the files are only
+    # unlinked), and the newest ones are kept for readers that have just resolved them
+    current = (path / CURRENT).read_text().strip()
+    versions = sorted(p.name for p in path.glob("v*") if p.is_dir())
+    for version in versions[:-keep]:
+        if version != current:
+            shutil.rmtree(path / version, ignore_errors=True)
+
+
+def _map_ipc(file: Path) -> tuple[pd.DataFrame, dict[bytes, bytes]]:
+    """
+    Memory-map an Arrow IPC file as a DataFrame with Arrow-backed dtypes.
+
+    The columns wrap the mapped buffers directly, so the operating system shares one
+    physical copy of the data between all processes that open the same file.
+    """
+    source = pa.memory_map(str(file), "r")
+    table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(types_mapper=pd.ArrowDtype, split_blocks=True)
+    return df, table.schema.metadata
+
+
+def save_arrow_table(data: KittiwalkersData, path: str | Path) -> Path:
+    """
+    Save a CityData or HotelData instance as an Arrow store that can be memory-mapped.
+
+    Both tables are written to a new version directory in the store, and the version is
+    then made current by atomically replacing the 'current' file. Readers therefore
+    always open the data and submissions of the same version, also while another
+    process writes a new one. Old versions are removed, apart from the latest two.
+
+    Parameters
+    ----------
+    data : KittiwalkersData
+        The CityData or HotelData instance to store.
+    path : str or Path
+        Directory in which the store is written. It is created if it does not exist.
+
+    Returns
+    -------
+    Path
+        The directory containing the store.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    # Written under a hidden name and renamed when complete, so an unfinished version
+    # is never current nor removed as an old one
+    tmp = path / f".v{uuid.uuid4().hex}.tmp"
+    tmp.mkdir()
+    try:
+        metadata = {"rissa_plotter.class": data.__class__.__name__}
+        _write_ipc(data.data, tmp / "data.arrow", metadata)
+        _write_ipc(data.submissions, tmp / "submissions.arrow", metadata)
+
+        version = f"v{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        tmp.rename(path / version)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    _replace_text(path / CURRENT, version)
+    _remove_old_versions(path)
+    return path
+
+
+def open_arrow_table(path: str | Path, retries: int = 3) -> CityData | HotelData:
+    """
+    Open an Arrow store written by `save_arrow_table` without loading it into private memory.
+
+    Both tables are memory-mapped and kept in pandas Arrow-backed dtypes, so read-only
+    operations such as `total`, `yearly_submissions` and `submissions_per_bin` run on the
+    mapped pages that are shared by every process on the host.
+
+    Parameters
+    ----------
+    path : str or Path
+        Directory of the store.
+    retries : int, optional
+        Number of times the current version is resolved, if the resolved version is
+        removed by a writer before it is opened (default is 3).
+
+    Returns
+    -------
+    CityData or HotelData
+        An instance of the class the store was written from.
+    """
+    path = Path(path)
+    for attempt in range(retries):
+        version = path / (path / CURRENT).read_text().strip()
+        try:
+            tables = {}
+            for name in TABLES:
+                tables[name], metadata = _map_ipc(version / f"{name}.arrow")
+            break
+        except FileNotFoundError:
+            # The version was removed after it was resolved; read the new one
+            if attempt == retries - 1:
+                raise
+
+    cls = CLASSES[metadata[b"rissa_plotter.class"].decode()]
+    return cls(data=tables["data"], submissions=tables["submissions"], copy=False)
@@ -1,47 +1,136 @@
-import streamlit as st
+import asyncio
+import hashlib
+import os
+import threading
 import firebase_admin
 from firebase_admin import credentials, firestore
 import pandas as pd
 from pathlib import Path
+from typing import Any, AsyncIterator, Mapping, Optional
 
+EMULATOR_HOST = "FIRESTORE_EMULATOR_HOST"
 
-@st.cache_resource
-def initialize_firebase(path: str | Path) -> firestore.client:
+# Process-wide registry of Firestore clients, keyed by credential identity
+_clients: dict[tuple, firestore.Client] = {}
+_app_names: set[str] = set()
+_lock = threading.RLock()
+
+
+def _credential_key(path: Optional[str | Path | Mapping]) -> tuple:
+    """
+    Identify the credentials that a client is created with.
+
+    Service account files are identified by their resolved path and service account
+    mappings (e.g. Streamlit secrets) by their project, account and key id. When the
+    Firestore emulator is configured, the emulator host identifies the client.
+    """
+    if os.environ.get(EMULATOR_HOST):
+        return ("emulator", os.environ[EMULATOR_HOST])
+    if isinstance(path, Mapping):
+        return (
+            "service_account",
+            path.get("project_id"),
+            path.get("client_email"),
+            path.get("private_key_id"),
+        )
+    return ("file", str(Path(path).resolve()))
+
+
+def initialize_app(path: Optional[str | Path | Mapping]) -> firebase_admin.App:
     """
-    Initialize the Firebase Admin SDK to connect to the Firestore database.
+    Initialize the Firebase Admin SDK app for the given credentials, or return it when it already exists.
 
     Authenticates using a service account key file, which contains private credentials
-    that grant access to the Firebase project.
+    that grant access to the Firebase project. Every credential identity gets its own
+    named app, so several projects can be used in one process.
 
     Parameters
     ----------
-    path : str
-        Path to the Firebase service account key file.
+    path : str | Path | Mapping
+        Path to the Firebase service account key file, or its contents.
 
     Returns
     -------
-    firestore.client
+    firebase_admin.App
+        The Firebase app for these credentials.
+    """
+    key = _credential_key(path)
+    name = hashlib.sha1(repr(key).encode()).hexdigest()
+
+    with _lock:
+        try:
+            app = firebase_admin.get_app(name)
+        except ValueError:
+            cred = credentials.Certificate(path)
+            app = firebase_admin.initialize_app(cred, name=name)
+            _app_names.add(name)
+
+    return app
+
+
+def initialize_firebase(path: Optional[str | Path | Mapping]) -> firestore.Client:
+    """
+    Get the Firestore client for the given credentials from the process-wide registry.
+
+    The first call per credential identity creates the client; later calls, from any
+    FireBase instance or thread, reuse it and its open gRPC channel. When the
+    FIRESTORE_EMULATOR_HOST environment variable is set, an unauthenticated client
+    for the emulator is returned and `path` may be None.
+
+    Parameters
+    ----------
+    path : str | Path | Mapping
+        Path to the Firebase service account key file, or its contents.
+
+    Returns
+    -------
+    firestore.Client
         A configured Firestore client for database operations.
     """
+    key = _credential_key(path)
 
-    try:
-        app = firebase_admin.get_app()
-    except ValueError:
-        cred = credentials.Certificate(path)
-        app = firebase_admin.initialize_app(cred)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None and key[0] == "emulator":
+                client = _clients[key] = firestore.Client()
+            elif client is None:
+                client = _clients[key] = firestore.client(initialize_app(path))
 
-    return firestore.client()
+    return client
+
+
+def shutdown_clients():
+    """
+    Close all Firestore clients in the registry and delete their Firebase apps.
+
+    Clients that are requested afterwards are created again.
+    """
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        apps = [firebase_admin.get_app(name) for name in _app_names]
+        _app_names.clear()
+
+    for client in clients:
+        client.close()
+    for app in apps:
+        firebase_admin.delete_app(app)
 
 
 class FireBase:
-    def __init__(self, file: str | Path):
+    def __init__(self, file: Optional[str | Path | Mapping]):
         """
         Initialize the DataBase class with a path to the Firebase service account key file.
 
+        Connections are taken from a process-wide client registry and stay open after
+        the FireBase instance is closed; use `shutdown_clients` to close them.
+
         Parameters
         ----------
-        file : str | Path
-            Path to the Firebase service account key file.
+        file : str | Path | Mapping
+            Path to the Firebase service account key file, or its contents.
         """
 
         self.file = file
@@ -72,8 +161,8 @@ class FireBase:
         return [collection.id for collection in collections]
 
     def close_connection(self):
-        if self.connection is not None:
-            self.connection.close()
+        # The client itself is shared and stays warm in the registry
+        self.connection = None
 
     def read_table(self, table: str) -> pd.DataFrame:
         """
@@ -91,10 +180,135 @@ class FireBase:
         """
         self.get_connection()
         docs = self.connection.collection(table).stream()
-        self.close_connection()
         data = [doc.to_dict() for doc in docs]
 
         if not data:
             raise ValueError(f"No data found in {table} collection.")
 
         return pd.DataFrame(data)
+
+
+class AsyncFireBase:
+    def __init__(
+        self,
+        file: Optional[str | Path | Mapping],
+        page_size: int = 500,
+        client: Any = None,
+    ):
+        """
+        Asynchronous counterpart of FireBase, built on the Firestore AsyncClient.
+
+        Collections are downloaded in pages of `page_size` documents using cursors, and
+        several collections can be fetched concurrently with `read_tables`.
+
+        Parameters
+        ----------
+        file : str | Path | Mapping
+            Path to the Firebase service account key file, or its contents. May be None
+            when a client is given.
+        page_size : int, optional
+            Number of documents fetched per request (default is 500).
+        client : Any, optional
+            Async Firestore client to read with, which is not closed with the
+            connection. Default is a new AsyncClient for `file`. Any object whose
+            queries behave like Firestore's can be used, e.g. an in-process fake in
+            tests.
+        """
+
+        self.file = file
+        self.page_size = page_size
+        self.client = client
+        self.connection = client
+
+    async def __aenter__(self):
+        self.get_connection()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close_connection()
+
+    def get_connection(self):
+        # gRPC channels of async clients are bound to the running event loop, so
+        # every AsyncFireBase owns its client instead of sharing a cached one.
+        if self.connection is None and _credential_key(self.file)[0] == "emulator":
+            self.connection = firestore.AsyncClient()
+        elif self.connection is None:
+            app = initialize_app(self.file)
+            self.connection = firestore.AsyncClient(
+                project=app.project_id,
+                credentials=app.credential.get_credential(),
+            )
+
+    def close_connection(self):
+        if self.connection is not None and self.connection is not self.client:
+            self.connection.close()
+        self.connection = self.client
+
+    async def iter_table(self, table: str) -> AsyncIterator[pd.DataFrame]:
+        """
+        Iterate over a table from the Firestore database, one page at a time.
+
+        Parameters
+        ----------
+        table : str
+            Name of the Firestore collection to read.
+
+        Yields
+        ------
+        pd.DataFrame
+            DataFrame containing the next page of documents, ordered by document id.
+        """
+        self.get_connection()
+        query = self.connection.collection(table).order_by("__name__")
+        query = query.limit(self.page_size)
+
+        cursor = None
+        while True:
+            page = query if cursor is None else query.start_after(cursor)
+            docs = await page.get()
+            if not docs:
+                break
+
+            yield pd.DataFrame([doc.to_dict() for doc in docs])
+
+            if len(docs) < self.page_size:
+                break
+            cursor = docs[-1]
+
+    async def read_table(self, table: str) -> pd.DataFrame:
+        """
+        Read a table from the Firestore database.
+
+        Parameters
+        ----------
+        table : str
+            Name of the Firestore collection to read.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame containing the data from the specified Firestore collection.
+        """
+        pages = [page async for page in self.iter_table(table)]
+
+        if not pages:
+            raise ValueError(f"No data found in {table} collection.")
+
+        return pd.concat(pages, ignore_index=True)
+
+    async def read_tables(self, *tables: str) -> dict[str, pd.DataFrame]:
+        """
+        Read several tables from the Firestore database concurrently.
+
+        Parameters
+        ----------
+        *tables : str
+            Names of the Firestore collections to read.
+
+        Returns
+        -------
+        dict[str, pd.DataFrame]
+            DataFrames keyed by collection name.
+        """
+        data = await asyncio.gather(*(self.read_table(table) for table in tables))
+        return dict(zip(tables, data))
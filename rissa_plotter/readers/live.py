@@ -0,0 +1,229 @@
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional
+
+import pandas as pd
+
+from rissa_plotter import CityData, HotelData
+from .firebase import initialize_firebase
+from .tables import (
+    CITY_TABLES,
+    CLEANERS,
+    HOTEL_TABLES,
+    _merge_city_tables,
+    _merge_hotel_tables,
+)
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class LiveTables:
+    def __init__(
+        self,
+        file: Optional[str | Path | Mapping] = None,
+        publish: Optional[Callable[[CityData, HotelData], Any]] = None,
+        client: Any = None,
+        interval: float = 2.0,
+        deduplicate: bool = True,
+    ):
+        """
+        Keep CityData and HotelData up to date with Firestore snapshot listeners.
+
+        Every submission collection is subscribed to with `on_snapshot`. The first
+        snapshot of a collection holds all its documents, later snapshots only the
+        documents that were added, modified or removed. Changes are collected on a
+        background thread for `interval` seconds, only the changed documents are
+        cleaned, and a new version of the data is published once every collection has
+        delivered its first snapshot.
+
+        Parameters
+        ----------
+        file : str | Path | Mapping, optional
+            Path to the Firebase service account key file, or its contents. May be None
+            when a client is given or the Firestore emulator is configured.
+        publish : Callable[[CityData, HotelData], Any], optional
+            Called with every new version on the background thread, e.g.
+            `DataService.swap`.
+        client : Any, optional
+            Firestore client to subscribe with. Default is the client of `file` from the
+            process-wide registry. Any object whose `collection(name).on_snapshot()`
+            behaves like Firestore's can be used, e.g. an in-process fake in tests.
+        interval : float, optional
+            Seconds to collect changes before publishing them (default is 2.0).
+        deduplicate : bool, optional
+            If True, removes exact and near-duplicate submissions (default is True).
+        """
+        self.file = file
+        self.publish = publish
+        self.client = client
+        self.interval = interval
+        self.deduplicate = deduplicate
+
+        self.city: Optional[CityData] = None
+        self.hotel: Optional[HotelData] = None
+        self.version = -1
+
+        # Cleaned documents and raw field names per collection, indexed by document id
+        self._tables = {table: pd.DataFrame() for table in CLEANERS}
+        self._columns = {table: pd.Index([]) for table in CLEANERS}
+        self._loaded: set[str] = set()
+
+        self._events: queue.Queue = queue.Queue()
+        self._updated = threading.Condition()
+        self._watches = []
+        self._worker: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self) -> "LiveTables":
+        """
+        Subscribe to the submission collections and start the background thread.
+        """
+        if self._worker is not None:
+            return self
+
+        client = self.client
+        if client is None:
+            client = initialize_firebase(self.file)
+
+        self._worker = threading.Thread(
+            target=self._run, name="rissa-live-tables", daemon=True
+        )
+        self._worker.start()
+        self._watches = [
+            client.collection(table).on_snapshot(self._listener(table))
+            for table in CLEANERS
+        ]
+        return self
+
+    def stop(self):
+        """
+        Unsubscribe from the collections and stop the background thread.
+
+        Changes that were received but not yet published are discarded.
+        """
+        for watch in self._watches:
+            watch.unsubscribe()
+        self._watches = []
+
+        if self._worker is not None:
+            self._events.put(_STOP)
+            self._worker.join()
+            self._worker = None
+
+    def wait(
+        self, version: int = 0, timeout: Optional[float] = None
+    ) -> tuple[CityData, HotelData]:
+        """
+        Wait until at least `version` has been published and return the latest data.
+
+        Can be used as the loader of a `DataService`, which then blocks until the first
+        snapshots have arrived.
+
+        Raises
+        ------
+        TimeoutError
+            If the version is not published within `timeout` seconds.
+        """
+        with self._updated:
+            if not self._updated.wait_for(lambda: self.version >= version, timeout):
+                raise TimeoutError(f"Version {version} not published in {timeout}s")
+            return self.city, self.hotel
+
+    def _listener(self, table: str) -> Callable:
+        def on_snapshot(docs, changes, read_time):
+            # Runs on the thread of the Firestore listener, so only queue the changes
+            events = [
+                (
+                    change.document.id,
+                    (
+                        None
+                        if change.type.name == "REMOVED"
+                        else change.document.to_dict()
+                    ),
+                )
+                for change in changes
+            ]
+            self._events.put((table, events))
+
+        return on_snapshot
+
+    def _run(self):
+        while True:
+            batch = [self._events.get()]
+            deadline = time.monotonic() + self.interval
+            while batch[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._events.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            events = [event for event in batch if event is not _STOP]
+            if events:
+                try:
+                    self._apply(events)
+                except Exception:
+                    logger.exception(
+                        "Could not apply %d Firestore snapshots", len(events)
+                    )
+            if stop:
+                return
+
+    def _apply(self, events: list[tuple[str, list]]):
+        # Keep the last change of every document
+        updates: dict[str, dict] = {}
+        for table, changes in events:
+            updates.setdefault(table, {}).update(changes)
+
+        for table, docs in updates.items():
+            df = self._tables[table]
+            df = df.drop(index=df.index.intersection(list(docs)))
+
+            added = {doc_id: data for doc_id, data in docs.items() if data is not None}
+            if added:
+                raw = pd.DataFrame(list(added.values()), index=pd.Index(list(added)))
+                # Fields missing from every changed document are still expected
+                self._columns[table] = self._columns[table].union(
+                    raw.columns, sort=False
+                )
+                raw = raw.reindex(columns=self._columns[table])
+                cleaned = CLEANERS[table](raw)
+                df = cleaned if df.empty else pd.concat([df, cleaned])
+
+            self._tables[table] = df
+            self._loaded.add(table)
+
+        if not self._loaded.issuperset(CLEANERS):
+            return
+
+        city, hotel = self.city, self.hotel
+        if city is None or not updates.keys().isdisjoint(CITY_TABLES):
+            tables = {table: self._tables[table] for table in CITY_TABLES}
+            city = _merge_city_tables(tables, save=False, deduplicate=self.deduplicate)
+        if hotel is None or not updates.keys().isdisjoint(HOTEL_TABLES):
+            tables = {table: self._tables[table] for table in HOTEL_TABLES}
+            hotel = _merge_hotel_tables(
+                tables, save=False, deduplicate=self.deduplicate
+            )
+
+        with self._updated:
+            self.city, self.hotel = city, hotel
+            self.version += 1
+            self._updated.notify_all()
+        logger.info("Published version %d of the live tables", self.version)
+
+        if self.publish is not None:
+            self.publish(city, hotel)
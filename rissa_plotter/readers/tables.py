@@ -1,9 +1,20 @@
 from pathlib import Path
 import ast
+import logging
+from typing import Any, Optional
 import pandas as pd
 
 from rissa_plotter import util, HotelData, CityData
-from rissa_plotter.readers import FireBase
+from rissa_plotter.readers import AsyncFireBase, FireBase
+
+CITY_TABLES = ["submissionsKittiwakesCity", "submissionsKittiwakesCity2324"]
+HOTEL_TABLES = [
+    "submissionsKittiwakesHotels",
+    "submissionsKittiwakesHotels2324",
+    "submissionsKittiwakesGeneralHotels",
+]
+
+logger = logging.getLogger(__name__)
 
 
 def _clean_city_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -11,7 +22,7 @@ def _clean_city_data(df: pd.DataFrame) -> pd.DataFrame:
     Cleans and preprocesses city data in a DataFrame.
 
     """
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df["timestamp"] = util.parse_timestamps(df["timestamp"])
     df["adultCount"] = pd.to_numeric(df["adultCount"])
     df["aonCount"] = pd.to_numeric(df["aonCount"])
     df["groupSize"] = (
@@ -26,7 +37,7 @@ def _clean_hotel_t1_data(df: pd.DataFrame) -> pd.DataFrame:
     Cleans and standardizes hotel type 1 data (Hotel 1 to 5), parsing ledge statuses and computing summary columns.
 
     """
-    df["timestamp"] = pd.to_datetime(df["timestamp"], format="mixed")
+    df["timestamp"] = util.parse_timestamps(df["timestamp"])
     df["hotel"] = df["hotel"].replace(
         {"Hotel 3 (green)": "Hotel 3", "Hotel 4 (metal)": "Hotel 4"}
     )
@@ -67,6 +78,10 @@ def _clean_hotel_t1_data(df: pd.DataFrame) -> pd.DataFrame:
         "three_chicks",
     ]
     df[cols[2:]] = df[cols[2:]].astype(int)
+
+    # Keep the user for detecting duplicate submissions
+    if "userId" in df:
+        cols.append("userId")
     return df[cols]
 
 
@@ -75,14 +90,44 @@ def _clean_hotel_t2_data(df: pd.DataFrame) -> pd.DataFrame:
     Cleans and converts columns in the hotel T2 (hotel 6-9) data DataFrame.
 
     """
-    df["timestamp"] = pd.to_datetime(df["timestamp"], format="mixed")
+    df["timestamp"] = util.parse_timestamps(df["timestamp"])
 
     cols = ["adultCount", "aonCount", "chickCount"]
     df[cols] = df[cols].apply(pd.to_numeric)
     return df
 
 
-def open_city_table(path: str | Path, save: bool = False) -> pd.DataFrame:
+# Cleaning function of every collection
+CLEANERS = {
+    "submissionsKittiwakesCity": _clean_city_data,
+    "submissionsKittiwakesCity2324": _clean_city_data,
+    "submissionsKittiwakesHotels": _clean_hotel_t1_data,
+    "submissionsKittiwakesHotels2324": _clean_hotel_t1_data,
+    "submissionsKittiwakesGeneralHotels": _clean_hotel_t2_data,
+}
+
+
+def _drop_duplicates(df: pd.DataFrame, entity: str, columns: list[str]) -> pd.DataFrame:
+    """
+    Removes duplicate submissions, e.g. observations present in both the current and legacy collections.
+
+    """
+    df, dropped = util.drop_duplicate_submissions(df, entity=entity, columns=columns)
+    if len(dropped):
+        counts = dropped["duplicate"].value_counts()
+        logger.info(
+            "Dropped %d duplicate %s submissions (%d exact, %d near)",
+            len(dropped),
+            entity,
+            counts.get("exact", 0),
+            counts.get("near", 0),
+        )
+    return df
+
+
+def open_city_table(
+    path: str | Path, save: bool = False, deduplicate: bool = True
+) -> pd.DataFrame:
     """
     Reads and processes city table data from a FireBase database, combining current and legacy data (2023-2024), optionally saving the result to a CSV file.
 
@@ -92,6 +137,8 @@ def open_city_table(path: str | Path, save: bool = False) -> pd.DataFrame:
         The file path or Path object pointing to the FireBase database.
     save : bool, optional
         If True, exports the processed data to a CSV file for archiving (default is False).
+    deduplicate : bool, optional
+        If True, removes exact and near-duplicate submissions (default is True).
     Returns
     -------
     CityData
@@ -99,12 +146,54 @@ def open_city_table(path: str | Path, save: bool = False) -> pd.DataFrame:
 
     """
     with FireBase(path) as fb:
-        current = _clean_city_data(fb.read_table("submissionsKittiwakesCity"))
-        legacy = _clean_city_data(fb.read_table("submissionsKittiwakesCity2324"))
+        tables = {table: fb.read_table(table) for table in CITY_TABLES}
+
+    return _combine_city_tables(tables, save=save, deduplicate=deduplicate)
+
+
+async def open_city_table_async(
+    path: Optional[str | Path],
+    save: bool = False,
+    deduplicate: bool = True,
+    client: Any = None,
+) -> CityData:
+    """
+    Asynchronous version of `open_city_table`, which downloads the current and legacy
+    collections concurrently. A `client` is passed to `AsyncFireBase`.
+
+    """
+    async with AsyncFireBase(path, client=client) as fb:
+        tables = await fb.read_tables(*CITY_TABLES)
+
+    return _combine_city_tables(tables, save=save, deduplicate=deduplicate)
+
+
+def _combine_city_tables(
+    tables: dict[str, pd.DataFrame], save: bool, deduplicate: bool
+) -> CityData:
+    """
+    Cleans and combines the current and legacy city collections into CityData.
+
+    """
+    tables = {table: CLEANERS[table](df) for table, df in tables.items()}
+    return _merge_city_tables(tables, save=save, deduplicate=deduplicate)
+
+
+def _merge_city_tables(
+    tables: dict[str, pd.DataFrame], save: bool, deduplicate: bool
+) -> CityData:
+    """
+    Combines the cleaned current and legacy city collections into CityData.
+
+    """
+    current = tables["submissionsKittiwakesCity"]
+    legacy = tables["submissionsKittiwakesCity2324"]
 
     # Combine current and legacy data
     df = pd.concat([legacy, current], ignore_index=True)
     df = df.sort_values(by=["timestamp", "station"], ascending=[True, True])
+    if deduplicate:
+        df = _drop_duplicates(df, "station", ["adultCount", "aonCount"])
     df.reset_index(drop=True, inplace=True)
 
     columns = [
@@ -123,7 +212,9 @@ def open_city_table(path: str | Path, save: bool = False) -> pd.DataFrame:
     return CityData.from_dataframe(df=df[columns])
 
 
-def open_hotel_table(path: str | Path, save: bool = False) -> pd.DataFrame:
+def open_hotel_table(
+    path: str | Path, save: bool = False, deduplicate: bool = True
+) -> pd.DataFrame:
     """
     Reads and processes hotel table data from a Firebase database, combining type 1 and 2 data and old data from previous years (2023-2024),    cleaning the data, and returning a standardized DataFrame or HotelData object.
     Parameters
@@ -133,6 +224,8 @@ def open_hotel_table(path: str | Path, save: bool = False) -> pd.DataFrame:
     save : bool, optional
         If True, saves the processed hotel data to a CSV file for debugging or archiving
         (default is False).
+    deduplicate : bool, optional
+        If True, removes exact and near-duplicate submissions (default is True).
     Returns
     -------
     HotelData
@@ -140,13 +233,56 @@ def open_hotel_table(path: str | Path, save: bool = False) -> pd.DataFrame:
 
     """
     with FireBase(path) as fb:
-        t1_new = _clean_hotel_t1_data(fb.read_table("submissionsKittiwakesHotels"))
-        t1_old = _clean_hotel_t1_data(fb.read_table("submissionsKittiwakesHotels2324"))
-        t2 = _clean_hotel_t2_data(fb.read_table("submissionsKittiwakesGeneralHotels"))
+        tables = {table: fb.read_table(table) for table in HOTEL_TABLES}
+
+    return _combine_hotel_tables(tables, save=save, deduplicate=deduplicate)
+
+
+async def open_hotel_table_async(
+    path: Optional[str | Path],
+    save: bool = False,
+    deduplicate: bool = True,
+    client: Any = None,
+) -> HotelData:
+    """
+    Asynchronous version of `open_hotel_table`, which downloads the three hotel
+    collections concurrently. A `client` is passed to `AsyncFireBase`.
+
+    """
+    async with AsyncFireBase(path, client=client) as fb:
+        tables = await fb.read_tables(*HOTEL_TABLES)
+
+    return _combine_hotel_tables(tables, save=save, deduplicate=deduplicate)
+
+
+def _combine_hotel_tables(
+    tables: dict[str, pd.DataFrame], save: bool, deduplicate: bool
+) -> HotelData:
+    """
+    Cleans and combines the type 1, legacy type 1 and type 2 hotel collections into HotelData.
+
+    """
+    tables = {table: CLEANERS[table](df) for table, df in tables.items()}
+    return _merge_hotel_tables(tables, save=save, deduplicate=deduplicate)
+
+
+def _merge_hotel_tables(
+    tables: dict[str, pd.DataFrame], save: bool, deduplicate: bool
+) -> HotelData:
+    """
+    Combines the cleaned type 1, legacy type 1 and type 2 hotel collections into HotelData.
+
+    """
+    t1_new = tables["submissionsKittiwakesHotels"]
+    t1_old = tables["submissionsKittiwakesHotels2324"]
+    t2 = tables["submissionsKittiwakesGeneralHotels"]
 
     # Combine and sort T1 and T2 data
     df = pd.concat([t1_old, t1_new, t2], ignore_index=True)
     df = df.sort_values(by=["timestamp", "hotel"]).reset_index(drop=True)
+    if deduplicate:
+        counts = ["adultCount", "aonCount", "nestCount", "chickCount"]
+        df = _drop_duplicates(df, "hotel", counts).reset_index(drop=True)
 
     # Expected output columns (ensure all are present in the data)
     columns = [
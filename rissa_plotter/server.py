@@ -0,0 +1,408 @@
+import io
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, NamedTuple, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import xarray as xr
+
+from rissa_plotter.service import DataService, Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Data methods that can be requested, per kind of data
+AGGREGATES = {
+    "city": [
+        "total_adults",
+        "total_aons",
+        "yearly_submissions",
+        "daily_submissions",
+        "submissions_per_bin",
+    ],
+    "hotel": [
+        "total_adults",
+        "total_aons",
+        "total_nests",
+        "total_chicks",
+        "capacity_table",
+        "chicks_per_nest",
+        "yearly_submissions",
+        "daily_submissions",
+        "submissions_per_bin",
+    ],
+}
+
+# Plotter methods that can be requested, per kind of data
+FIGURES = {
+    "city": [
+        "plot_timeseries",
+        "station_grid",
+        "compare_years",
+        "plot_submissions_per_station",
+        "plot_submissions_per_bin",
+        "plot_submissions",
+    ],
+    "hotel": [
+        "chick_counts",
+        "capacity_used",
+        "compare_years",
+        "plot_submissions",
+        "plot_submissions_per_bin",
+    ],
+}
+
+# Types of the query parameters, lists are given by repeating the parameter
+PARAMETERS = {
+    "year": int,
+    "percentile": float,
+    "frequency": str,
+    "date": str,
+    "station": str,
+    "hotel": str,
+    "variable": str,
+    "ncols": int,
+    "bands": float,
+    "stations": list,
+    "hotels": list,
+}
+
+# Smallest valid value of numeric query parameters the plotters do not check themselves
+MINIMUMS = {
+    "ncols": 1,
+}
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "png": "image/png",
+    "vega-lite": "application/json",
+}
+
+
+class Response(NamedTuple):
+    """
+    Status, content type and body of a response, shared between identical requests.
+    """
+
+    status: int
+    content_type: str
+    body: bytes
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _internal_error(error: Exception) -> HTTPError:
+    logger.error("Request failed", exc_info=error)
+    return HTTPError(
+        HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(error).__name__}: {error}"
+    )
+
+
+def _to_frame(result: Any) -> pd.DataFrame:
+    """
+    Convert an aggregate (DataArray, Dataset, Series or DataFrame) to a flat DataFrame.
+    """
+    if isinstance(result, xr.DataArray):
+        result = result.to_dataframe(name=result.name or "value")
+    elif isinstance(result, xr.Dataset):
+        result = result.to_dataframe()
+    elif isinstance(result, pd.Series):
+        result = result.to_frame(result.name or "value")
+
+    if not isinstance(result.index, pd.RangeIndex):
+        result = result.reset_index()
+    return result
+
+
+def _to_json(data: Any) -> bytes:
+    return json.dumps(data, default=str).encode()
+
+
+def _to_arrow(df: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class DataServer:
+    def __init__(
+        self,
+        service: DataService,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_responses: int = 512,
+    ):
+        """
+        HTTP API for the aggregates and figures of a DataService.
+
+        Endpoints (GET):
+
+        - `/` lists the endpoints and the current data version.
+        - `/{kind}/{method}?{parameters}&format=json|arrow` returns an aggregate, e.g.
+          `/city/total_adults?year=2025&station=01`.
+        - `/{kind}/plot/{method}?{parameters}&format=png|json|vega-lite` returns a
+          rendered figure or its specification, e.g. `/hotel/plot/compare_years`.
+
+        `kind` is 'city' or 'hotel'. Every request is answered from one snapshot of the
+        data. Its response carries an ETag of this server and the snapshot version, and
+        a request whose If-None-Match matches the current tag is answered with 304 Not
+        Modified before anything is computed. Responses are kept in memory per
+        version, and aggregates are computed through the proxies of the snapshot (see
+        `DataService.proxies`), so identical concurrent requests are computed once.
+
+        Parameters
+        ----------
+        service : DataService
+            Service that holds the data.
+        host : str, optional
+            Address to listen on (default is '127.0.0.1').
+        port : int, optional
+            Port to listen on (default is 8000, 0 picks a free port).
+        max_responses : int, optional
+            Number of responses kept in memory (default is 512).
+        """
+        self.service = service
+        self.max_responses = max_responses
+        # Versions start at 0 in every process, so tags of an earlier server process
+        # must not match; every server has its own nonce
+        self.nonce = uuid.uuid4().hex[:12]
+
+        self._responses: OrderedDict[tuple, Response] = OrderedDict()
+        self._lock = threading.Lock()
+        # pyplot is not thread-safe, so figures are rendered one at a time
+        self._render_lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def etag(self, snapshot: Optional[Snapshot] = None) -> str:
+        if snapshot is None:
+            snapshot = self.service.snapshot
+        return f'"{self.nonce}-{snapshot.version}"'
+
+    def respond(self, target: str, snapshot: Optional[Snapshot] = None) -> Response:
+        """
+        Answer a GET request for `target` (path and query), from memory if possible.
+
+        Parameters
+        ----------
+        target : str
+            Path and query of the request.
+        snapshot : Snapshot, optional
+            Data to answer from. Default is the current snapshot of the service.
+
+        Raises
+        ------
+        HTTPError
+            If the endpoint or its parameters are invalid (400 or 404), or computing
+            the response failed (500).
+        """
+        if snapshot is None:
+            snapshot = self.service.snapshot
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        version = snapshot.version
+        key = (
+            version,
+            url.path,
+            tuple(sorted((k, tuple(v)) for k, v in query.items())),
+        )
+
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                return response
+
+        response = self._compute(snapshot, url.path, query)
+
+        with self._lock:
+            # Responses of a snapshot that was swapped out meanwhile are not kept
+            if version != self.service.version:
+                return response
+            self._responses[key] = response
+            # Drop responses of old versions first, then the least recently used
+            for old in [k for k in self._responses if k[0] != version]:
+                del self._responses[old]
+            while len(self._responses) > self.max_responses:
+                self._responses.popitem(last=False)
+        return response
+
+    def _compute(
+        self, snapshot: Snapshot, path: str, query: dict[str, list[str]]
+    ) -> Response:
+        parts = [part for part in path.split("/") if part]
+        format = query.pop("format", [None])[-1]
+
+        if not parts:
+            index = {
+                "version": snapshot.version,
+                "aggregates": AGGREGATES,
+                "figures": FIGURES,
+                "parameters": list(PARAMETERS),
+            }
+            return Response(HTTPStatus.OK, CONTENT_TYPES["json"], _to_json(index))
+
+        kind, *method = parts
+        if kind not in AGGREGATES:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown data '{kind}'")
+
+        kwargs = self._parameters(query)
+        if len(method) == 1 and method[0] in AGGREGATES[kind]:
+            return self._aggregate(snapshot, kind, method[0], kwargs, format or "json")
+        if len(method) == 2 and method[0] == "plot" and method[1] in FIGURES[kind]:
+            return self._figure(snapshot, kind, method[1], kwargs, format or "png")
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown endpoint '{path}'")
+
+    @staticmethod
+    def _parameters(query: dict[str, list[str]]) -> dict[str, Any]:
+        kwargs = {}
+        for name, values in query.items():
+            if name not in PARAMETERS:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown parameter '{name}'")
+            kind = PARAMETERS[name]
+            try:
+                kwargs[name] = list(values) if kind is list else kind(values[-1])
+            except ValueError:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST, f"Invalid value for '{name}': {values[-1]}"
+                )
+            if name in MINIMUMS and kwargs[name] < MINIMUMS[name]:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"'{name}' should be at least {MINIMUMS[name]}, got {kwargs[name]}",
+                )
+        return kwargs
+
+    def _aggregate(
+        self, snapshot: Snapshot, kind: str, method: str, kwargs: dict, format: str
+    ) -> Response:
+        if format not in ["json", "arrow"]:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown format '{format}'")
+
+        city, hotel = self.service.proxies(snapshot)
+        data = city if kind == "city" else hotel
+        try:
+            result = getattr(data, method)(**kwargs)
+        except (TypeError, KeyError, ValueError) as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(error))
+        except Exception as error:
+            raise _internal_error(error)
+
+        df = _to_frame(result)
+        if format == "arrow":
+            body = _to_arrow(df)
+        else:
+            body = df.to_json(orient="records", date_format="iso").encode()
+        return Response(HTTPStatus.OK, CONTENT_TYPES[format], body)
+
+    def _figure(
+        self, snapshot: Snapshot, kind: str, method: str, kwargs: dict, format: str
+    ) -> Response:
+        if format not in ["png", "json", "vega-lite"]:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown format '{format}'")
+
+        import matplotlib.pyplot as plt
+
+        from rissa_plotter.visualize import CityPlotter, HotelPlotter
+
+        if kind == "city":
+            plotter = CityPlotter(snapshot.city, transparent=False)
+        else:
+            plotter = HotelPlotter(snapshot.hotel, transparent=False)
+
+        output = {"png": "figure", "json": "dict", "vega-lite": "vega-lite"}[format]
+        with self._render_lock:
+            try:
+                result = getattr(plotter, method)(output=output, **kwargs)
+                if format != "png":
+                    body = _to_json(result)
+                else:
+                    buffer = io.BytesIO()
+                    result.savefig(buffer, format="png")
+                    body = buffer.getvalue()
+            except (TypeError, KeyError, ValueError) as error:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, str(error))
+            except Exception as error:
+                raise _internal_error(error)
+            finally:
+                # Also the figures of a failed render, which would leak otherwise
+                plt.close("all")
+        return Response(HTTPStatus.OK, CONTENT_TYPES[format], body)
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this, keep-alive
+            # clients wait for a delayed ACK on every response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                # One snapshot for the tag and the response, also during a swap
+                snapshot = server.service.snapshot
+                etag = server.etag(snapshot)
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(HTTPStatus.NOT_MODIFIED, etag)
+                    return
+
+                try:
+                    response = server.respond(self.path, snapshot)
+                except Exception as error:
+                    if not isinstance(error, HTTPError):
+                        error = _internal_error(error)
+                    body = _to_json({"error": error.message})
+                    self._send(error.status, etag, CONTENT_TYPES["json"], body)
+                    return
+                self._send(response.status, etag, response.content_type, response.body)
+
+            def _send(self, status, etag, content_type=None, body=b""):
+                self.send_response(status)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                if content_type is not None:
+                    self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Requests are not logged to stderr; use a proxy for access logs
+                pass
+
+        return Handler
@@ -0,0 +1,217 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, NamedTuple, Optional
+
+from rissa_plotter import CityData, HotelData
+
+
+class Snapshot(NamedTuple):
+    """
+    Immutable pair of city and hotel data, published together under one version.
+    """
+
+    city: CityData
+    hotel: HotelData
+    version: int
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Convert (nested) lists, tuples, sets and dicts into hashable equivalents for use in request keys.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+class DataService:
+    def __init__(
+        self,
+        loader: Callable[[], tuple[CityData, HotelData]],
+        max_results: int = 256,
+    ):
+        """
+        Thread-safe, read-mostly access to CityData and HotelData shared by concurrent sessions.
+
+        The current data is held in an immutable `Snapshot`. Reading it is a single
+        attribute access without locks, and `refresh` or `swap` replace it atomically.
+        The proxies of `proxies` stay on the snapshot they were taken from, so a request
+        or render that takes them once sees one consistent version. Identical concurrent
+        requests made through `get` (or the proxies) are computed once and shared.
+
+        Parameters
+        ----------
+        loader : Callable[[], tuple[CityData, HotelData]]
+            Function that loads new city and hotel data, e.g. `readers.open_city_table`
+            and `readers.open_hotel_table` combined.
+        max_results : int, optional
+            Number of results kept per snapshot (default is 256).
+        """
+        self.loader = loader
+        self.max_results = max_results
+
+        self._snapshot: Optional[Snapshot] = None
+        self._results: dict[tuple, Any] = {}
+        self._pending: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> Snapshot:
+        """
+        The current snapshot, loaded on first access.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+
+    @property
+    def city(self) -> "_DataProxy":
+        """
+        Proxy of the city data of the current snapshot, see `proxies`.
+        """
+        return _DataProxy(self, self.snapshot, "city")
+
+    @property
+    def hotel(self) -> "_DataProxy":
+        """
+        Proxy of the hotel data of the current snapshot, see `proxies`.
+        """
+        return _DataProxy(self, self.snapshot, "hotel")
+
+    def proxies(
+        self, snapshot: Optional[Snapshot] = None
+    ) -> tuple["_DataProxy", "_DataProxy"]:
+        """
+        Stand-ins for the city and hotel data of one snapshot, e.g. for the plotters.
+
+        Parameters
+        ----------
+        snapshot : Snapshot, optional
+            Snapshot to answer from, also after a swap. Default is the current snapshot.
+
+        Returns
+        -------
+        tuple[_DataProxy, _DataProxy]
+            Proxies of the city and hotel data.
+        """
+        if snapshot is None:
+            snapshot = self.snapshot
+        return _DataProxy(self, snapshot, "city"), _DataProxy(self, snapshot, "hotel")
+
+    def swap(self, city: CityData, hotel: HotelData) -> Snapshot:
+        """
+        Publish new data as the current snapshot.
+
+        Requests that are already running finish on the snapshot they started with.
+        """
+        with self._lock:
+            version = 0 if self._snapshot is None else self._snapshot.version + 1
+            self._snapshot = Snapshot(city, hotel, version)
+            self._results = {}
+        return self._snapshot
+
+    def refresh(self) -> Snapshot:
+        """
+        Load new data with the loader and swap it in.
+
+        Concurrent refreshes are collapsed: a thread that waited for another refresh to
+        finish returns that refresh's snapshot instead of loading again.
+        """
+        snapshot = self._snapshot
+        with self._refresh_lock:
+            if self._snapshot is not snapshot and self._snapshot is not None:
+                return self._snapshot
+            city, hotel = self.loader()
+            return self.swap(city, hotel)
+
+    def get(self, kind: str, method: str, /, *args, **kwargs) -> Any:
+        """
+        Call a method of the current city or hotel data, sharing the result between identical requests.
+
+        Parameters
+        ----------
+        kind : str
+            'city' or 'hotel'.
+        method : str
+            Name of the CityData or HotelData method, e.g. 'total_aons'.
+        *args, **kwargs
+            Arguments passed to the method.
+
+        Returns
+        -------
+        Any
+            The result of the method. It is shared between callers and should not be modified.
+        """
+        return self._get(self.snapshot, kind, method, args, kwargs)
+
+    def _get(
+        self, snapshot: Snapshot, kind: str, method: str, args: tuple, kwargs: dict
+    ) -> Any:
+        key = (snapshot.version, kind, method, _freeze(args), _freeze(kwargs))
+
+        try:
+            return self._results[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            data = getattr(snapshot, kind)
+            result = getattr(data, method)(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._pending[key]
+                if future.exception() is None and key[0] == self._snapshot.version:
+                    if len(self._results) >= self.max_results:
+                        self._results.pop(next(iter(self._results)))
+                    self._results[key] = future.result()
+
+        return result
+
+
+class _DataProxy:
+    """
+    Stand-in for the CityData or HotelData of one snapshot of a DataService, e.g. for
+    the plotters.
+
+    Attributes are read from the snapshot and method calls on it are shared between
+    identical requests, as in `DataService.get`.
+    """
+
+    def __init__(self, service: DataService, snapshot: Snapshot, kind: str):
+        self._service = service
+        self._snapshot = snapshot
+        self._kind = kind
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(getattr(self._snapshot, self._kind), name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self._service._get(self._snapshot, self._kind, name, args, kwargs)
+
+        return call
@@ -1,9 +1,24 @@
 from .hotels import count_adults, count_chicks, count_nests, max_nestcount
-from .general import assign_to_nearest, expanded_daterange, resample
+from .general import (
+    add_time_columns,
+    assign_to_nearest,
+    bootstrap_percentiles,
+    expanded_daterange,
+    parse_timestamps,
+    resample,
+)
 from .plotting import (
+    PLOT_EPOCH,
     ColorMap,
     get_chelsea_font,
     get_logo,
+    assign_plotting_date,
+    day_of_season,
     plotting_date,
     create_hotel_title,
 )
+from .sparse import SparseGrid
+from .dedup import SubmissionIndex, drop_duplicate_submissions
+from . import kernels
+from .spatial import SpatialIndex, load_station_locations
+from .pyramid import AggregatePyramid
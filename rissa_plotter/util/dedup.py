@@ -0,0 +1,200 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class SubmissionIndex:
+    """
+    Hash index over normalized submission keys, used to detect duplicate submissions.
+
+    A submission is keyed by its entity, counts, user and timestamp. Two submissions
+    are exact duplicates when all keys are equal, and near duplicates when only their
+    timestamps fall in the same bucket of one of two grids of width `tolerance`, offset
+    by half a bucket, so that every check is a hash lookup instead of a pairwise
+    comparison. Submissions less than half of `tolerance` apart always share a bucket
+    and are near duplicates. Submissions further apart, but less than `tolerance`, are
+    near duplicates only when they share a bucket, depending on where they fall on the
+    grids. Submissions `tolerance` or more apart are never near duplicates. A
+    submission is only dropped as a duplicate of a kept submission, so near duplicates
+    do not chain.
+
+    Without a user column (as in the city collections) the user is not part of the
+    key, so different observers reporting the same counts at the same entity within
+    the tolerance are merged into one submission.
+
+    Parameters
+    ----------
+    entity : str
+        Name of the entity column (e.g. 'station' or 'hotel').
+    columns : list[str]
+        Count columns that are part of the key. Columns missing from a DataFrame are ignored.
+    user : str, optional
+        Name of the user column (default is 'userId'). Ignored when missing.
+    tolerance : str, optional
+        Width of the timestamp buckets for near duplicates (default is '10min'). Near
+        duplicates are always less than `tolerance` apart, and always detected when
+        less than half of it apart.
+    """
+
+    KEYS = ["exact", "near", "near_offset"]
+
+    def __init__(
+        self,
+        entity: str,
+        columns: list[str],
+        user: str = "userId",
+        tolerance: str = "10min",
+    ):
+        self.entity = entity
+        self.columns = columns
+        self.user = user
+        self.tolerance = pd.Timedelta(tolerance).value
+        self._hashes = {key: np.array([], dtype=np.uint64) for key in self.KEYS}
+
+    def __len__(self):
+        return len(self._hashes["exact"])
+
+    def _key_hashes(self, df: pd.DataFrame) -> dict[str, np.ndarray]:
+        keys = pd.DataFrame(
+            {
+                self.entity: df[self.entity].astype("string").str.strip(),
+                **{
+                    column: pd.to_numeric(df[column], errors="coerce").fillna(-1)
+                    for column in self.columns
+                    if column in df
+                },
+            }
+        )
+        if self.user in df:
+            keys[self.user] = df[self.user].astype("string").fillna("")
+
+        timestamps = df["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        buckets = {
+            "exact": timestamps,
+            "near": timestamps // self.tolerance,
+            "near_offset": (timestamps + self.tolerance // 2) // self.tolerance,
+        }
+
+        hashes = {}
+        for key, bucket in buckets.items():
+            hashes[key] = pd.util.hash_pandas_object(
+                keys.assign(timestamp=bucket), index=False
+            ).to_numpy()
+        return hashes
+
+    def _classify(self, df: pd.DataFrame, hashes: dict[str, np.ndarray]) -> np.ndarray:
+        indexed = {
+            key: np.isin(values, self._hashes[key]) for key, values in hashes.items()
+        }
+        near = indexed["near"] | indexed["near_offset"]
+        reason = np.where(indexed["exact"], "exact", np.where(near, "near", None))
+
+        # Rows that share no hash with another row only depend on the index. The others
+        # are walked in timestamp order and matched against the rows kept so far only,
+        # so that a dropped row never causes a later one to be dropped.
+        shared = np.zeros(len(df), dtype=bool)
+        for values in hashes.values():
+            shared |= pd.Series(values).duplicated(keep=False).to_numpy()
+        rows = np.flatnonzero(shared & ~indexed["exact"] & ~near)
+        timestamps = df["timestamp"].to_numpy(dtype="datetime64[ns]")[rows]
+        rows = rows[np.argsort(timestamps, kind="stable")]
+
+        kept = {key: set() for key in self.KEYS}
+        for row in rows:
+            exact, near, near_offset = (hashes[key][row] for key in self.KEYS)
+            if exact in kept["exact"]:
+                reason[row] = "exact"
+            elif near in kept["near"] or near_offset in kept["near_offset"]:
+                reason[row] = "near"
+            else:
+                kept["exact"].add(exact)
+                kept["near"].add(near)
+                kept["near_offset"].add(near_offset)
+        return reason
+
+    def check(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Classify submissions as duplicates of indexed submissions or of kept rows in `df`.
+
+        The rows of `df` are taken in timestamp order, and a row is only compared with
+        the indexed submissions and the earlier rows that are not duplicates themselves.
+        Checking a batch therefore gives the same result as adding its rows one by one
+        in timestamp order.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Submissions with a 'timestamp', entity and count columns.
+
+        Returns
+        -------
+        pd.Series
+            'exact', 'near' or missing (not a duplicate) for every row of `df`.
+        """
+        reason = self._classify(df, self._key_hashes(df))
+        return pd.Series(reason, index=df.index, dtype="string")
+
+    def add(self, df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Add new submissions to the index, skipping duplicates.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Submissions with a 'timestamp', entity and count columns.
+
+        Returns
+        -------
+        tuple[pd.DataFrame, pd.DataFrame]
+            The submissions that were added, and the dropped duplicates with a
+            'duplicate' column holding 'exact' or 'near'.
+        """
+        hashes = self._key_hashes(df)
+        reason = pd.Series(self._classify(df, hashes), index=df.index, dtype="string")
+        keep = reason.isna().to_numpy()
+
+        for key, values in hashes.items():
+            self._hashes[key] = np.concatenate([self._hashes[key], values[keep]])
+
+        dropped = df[~keep].assign(duplicate=reason[~keep])
+        return df[keep], dropped
+
+
+def drop_duplicate_submissions(
+    df: pd.DataFrame,
+    entity: str,
+    columns: list[str],
+    user: str = "userId",
+    tolerance: str = "10min",
+    index: Optional[SubmissionIndex] = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Remove exact and near-duplicate submissions, see `SubmissionIndex`.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Submissions with a 'timestamp', entity and count columns.
+    entity : str
+        Name of the entity column (e.g. 'station' or 'hotel').
+    columns : list[str]
+        Count columns that are part of the key.
+    user : str, optional
+        Name of the user column (default is 'userId').
+    tolerance : str, optional
+        Width of the timestamp buckets for near duplicates (default is '10min'). Near
+        duplicates are always less than `tolerance` apart, and always detected when
+        less than half of it apart.
+    index : SubmissionIndex, optional
+        Existing index to check against and extend. If None, a new index is used.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame]
+        The submissions without duplicates, and the dropped duplicates with a
+        'duplicate' column holding 'exact' or 'near'.
+    """
+    if index is None:
+        index = SubmissionIndex(entity, columns, user=user, tolerance=tolerance)
+    return index.add(df)
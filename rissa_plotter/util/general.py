@@ -1,6 +1,10 @@
 import numpy as np
 import pandas as pd
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from pandas.tseries.api import guess_datetime_format
+from typing import List, Optional
+
+from . import kernels
 
 
 def expanded_daterange(start: pd.Timestamp, end: pd.Timestamp, freq: str = "SME"):
@@ -46,8 +50,10 @@ def assign_to_nearest(
     timestamps = timestamps.to_numpy()
     fixed_dates = fixed_dates.to_numpy()
 
-    diffs = np.abs(timestamps[:, None] - fixed_dates[None, :])
-    nearest_indices = diffs.argmin(axis=1)
+    nearest_indices = kernels.nearest_bin(
+        timestamps.astype("datetime64[ns]").view(np.int64),
+        fixed_dates.astype("datetime64[ns]").view(np.int64),
+    )
 
     return pd.Series(fixed_dates[nearest_indices], index=timestamps)
 
@@ -79,9 +85,171 @@ def resample(
 
     """
     if 0.0 <= percentile <= 1.0:
-        df[columns] = df[columns].astype(float)
-        grouped = df.groupby(by)
-        resampled = grouped[columns].quantile(percentile, interpolation="linear")
-        return resampled.reset_index()
+        # rows with a missing key are dropped, as in DataFrame.groupby
+        df = df[df[by].notna().all(axis=1)]
+        levels, uniques = zip(*(pd.factorize(df[key], sort=True) for key in by))
+        shape = tuple(len(unique) for unique in uniques)
+        groups, codes = np.unique(
+            np.ravel_multi_index(levels, shape), return_inverse=True
+        )
+
+        resampled = pd.DataFrame(
+            {
+                key: unique[level]
+                for key, unique, level in zip(
+                    by, uniques, np.unravel_index(groups, shape)
+                )
+            }
+        )
+        for column in columns:
+            values = df[column].to_numpy(dtype=float, na_value=np.nan)
+            resampled[column] = kernels.grouped_quantile(
+                codes, values, len(groups), percentile
+            )
+        return resampled
     else:
         raise ValueError("Percentile should be strictly between 0.0 and 1.0")
+
+
+def bootstrap_percentiles(
+    codes: np.ndarray,
+    values: np.ndarray,
+    n_groups: int,
+    percentile: float,
+    n_boot: int = 1000,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = 2**20,
+) -> np.ndarray:
+    """
+    Bootstrap the percentile of the values of every group.
+
+    Every replicate draws as many values from a group as it holds, with replacement,
+    and takes their percentile with linear interpolation (as `resample`). Groups of
+    equal size are bootstrapped together: one random index matrix of shape
+    (replicates, groups, size) selects the samples, and the percentile of all of them
+    is taken with a single `np.partition`. The replicates are split into chunks of at
+    most `chunk_size` samples that run on a thread pool. Every chunk has its own
+    generator spawned from `seed`, so the result does not depend on `workers`.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Group of every value, from 0 to `n_groups` - 1. Negative codes are skipped.
+    values : np.ndarray
+        Values to bootstrap. Missing values are skipped.
+    n_groups : int
+        Number of groups.
+    percentile : float
+        The percentile to compute (between 0 and 1).
+    n_boot : int, optional
+        Number of replicates (default is 1000).
+    seed : int, optional
+        Seed of the random generators (default is 0).
+    workers : int, optional
+        Number of threads. If None, one per processor.
+    chunk_size : int, optional
+        Maximum number of samples drawn at once per thread (default is 2**20).
+
+    Returns
+    -------
+    np.ndarray
+        Bootstrapped percentiles of shape (n_boot, n_groups), NaN for groups without
+        values.
+    """
+    if not 0.0 <= percentile <= 1.0:
+        raise ValueError("Percentile should be strictly between 0.0 and 1.0")
+
+    valid = (codes >= 0) & ~np.isnan(values)
+    order = np.argsort(codes[valid], kind="stable")
+    codes, values = codes[valid][order], values[valid][order]
+    sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(sizes) - sizes
+
+    tasks = []
+    for size in np.unique(sizes[sizes > 0]):
+        groups = np.flatnonzero(sizes == size)
+        cells = values[starts[groups][:, None] + np.arange(size)]
+        step = max(1, chunk_size // cells.size)
+        for start in range(0, n_boot, step):
+            tasks.append((groups, cells, start, min(start + step, n_boot)))
+
+    result = np.full((n_boot, n_groups), np.nan)
+
+    def run(task, seed):
+        groups, cells, start, stop = task
+        n, size = cells.shape
+        picks = np.random.default_rng(seed).integers(0, size, (stop - start, n, size))
+        samples = cells.ravel()[picks + np.arange(n)[:, None] * size]
+
+        position = percentile * (size - 1)
+        lower = int(position)
+        upper = min(lower + 1, size - 1)
+        samples = np.partition(samples, [lower, upper], axis=2)
+        low, high = samples[..., lower], samples[..., upper]
+        result[start:stop, groups] = low + (high - low) * (position - lower)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(run, tasks, seeds))
+    return result
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Parse timestamps to UTC datetime64 values, one batch per detected format.
+
+    Each string is reduced to its shape (every digit replaced by "0"). A collection only
+    contains a few shapes, so the format is guessed once per shape and all strings of
+    that shape are parsed together with an explicit format. If a string does not match
+    the guessed format (e.g. '13/06/2024' after '05/06/2024' was guessed as month
+    first), the strings of that shape are parsed one by one instead. Timestamps without
+    a timezone are taken to be in UTC.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Timestamps as strings, datetime objects or datetime64 values.
+
+    Returns
+    -------
+    pd.Series
+        Timezone-naive datetime64 values in UTC, with the index of `values`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = pd.to_datetime(values, utc=True)
+        return parsed.dt.tz_convert(None)
+
+    text = values.astype("string")
+    shapes = text.str.replace(r"\d", "0", regex=True)
+
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns, UTC]")
+    for shape in shapes.dropna().unique():
+        mask = (shapes == shape).to_numpy(dtype=bool, na_value=False)
+        batch = text[mask]
+        fmt = guess_datetime_format(batch.iloc[0]) or "mixed"
+        try:
+            parsed[mask] = pd.to_datetime(batch, format=fmt, utc=True)
+        except ValueError:
+            parsed[mask] = pd.to_datetime(batch, format="mixed", utc=True)
+
+    return parsed.dt.tz_convert(None)
+
+
+def add_time_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add an integer 'year' column derived from the 'timestamp' column.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with a datetime64 'timestamp' column.
+
+    Returns
+    -------
+    pd.DataFrame
+        The same DataFrame, with the 'year' column set.
+    """
+    timestamps = df["timestamp"].to_numpy(dtype="datetime64[ns]")
+    df["year"] = timestamps.astype("datetime64[Y]").astype(int) + 1970
+    return df
@@ -0,0 +1,324 @@
+"""
+Kernels for the inner loops of binning and resampling.
+
+Every kernel has a NumPy implementation. When Numba is installed, compiled versions
+are used instead. Both backends return the same results, and the backend can be
+switched with `set_backend`, e.g. to compare them.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ["numpy", "numba"] if numba is not None else ["numpy"]
+BACKEND = BACKENDS[-1]
+
+
+def set_backend(name: str):
+    """
+    Select the backend used by the kernels.
+
+    Parameters
+    ----------
+    name : str
+        'numpy' or 'numba'. 'numba' is only available when Numba is installed.
+    """
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Backend should be one of {BACKENDS}, got '{name}'")
+    BACKEND = name
+
+
+def _nearest_bin_numpy(values: np.ndarray, bins: np.ndarray) -> np.ndarray:
+    right = np.searchsorted(bins, values, side="left").clip(1, len(bins) - 1)
+    left = right - 1
+    use_left = (values - bins[left]) <= (bins[right] - values)
+    return np.where(use_left, left, right)
+
+
+def _grouped_quantile_numpy(
+    codes: np.ndarray, values: np.ndarray, n_groups: int, q: float
+) -> np.ndarray:
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+
+    order = np.lexsort((values, codes))
+    values = values[order]
+
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    position = q * (counts - 1).clip(0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+
+    result = np.full(n_groups, np.nan)
+    filled = counts > 0
+    low = values[(starts + lower)[filled]]
+    high = values[(starts + upper)[filled]]
+    result[filled] = low + (high - low) * (position - lower)[filled]
+    return result
+
+
+def _sorted_quantile_numpy(
+    codes: np.ndarray, values: np.ndarray, n_groups: int, q: float
+) -> np.ndarray:
+    # a stable sort by group keeps the values of every group in ascending order
+    order = np.argsort(codes, kind="stable")
+    values = values[order]
+
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    position = q * (counts - 1).clip(0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+
+    result = np.full(n_groups, np.nan)
+    filled = counts > 0
+    low = values[(starts + lower)[filled]]
+    high = values[(starts + upper)[filled]]
+    result[filled] = low + (high - low) * (position - lower)[filled]
+    return result
+
+
+def _grouped_argmax_numpy(
+    codes: np.ndarray, primary: np.ndarray, secondary: np.ndarray, n_groups: int
+) -> np.ndarray:
+    primary = np.where(np.isnan(primary), -np.inf, primary)
+    secondary = np.where(np.isnan(secondary), -np.inf, secondary)
+
+    # the last row of each group in this order has the largest primary and secondary
+    # value and, among ties, the smallest position
+    positions = np.arange(len(codes))
+    order = np.lexsort((-positions, secondary, primary, codes))
+
+    result = np.full(n_groups, -1, dtype=np.int64)
+    result[codes[order]] = order
+    return result
+
+
+KERNELS = {
+    "numpy": {
+        "nearest_bin": _nearest_bin_numpy,
+        "grouped_quantile": _grouped_quantile_numpy,
+        "sorted_quantile": _sorted_quantile_numpy,
+        "grouped_argmax": _grouped_argmax_numpy,
+    }
+}
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _nearest_bin_numba(values, bins):
+        result = np.empty(len(values), dtype=np.int64)
+        last = len(bins) - 1
+        for i in range(len(values)):
+            right = min(max(np.searchsorted(bins, values[i]), 1), last)
+            left = right - 1
+            if values[i] - bins[left] <= bins[right] - values[i]:
+                result[i] = left
+            else:
+                result[i] = right
+        return result
+
+    @numba.njit(cache=True)
+    def _grouped_quantile_numba(codes, values, n_groups, q):
+        counts = np.zeros(n_groups, dtype=np.int64)
+        for i in range(len(codes)):
+            if codes[i] >= 0 and not np.isnan(values[i]):
+                counts[codes[i]] += 1
+
+        starts = np.zeros(n_groups + 1, dtype=np.int64)
+        for group in range(n_groups):
+            starts[group + 1] = starts[group] + counts[group]
+
+        filled = starts[:-1].copy()
+        buffer = np.empty(starts[-1])
+        for i in range(len(codes)):
+            if codes[i] >= 0 and not np.isnan(values[i]):
+                buffer[filled[codes[i]]] = values[i]
+                filled[codes[i]] += 1
+
+        result = np.full(n_groups, np.nan)
+        for group in range(n_groups):
+            count = counts[group]
+            if count == 0:
+                continue
+            segment = np.sort(buffer[starts[group] : starts[group + 1]])
+            position = q * (count - 1)
+            lower = int(np.floor(position))
+            upper = int(np.ceil(position))
+            low = segment[lower]
+            result[group] = low + (segment[upper] - low) * (position - lower)
+        return result
+
+    @numba.njit(cache=True)
+    def _sorted_quantile_numba(codes, values, n_groups, q):
+        counts = np.zeros(n_groups, dtype=np.int64)
+        for i in range(len(codes)):
+            counts[codes[i]] += 1
+
+        lower = np.zeros(n_groups, dtype=np.int64)
+        upper = np.zeros(n_groups, dtype=np.int64)
+        for group in range(n_groups):
+            position = q * max(counts[group] - 1, 0)
+            lower[group] = int(np.floor(position))
+            upper[group] = int(np.ceil(position))
+
+        # the values of every group arrive in ascending order, so the order statistics
+        # are picked in one pass without sorting
+        low = np.empty(n_groups)
+        high = np.empty(n_groups)
+        seen = np.zeros(n_groups, dtype=np.int64)
+        for i in range(len(codes)):
+            group = codes[i]
+            if seen[group] == lower[group]:
+                low[group] = values[i]
+            if seen[group] == upper[group]:
+                high[group] = values[i]
+            seen[group] += 1
+
+        result = np.full(n_groups, np.nan)
+        for group in range(n_groups):
+            if counts[group] > 0:
+                position = q * (counts[group] - 1)
+                result[group] = low[group] + (high[group] - low[group]) * (
+                    position - lower[group]
+                )
+        return result
+
+    @numba.njit(cache=True)
+    def _grouped_argmax_numba(codes, primary, secondary, n_groups):
+        result = np.full(n_groups, -1, dtype=np.int64)
+        best_primary = np.full(n_groups, -np.inf)
+        best_secondary = np.full(n_groups, -np.inf)
+        for i in range(len(codes)):
+            group = codes[i]
+            p = -np.inf if np.isnan(primary[i]) else primary[i]
+            s = -np.inf if np.isnan(secondary[i]) else secondary[i]
+            if (
+                result[group] < 0
+                or p > best_primary[group]
+                or (p == best_primary[group] and s > best_secondary[group])
+            ):
+                result[group] = i
+                best_primary[group] = p
+                best_secondary[group] = s
+        return result
+
+    KERNELS["numba"] = {
+        "nearest_bin": _nearest_bin_numba,
+        "grouped_quantile": _grouped_quantile_numba,
+        "sorted_quantile": _sorted_quantile_numba,
+        "grouped_argmax": _grouped_argmax_numba,
+    }
+
+
+def nearest_bin(values: np.ndarray, bins: np.ndarray) -> np.ndarray:
+    """
+    Find the position of the nearest bin for every value.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Integer values, e.g. timestamps as int64 nanoseconds.
+    bins : np.ndarray
+        Sorted integer bins with the same unit as `values`.
+
+    Returns
+    -------
+    np.ndarray
+        Position in `bins` of the nearest bin. Ties go to the earlier bin.
+    """
+    values = np.ascontiguousarray(values, dtype=np.int64)
+    bins = np.ascontiguousarray(bins, dtype=np.int64)
+    if len(bins) == 1:
+        return np.zeros(len(values), dtype=np.int64)
+    return KERNELS[BACKEND]["nearest_bin"](values, bins)
+
+
+def grouped_quantile(
+    codes: np.ndarray, values: np.ndarray, n_groups: int, q: float
+) -> np.ndarray:
+    """
+    Compute the quantile of the values in every group, interpolating linearly.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Group of every value, from 0 to `n_groups` - 1. Values with a negative code are skipped.
+    values : np.ndarray
+        Values to compute the quantiles of. Missing values are skipped.
+    n_groups : int
+        Number of groups.
+    q : float
+        Quantile to compute (between 0 and 1).
+
+    Returns
+    -------
+    np.ndarray
+        The quantile of every group, NaN for groups without values.
+    """
+    codes = np.ascontiguousarray(codes, dtype=np.int64)
+    values = np.ascontiguousarray(values, dtype=float)
+    return KERNELS[BACKEND]["grouped_quantile"](codes, values, n_groups, float(q))
+
+
+def sorted_quantile(
+    codes: np.ndarray, values: np.ndarray, n_groups: int, q: float
+) -> np.ndarray:
+    """
+    Compute the quantile of the values in every group, like `grouped_quantile`, for
+    values that are already in ascending order within every group.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Group of every value, from 0 to `n_groups` - 1.
+    values : np.ndarray
+        Values without missing values, ascending within every group. The groups may be
+        interleaved.
+    n_groups : int
+        Number of groups.
+    q : float
+        Quantile to compute (between 0 and 1).
+
+    Returns
+    -------
+    np.ndarray
+        The quantile of every group, NaN for groups without values.
+    """
+    codes = np.ascontiguousarray(codes, dtype=np.int64)
+    values = np.ascontiguousarray(values, dtype=float)
+    return KERNELS[BACKEND]["sorted_quantile"](codes, values, n_groups, float(q))
+
+
+def grouped_argmax(
+    codes: np.ndarray, primary: np.ndarray, secondary: np.ndarray, n_groups: int
+) -> np.ndarray:
+    """
+    Find the row with the largest `primary` value in every group, breaking ties with `secondary`.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Group of every row, from 0 to `n_groups` - 1.
+    primary : np.ndarray
+        Values to maximize. Missing values are smaller than any other value.
+    secondary : np.ndarray
+        Values to maximize among rows with an equal `primary` value.
+    n_groups : int
+        Number of groups.
+
+    Returns
+    -------
+    np.ndarray
+        Position of the selected row of every group (the first one if rows are equal),
+        -1 for empty groups.
+    """
+    codes = np.ascontiguousarray(codes, dtype=np.int64)
+    primary = np.ascontiguousarray(primary, dtype=float)
+    secondary = np.ascontiguousarray(secondary, dtype=float)
+    return KERNELS[BACKEND]["grouped_argmax"](codes, primary, secondary, n_groups)
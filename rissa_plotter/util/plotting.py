@@ -3,9 +3,13 @@ import matplotlib.image as mpimg
 import matplotlib.font_manager as fm
 import re
 
+import numpy as np
 import pandas as pd
 import xarray as xr
 
+# Leap year used as the common calendar, so that 29 February has its own position
+PLOT_EPOCH = np.datetime64("2000-01-01", "D")
+
 
 class ColorMap:
     cream = "#FFF8EE"
@@ -31,10 +35,43 @@ def get_chelsea_font():
     return fm.FontProperties(fname=font_path)
 
 
-def plotting_date(df: xr.DataArray | pd.Series) -> pd.Series:
+def day_of_season(timestamps: np.ndarray | xr.DataArray | pd.Series) -> np.ndarray:
+    """
+    Number each timestamp by its calendar day on a leap-year calendar.
+
+    Equal month-days get equal numbers in every year. Days after 28 February in common
+    years are shifted by one, so 1 March is always day 60 and 29 February (day 59) only
+    occurs in leap years.
+
+    Parameters
+    ----------
+    timestamps : np.ndarray | xr.DataArray | pd.Series
+        datetime64 values.
+
+    Returns
+    -------
+    np.ndarray
+        Integer day numbers, with 0 for 1 January.
+    """
+    if isinstance(timestamps, pd.Series):
+        timestamps = timestamps.to_numpy(dtype="datetime64[ns]")
+    days = np.asarray(timestamps).astype("datetime64[D]")
+    years = days.astype("datetime64[Y]")
+
+    day = (days - years.astype("datetime64[D]")).astype(int)
+    year = years.astype(int) + 1970
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+    return day + ((~leap) & (day >= 59))
+
+
+def plotting_date(df: xr.DataArray | pd.Series) -> pd.DatetimeIndex | pd.Series:
     """
     Generate 'plot_date' columns for aligning by calendar day across years.
 
+    If the DataArray carries a precomputed 'plot_date' coordinate (see
+    `assign_plotting_date`), that coordinate is returned as is.
+
     Parameters
     ----------
     df : xr.DataArray | pd.Series
@@ -42,13 +79,28 @@ def plotting_date(df: xr.DataArray | pd.Series) -> pd.Series:
 
     Returns
     -------
-    pd.Series
-        Dataseries with 'plot_date'.
+    pd.DatetimeIndex | pd.Series
+        Dates in the year 2000 with the same month and day, as a Series when a Series
+        is given.
     """
-    month_day = df.dt.strftime("%m-%d")
-    plot_date = pd.to_datetime("2000-" + month_day, format="%Y-%m-%d")
+    if isinstance(df, xr.DataArray) and "plot_date" in df.coords:
+        return pd.DatetimeIndex(df["plot_date"].values)
 
-    return plot_date
+    plot_date = PLOT_EPOCH + day_of_season(df).astype("timedelta64[D]")
+    plot_date = plot_date.astype("datetime64[ns]")
+
+    if isinstance(df, pd.Series):
+        return pd.Series(plot_date, index=df.index, name=df.name)
+    return pd.DatetimeIndex(plot_date)
+
+
+def assign_plotting_date(
+    da: xr.DataArray | xr.Dataset, dim: str = "timestamp"
+) -> xr.DataArray | xr.Dataset:
+    """
+    Attach a 'plot_date' coordinate along `dim`, so that `plotting_date` can reuse it.
+    """
+    return da.assign_coords(plot_date=(dim, plotting_date(da[dim]).values))
 
 
 def create_hotel_title(hotels):
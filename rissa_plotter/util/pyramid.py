@@ -0,0 +1,208 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+
+# Length of a cell of the pyramid in nanoseconds
+HALF_DAY = 12 * 60 * 60 * 10**9
+DAY = 2 * HALF_DAY
+
+STATISTICS = ["count", "sum", "min", "max"]
+
+
+class Level(NamedTuple):
+    """
+    The records of a pyramid grouped per (bin, entity) for one set of bins.
+
+    Attributes
+    ----------
+    starts : np.ndarray
+        Position of the first record of every group. Groups are sorted by entity, then
+        by bin.
+    bin : np.ndarray
+        Position in the bins of every group.
+    entity : np.ndarray
+        Position in `AggregatePyramid.entities` of every group.
+    """
+
+    starts: np.ndarray
+    bin: np.ndarray
+    entity: np.ndarray
+
+
+class AggregatePyramid:
+    """
+    Index of the rows of a table by entity and half-day cell, from which summaries per
+    (bin, entity) are derived for any frequency without touching the rows again.
+
+    The cells are half days in phase with the earliest timestamp. Bins that are whole
+    days apart and in phase with the cells (as given by `expanded_daterange` for
+    frequencies such as 'D', 'W', 'SME' and 'ME') have their midpoints on cell edges,
+    so every cell falls into a single bin of `assign_to_nearest`. Summaries per
+    (bin, entity) are then exact reductions of the summaries per record, a
+    non-empty (entity, cell) pair.
+
+    Count, sum, minimum and maximum are reduced from the records directly (see
+    `summarize` and `combine`). Other percentiles are computed from the values sorted
+    per entity (see `sort_values` and `quantile`), without sorting them again.
+
+    Parameters
+    ----------
+    timestamps : pd.Series
+        Timezone-naive timestamp of every row.
+    entities : pd.Series
+        Entity of every row. Rows without entity are left out, as in `util.resample`.
+    """
+
+    def __init__(self, timestamps: pd.Series, entities: pd.Series):
+        times = timestamps.to_numpy()
+        codes, self.entities = pd.factorize(entities, sort=True)
+
+        # Timezone-aware or missing timestamps are left to the exact computation
+        self.supported = (
+            times.dtype.kind == "M" and len(times) > 0 and not np.isnat(times).any()
+        )
+        if not self.supported:
+            return
+
+        times = times.astype("datetime64[ns]").view(np.int64)
+        self.origin = times.min()
+        # cell m holds (origin + (m - 1) * HALF_DAY, origin + m * HALF_DAY]
+        cells = -((self.origin - times) // HALF_DAY)
+
+        rows = np.flatnonzero(codes >= 0)
+        n_cells = cells.max() + 1
+        keys = codes[rows] * n_cells + cells[rows]
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+
+        self.rows = rows[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        self.starts = np.flatnonzero(first)
+        self.record = np.cumsum(first) - 1
+        self.record_entity, self.record_cell = np.divmod(keys[self.starts], n_cells)
+
+    @property
+    def n_records(self) -> int:
+        return len(self.starts)
+
+    @property
+    def nbytes(self) -> int:
+        if not self.supported:
+            return 0
+        arrays = (self.rows, self.starts, self.record, self.record_entity)
+        return sum(array.nbytes for array in (*arrays, self.record_cell))
+
+    def level(self, bins: pd.DatetimeIndex) -> Optional[Level]:
+        """
+        Group the records per (bin, entity) of `bins`.
+
+        Returns
+        -------
+        Level or None
+            The groups, or None if `bins` are not whole days apart and in phase with
+            the cells, in which case summaries have to be computed from the rows.
+        """
+        if not self.supported or bins.tz is not None or len(bins) == 0:
+            return None
+
+        edges = bins.to_numpy().astype("datetime64[ns]").view(np.int64)
+        if np.any((edges - self.origin) % HALF_DAY) or np.any(np.diff(edges) % DAY):
+            return None
+
+        # the end of every cell belongs to the cell, so it is assigned to its bin
+        record_bin = kernels.nearest_bin(
+            self.origin + self.record_cell * HALF_DAY, edges
+        )
+        # records are sorted by entity and cell, so the groups are contiguous
+        keys = self.record_entity * len(edges) + record_bin
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(first)
+        return Level(starts, record_bin[starts], self.record_entity[starts])
+
+    def summarize(self, values: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Count, sum, minimum and maximum of `values` (one per row) per record.
+
+        Missing values are skipped; the sum, minimum and maximum of a record without
+        values are 0, NaN and NaN.
+        """
+        values = np.asarray(values, dtype=float)[self.rows]
+        present = ~np.isnan(values)
+        if self.n_records == 0:
+            return {statistic: np.array([]) for statistic in STATISTICS}
+        return {
+            "count": np.add.reduceat(present.astype(np.int64), self.starts),
+            "sum": np.add.reduceat(np.where(present, values, 0.0), self.starts),
+            "min": np.fmin.reduceat(values, self.starts),
+            "max": np.fmax.reduceat(values, self.starts),
+        }
+
+    @staticmethod
+    def combine(summaries: dict[str, np.ndarray], level: Level, statistic: str):
+        """
+        Reduce the summaries per record (see `summarize`) to one statistic per group.
+
+        Returns
+        -------
+        np.ndarray
+            The statistic of every group of `level`. Sums, minima and maxima of groups
+            without values are NaN.
+        """
+        if statistic not in STATISTICS:
+            raise ValueError(
+                f"Statistic should be one of {STATISTICS}, got '{statistic}'"
+            )
+        if len(level.starts) == 0:
+            return np.array([])
+
+        if statistic == "min":
+            return np.fmin.reduceat(summaries["min"], level.starts)
+        if statistic == "max":
+            return np.fmax.reduceat(summaries["max"], level.starts)
+
+        result = np.add.reduceat(summaries[statistic], level.starts)
+        if statistic == "sum":
+            count = np.add.reduceat(summaries["count"], level.starts)
+            result = np.where(count > 0, result, np.nan)
+        return result
+
+    def sort_values(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Sort `values` (one per row) per entity, skipping missing values.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The values in ascending order per entity, and the record of every value.
+        """
+        values = np.asarray(values, dtype=float)[self.rows]
+        present = ~np.isnan(values)
+        values, record = values[present], self.record[present]
+        order = np.lexsort((values, self.record_entity[record]))
+        return values[order], record[order]
+
+    def quantile(
+        self, sorted_values: tuple[np.ndarray, np.ndarray], level: Level, q: float
+    ) -> np.ndarray:
+        """
+        The quantile of the values of every group, as `util.resample` computes it.
+
+        Parameters
+        ----------
+        sorted_values : tuple[np.ndarray, np.ndarray]
+            Values sorted per entity, see `sort_values`.
+        level : Level
+            Groups of the records.
+        q : float
+            Quantile to compute (between 0 and 1).
+        """
+        values, record = sorted_values
+        sizes = np.diff(np.r_[level.starts, self.n_records])
+        group = np.repeat(np.arange(len(level.starts)), sizes)
+        # a group lies within one entity, so its values are still in ascending order
+        return kernels.sorted_quantile(group[record], values, len(level.starts), q)
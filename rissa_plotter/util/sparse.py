@@ -0,0 +1,129 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+
+class SparseGrid:
+    """
+    Resampled values of one parameter on a (timestamp x entity) grid, stored in
+    coordinate (COO) form: only the cells that contain observations are kept.
+
+    Most cells of a dense grid at fine frequencies are empty (e.g. all winter months),
+    so totals are reduced from the stored cells directly and a dense array is only
+    created for the requested window.
+
+    Attributes
+    ----------
+    timestamps : pd.DatetimeIndex
+        All bins of the grid.
+    entities : np.ndarray
+        All entities of the grid.
+    dim : str
+        Name of the entity dimension (e.g. 'station').
+    time_index : np.ndarray
+        Position in `timestamps` of each stored cell.
+    entity_index : np.ndarray
+        Position in `entities` of each stored cell.
+    values : np.ndarray
+        Value of each stored cell.
+    """
+
+    def __init__(
+        self,
+        timestamps: pd.DatetimeIndex,
+        entities: np.ndarray,
+        dim: str,
+        time_index: np.ndarray,
+        entity_index: np.ndarray,
+        values: np.ndarray,
+    ):
+        self.timestamps = timestamps
+        self.entities = entities
+        self.dim = dim
+        self.time_index = time_index
+        self.entity_index = entity_index
+        self.values = values
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        parameter: str,
+        dim: str,
+        timestamps: pd.DatetimeIndex,
+    ) -> "SparseGrid":
+        """
+        Create a SparseGrid from a long DataFrame with 'timestamp', `dim` and `parameter` columns.
+        """
+        entity_index, entities = pd.factorize(df[dim], sort=True)
+        return cls(
+            timestamps=timestamps,
+            entities=np.asarray(entities),
+            dim=dim,
+            time_index=timestamps.get_indexer(df["timestamp"]).astype(np.int32),
+            entity_index=entity_index.astype(np.int32),
+            values=df[parameter].to_numpy(dtype=float),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.time_index.nbytes + self.entity_index.nbytes + self.values.nbytes
+
+    def _entity_mask(self, entities: Optional[list[str]]) -> np.ndarray:
+        if entities is None:
+            return np.ones(len(self.values), dtype=bool)
+
+        missing = np.setdiff1d(entities, self.entities)
+        if len(missing):
+            raise KeyError(f"not all values found in index: {missing.tolist()}")
+        selected = np.isin(self.entities, entities)
+        return selected[self.entity_index]
+
+    def sum(self, entities: Optional[list[str]] = None) -> np.ndarray:
+        """
+        Sum the stored cells per timestamp, skipping missing values.
+
+        Parameters
+        ----------
+        entities : Optional[list[str]], default=None
+            Entities to include. If None, all entities are summed.
+
+        Returns
+        -------
+        np.ndarray
+            One total per timestamp of the grid, zero where no cells are stored.
+        """
+        mask = self._entity_mask(entities)
+        return np.bincount(
+            self.time_index[mask],
+            weights=np.nan_to_num(self.values[mask]),
+            minlength=len(self.timestamps),
+        )
+
+    def to_dense(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> xr.DataArray:
+        """
+        Create a dense (timestamp x entity) DataArray for the bins between `start` and `end`.
+        """
+        first = 0 if start is None else self.timestamps.searchsorted(start, "left")
+        last = (
+            len(self.timestamps)
+            if end is None
+            else self.timestamps.searchsorted(end, "right")
+        )
+        timestamps = self.timestamps[first:last]
+
+        mask = (self.time_index >= first) & (self.time_index < last)
+        grid = np.full((len(timestamps), len(self.entities)), np.nan)
+        grid[self.time_index[mask] - first, self.entity_index[mask]] = self.values[mask]
+
+        return xr.DataArray(
+            grid,
+            dims=("timestamp", self.dim),
+            coords={"timestamp": timestamps, self.dim: self.entities},
+        )
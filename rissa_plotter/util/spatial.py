@@ -0,0 +1,309 @@
+import functools
+import re
+import warnings
+from importlib.resources import files
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+EARTH_RADIUS = 6371008.8
+
+
+def _station_id(point: str) -> str:
+    # Points are numbered 1, 5a, ... and stations 01, 05a, ...
+    match = re.fullmatch(r"(\d+)(.*)", str(point).strip())
+    if match is None:
+        return str(point).strip()
+    return f"{int(match.group(1)):02d}{match.group(2)}"
+
+
+@functools.lru_cache(maxsize=None)
+def load_station_locations() -> pd.DataFrame:
+    """
+    Load the city station locations shipped with the package, once per process.
+
+    Returns
+    -------
+    pd.DataFrame
+        'Latitude' and 'Longitude' columns, indexed by station (e.g. '05a'). The
+        DataFrame is shared between callers and should not be modified.
+    """
+    # Not files("rissa_plotter.visualize.data"), which would import the plotters
+    path = files("rissa_plotter") / "visualize" / "data" / "station_locations.tsv"
+    locations = pd.read_csv(path, sep="\t", dtype={"Point": str})
+    locations.index = pd.Index(locations.pop("Point").map(_station_id), name="station")
+    return locations
+
+
+class SpatialIndex:
+    """
+    Index of entity locations for radius, nearest-neighbour and zoning queries.
+
+    Locations are projected once to a local equirectangular plane in meters, which is
+    accurate at the scale of a city. Queries use a KD-tree when SciPy is installed and
+    chunked NumPy distance computations otherwise; both give the same results.
+
+    Parameters
+    ----------
+    locations : pd.DataFrame
+        'Latitude' and 'Longitude' columns, indexed by entity (e.g. station or hotel).
+    """
+
+    def __init__(self, locations: pd.DataFrame):
+        locations = locations.dropna(subset=["Latitude", "Longitude"])
+        self.entities = locations.index.to_numpy()
+        self.latitude = locations["Latitude"].to_numpy(dtype=float)
+        self.longitude = locations["Longitude"].to_numpy(dtype=float)
+
+        self._origin = np.radians(self.latitude.mean())
+        self.xy = self._project(self.latitude, self.longitude)
+        self._tree = None if cKDTree is None else cKDTree(self.xy)
+
+    def __len__(self):
+        return len(self.entities)
+
+    @classmethod
+    def stations(cls, extra: Optional[pd.DataFrame] = None) -> "SpatialIndex":
+        """
+        Create an index of the city station locations shipped with the package.
+
+        Parameters
+        ----------
+        extra : pd.DataFrame, optional
+            More locations to include, e.g. hotels, with 'Latitude' and 'Longitude'
+            columns indexed by entity.
+        """
+        locations = load_station_locations()[["Latitude", "Longitude"]]
+        if extra is not None:
+            locations = pd.concat([locations, extra[["Latitude", "Longitude"]]])
+        return cls(locations)
+
+    def _project(self, latitude, longitude) -> np.ndarray:
+        latitude = np.radians(np.asarray(latitude, dtype=float))
+        longitude = np.radians(np.asarray(longitude, dtype=float))
+        x = EARTH_RADIUS * longitude * np.cos(self._origin)
+        y = EARTH_RADIUS * latitude
+        return np.column_stack([np.atleast_1d(x), np.atleast_1d(y)])
+
+    def _query(self, points: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self))
+        if self._tree is not None:
+            distances, indices = self._tree.query(points, k=k)
+            return distances.reshape(len(points), k), indices.reshape(len(points), k)
+
+        distances = np.empty((len(points), k))
+        indices = np.empty((len(points), k), dtype=np.int64)
+        for start in range(0, len(points), 4096):
+            chunk = points[start : start + 4096]
+            d = np.hypot(*(chunk[:, None, :] - self.xy[None, :, :]).transpose(2, 0, 1))
+            order = np.argsort(d, axis=1, kind="stable")[:, :k]
+            indices[start : start + len(chunk)] = order
+            distances[start : start + len(chunk)] = np.take_along_axis(d, order, 1)
+        return distances, indices
+
+    def nearest(
+        self,
+        latitude: float | np.ndarray,
+        longitude: float | np.ndarray,
+        k: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the `k` nearest entities of one or more points.
+
+        Parameters
+        ----------
+        latitude, longitude : float or np.ndarray
+            Coordinates of the points.
+        k : int, optional
+            Number of entities per point (default is 1).
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Entities and distances in meters, both of shape (points, k), nearest first.
+        """
+        distances, indices = self._query(self._project(latitude, longitude), k)
+        return self.entities[indices], distances
+
+    def radius(self, latitude: float, longitude: float, radius: float) -> pd.Series:
+        """
+        Find the entities within `radius` meters of a point.
+
+        Returns
+        -------
+        pd.Series
+            Distances in meters indexed by entity, nearest first.
+        """
+        point = self._project(latitude, longitude)
+        if self._tree is not None:
+            indices = np.asarray(self._tree.query_ball_point(point[0], radius), int)
+        else:
+            indices = np.arange(len(self))
+        distances = np.hypot(*(self.xy[indices] - point).T)
+
+        inside = distances <= radius
+        indices, distances = indices[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return pd.Series(
+            distances[order], index=pd.Index(self.entities[indices[order]])
+        )
+
+    def assign(
+        self,
+        df: pd.DataFrame,
+        latitude: str = "latitude",
+        longitude: str = "longitude",
+        max_distance: Optional[float] = None,
+    ) -> pd.Series:
+        """
+        Map observations with coordinates to their nearest entity.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Observations with latitude and longitude columns.
+        latitude, longitude : str, optional
+            Names of the coordinate columns (default are 'latitude' and 'longitude').
+        max_distance : float, optional
+            Observations further than this many meters from any entity are not assigned.
+
+        Returns
+        -------
+        pd.Series
+            Nearest entity of every observation, missing where not assigned.
+        """
+        valid = df[[latitude, longitude]].notna().all(axis=1).to_numpy()
+        entities, distances = self.nearest(
+            df.loc[valid, latitude].to_numpy(), df.loc[valid, longitude].to_numpy()
+        )
+
+        assigned = pd.Series(pd.NA, index=df.index, dtype=object)
+        nearest = pd.Series(entities[:, 0], dtype=object)
+        if max_distance is not None:
+            nearest[distances[:, 0] > max_distance] = pd.NA
+        assigned[valid] = nearest.to_numpy()
+        return assigned
+
+    def zones(
+        self,
+        n_zones: Optional[int] = None,
+        radius: Optional[float] = None,
+        seed: int = 0,
+        entities: Optional[list[str]] = None,
+    ) -> dict[str, list[str]]:
+        """
+        Cluster the entities into geographic zones.
+
+        Give either `n_zones` for k-means clustering into that many zones, or `radius` to
+        join every entity with the entities within `radius` meters (single linkage), so
+        that zones are separated by gaps wider than `radius`.
+
+        Parameters
+        ----------
+        n_zones : int, optional
+            Number of zones for k-means.
+        radius : float, optional
+            Linkage distance in meters.
+        seed : int, optional
+            Seed of the k-means initialization (default is 0).
+        entities : list[str], optional
+            All entities that should be in a zone, e.g. the stations of the data.
+            Entities without a location are put in an 'Unlocated' zone, with a warning,
+            so that totals over the zones are not silently short.
+
+        Returns
+        -------
+        dict[str, list[str]]
+            Entities per zone ('Zone 1', 'Zone 2', ...), in the order of the index. The
+            result can be passed as `groups` to `group_totals`.
+        """
+        if (n_zones is None) == (radius is None):
+            raise ValueError("Give either n_zones or radius")
+
+        if radius is not None:
+            labels = self._linkage(radius)
+        else:
+            labels = self._kmeans(n_zones, seed)
+
+        # number zones in order of their first entity
+        _, first, labels = np.unique(labels, return_index=True, return_inverse=True)
+        rank = np.argsort(np.argsort(first))
+        labels = rank[labels]
+
+        zones = {
+            f"Zone {zone + 1}": self.entities[labels == zone].tolist()
+            for zone in range(labels.max() + 1)
+        }
+
+        if entities is not None:
+            located = set(self.entities)
+            unlocated = [entity for entity in entities if entity not in located]
+            if unlocated:
+                warnings.warn(
+                    f"{len(unlocated)} entities have no location and are put in the "
+                    f"'Unlocated' zone: {', '.join(map(str, unlocated))}",
+                    stacklevel=2,
+                )
+                zones["Unlocated"] = unlocated
+        return zones
+
+    def _linkage(self, radius: float) -> np.ndarray:
+        if self._tree is not None:
+            pairs = np.array(sorted(self._tree.query_pairs(radius)), dtype=int)
+        else:
+            d = np.hypot(
+                *(self.xy[:, None, :] - self.xy[None, :, :]).transpose(2, 0, 1)
+            )
+            pairs = np.argwhere(np.triu(d <= radius, k=1))
+        pairs = pairs.reshape(-1, 2)
+
+        # propagate the lowest label through every connected component
+        labels = np.arange(len(self))
+        while True:
+            updated = labels.copy()
+            np.minimum.at(updated, pairs[:, 0], labels[pairs[:, 1]])
+            np.minimum.at(updated, pairs[:, 1], labels[pairs[:, 0]])
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                return labels
+            labels = updated
+
+    def _kmeans(self, n_zones: int, seed: int, iterations: int = 100) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+
+        # k-means++ initialization
+        centers = [self.xy[rng.integers(len(self))]]
+        for _ in range(n_zones - 1):
+            d = np.min(
+                [np.sum((self.xy - center) ** 2, axis=1) for center in centers], axis=0
+            )
+            if d.sum() == 0:
+                break
+            centers.append(self.xy[rng.choice(len(self), p=d / d.sum())])
+        centers = np.array(centers)
+        n_zones = len(centers)
+
+        labels = np.zeros(len(self), dtype=int)
+        for _ in range(iterations):
+            d = np.sum((self.xy[:, None, :] - centers[None, :, :]) ** 2, axis=2)
+            labels = d.argmin(axis=1)
+            updated = np.array(
+                [
+                    (
+                        self.xy[labels == zone].mean(axis=0)
+                        if np.any(labels == zone)
+                        else centers[zone]
+                    )
+                    for zone in range(n_zones)
+                ]
+            )
+            if np.allclose(updated, centers):
+                break
+            centers = updated
+        return labels
@@ -1,2 +1,6 @@
 from .city import CityPlotter
 from .hotels import HotelPlotter
+from .overlay import downsample, plot_raw_data
+from .maps import MapPlotter, TileCache
+from .animation import SeasonAnimation
+from .report import Page, save_report, season_pages
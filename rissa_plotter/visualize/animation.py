@@ -0,0 +1,256 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import animation
+from matplotlib.dates import DateFormatter
+from PIL import Image
+
+from rissa_plotter import util
+from rissa_plotter.base import KittiwalkersData
+from .constants import COLORS
+
+logo = util.get_logo()
+chelsea_font = util.get_chelsea_font()
+plt.rcParams["font.family"] = chelsea_font.get_name()
+
+# Readable names and colors of the counted variables
+LABELS = {
+    "adultCount": "Adults",
+    "aonCount": "Apparently occupied nests",
+    "nestCount": "Nests",
+    "chickCount": "Chicks",
+}
+VARIABLE_COLORS = {
+    "adultCount": COLORS["adults"],
+    "aonCount": COLORS["aons"],
+    "nestCount": util.ColorMap.c5,
+    "chickCount": util.ColorMap.c4,
+}
+
+
+class _FFMpegBlitWriter(animation.FFMpegWriter):
+    """
+    FFMpegWriter that pipes the canvas buffer to ffmpeg instead of saving the figure.
+
+    The figure is drawn by the caller (with blitting), so a frame costs one copy of the
+    RGBA buffer. Frames are streamed to ffmpeg, both for MP4 and GIF.
+    """
+
+    def grab_frame(self, **savefig_kwargs):
+        self._proc.stdin.write(self.fig.canvas.buffer_rgba())
+
+
+class _PillowBlitWriter(animation.PillowWriter):
+    """
+    PillowWriter that copies the canvas buffer instead of saving the figure.
+
+    Pillow writes a GIF in one go, so the frames are kept until `finish`; opaque frames
+    are kept as palette images, a quarter of the size of RGBA.
+    """
+
+    def grab_frame(self, **savefig_kwargs):
+        buffer = self.fig.canvas.buffer_rgba()
+        image = Image.frombytes("RGBA", buffer.shape[1::-1], bytes(buffer))
+        if image.getextrema()[3][0] < 255:
+            self._frames.append(image)
+        else:
+            self._frames.append(
+                image.convert("RGB").convert("P", palette=Image.Palette.ADAPTIVE)
+            )
+
+
+def _writer(path: Path, fps: int) -> animation.AbstractMovieWriter:
+    if animation.writers.is_available("ffmpeg"):
+        return _FFMpegBlitWriter(fps=fps)
+    if path.suffix.lower() == ".gif":
+        return _PillowBlitWriter(fps=fps)
+    raise RuntimeError(f"ffmpeg is needed to write '{path.suffix}' files")
+
+
+class SeasonAnimation:
+    def __init__(
+        self,
+        data: KittiwalkersData,
+        year: int,
+        variable: str = "adultCount",
+        entities: Optional[list[str]] = None,
+        frequency: str = "SME",
+        percentile: float = 0.75,
+        transparent: bool = False,
+        **kwargs,
+    ):
+        """
+        Replay of a season: counts per station or hotel and the season total, per bin.
+
+        The resampled counts are computed once, and the figure with its axes, labels and
+        logo is drawn once. Every frame only updates the bars, their values, the total
+        line and the date, and redraws those on a copy of the static background
+        (blitting).
+
+        Parameters
+        ----------
+        data : CityData or HotelData
+            The data to replay.
+        year : int
+            Season to replay.
+        variable : str, optional
+            Counted variable (default is 'adultCount').
+        entities : list[str], optional
+            Stations or hotels to show. Default are those with counts in `year`.
+        frequency : str, optional
+            One frame per bin of this frequency (default is 'SME').
+        percentile : float, optional
+            The percentile to use when selecting the data (default is 0.75).
+        transparent : bool, optional
+            Transparent background (default is False).
+        **kwargs : dict
+            Additional keyword arguments passed to `plt.subplots()`.
+        """
+        dimension = data.dimension_name
+        counts = data.resampled([variable], frequency, percentile, year)[variable]
+        if entities is None:
+            entities = counts[dimension].values[counts.notnull().any("timestamp")]
+        counts = counts.sel({dimension: list(entities)})
+        counted = np.flatnonzero(counts.notnull().any(dimension).values)
+        if len(counted) == 0:
+            raise ValueError(f"No {variable} counts in {year}")
+        # Start and end the replay at the first and last bin with counts
+        counts = counts.isel(timestamp=slice(counted[0], counted[-1] + 1))
+
+        self.year = year
+        self.variable = variable
+        self.transparent = transparent
+        self.entities = [str(entity) for entity in counts[dimension].values]
+        self.timestamps = counts["timestamp"].values
+        self.counts = counts.transpose("timestamp", dimension).values
+        self.totals = counts.sum(dim=dimension, min_count=1).values
+
+        self._build(**{"figsize": (12, 6), **kwargs})
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def _build(self, **kwargs):
+        label = LABELS.get(self.variable, self.variable)
+        color = VARIABLE_COLORS.get(self.variable, util.ColorMap.c1)
+        self.fig, (ax_bars, ax_total) = plt.subplots(
+            1, 2, gridspec_kw={"width_ratios": [2, 3]}, **kwargs
+        )
+
+        # Bars and values per entity, first entity on top
+        positions = np.arange(len(self.entities))[::-1]
+        self._bars = ax_bars.barh(
+            positions, np.zeros(len(self.entities)), color=color, animated=True
+        )
+        self._values = [
+            ax_bars.text(0, y, "", va="center", fontsize=8, animated=True)
+            for y in positions
+        ]
+        ax_bars.set_yticks(positions, self.entities, fontsize=8)
+        ax_bars.set_xlim(0, np.nanmax(self.counts) * 1.15)
+        ax_bars.set_xlabel(label)
+
+        # Season total: the whole season faintly, the replayed part on top
+        ax_total.plot(self.timestamps, self.totals, color=color, alpha=0.25)
+        (self._line,) = ax_total.plot([], [], color=color, animated=True)
+        (self._marker,) = ax_total.plot([], [], "o", color=color, animated=True)
+        ax_total.set_xlim(self.timestamps[0], self.timestamps[-1])
+        ax_total.set_ylim(0, np.nanmax(self.totals) * 1.1)
+        ax_total.xaxis.set_major_formatter(DateFormatter("%b-%d"))
+        ax_total.set_ylabel(f"Total {label.lower()}")
+        self._date = ax_total.text(
+            0.02, 0.95, "", transform=ax_total.transAxes, fontsize=12, animated=True
+        )
+
+        for ax in (ax_bars, ax_total):
+            ax.spines["top"].set_visible(False)
+            ax.spines["right"].set_visible(False)
+            if self.transparent:
+                ax.patch.set_alpha(0.0)
+        if self.transparent:
+            self.fig.patch.set_alpha(0.0)
+
+        self.fig.suptitle(f"{label} in {self.year}", fontsize=11, fontweight="bold")
+        self.fig.tight_layout()
+
+        # Add logo
+        logo_ax = self.fig.add_axes([0.80, 0.80, 0.15, 0.15], anchor="SE")
+        logo_ax.imshow(logo)
+        logo_ax.axis("off")
+
+    @property
+    def artists(self) -> list:
+        """
+        The artists that change between frames.
+        """
+        return [*self._bars, *self._values, self._line, self._marker, self._date]
+
+    def _update(self, frame: int) -> list:
+        counts = np.nan_to_num(self.counts[frame])
+        for bar, text, count in zip(self._bars, self._values, counts):
+            bar.set_width(count)
+            text.set_x(count)
+            text.set_text(f" {count:.0f}" if count > 0 else "")
+
+        self._line.set_data(self.timestamps[: frame + 1], self.totals[: frame + 1])
+        self._marker.set_data(
+            self.timestamps[frame : frame + 1], self.totals[frame : frame + 1]
+        )
+        self._date.set_text(np.datetime_as_string(self.timestamps[frame], unit="D"))
+        return self.artists
+
+    def animate(self, interval: int = 250) -> animation.FuncAnimation:
+        """
+        Animation for interactive display, e.g. in a notebook or with `plt.show()`.
+
+        Parameters
+        ----------
+        interval : int, optional
+            Delay between frames in milliseconds (default is 250).
+
+        Returns
+        -------
+        matplotlib.animation.FuncAnimation
+        """
+        return animation.FuncAnimation(
+            self.fig,
+            self._update,
+            frames=len(self),
+            init_func=lambda: self._update(0),
+            interval=interval,
+            blit=True,
+        )
+
+    def save(self, path: str | Path, fps: int = 4, dpi: int = 100):
+        """
+        Write the replay to an MP4 or GIF file.
+
+        Frames are blitted onto the static background and streamed to ffmpeg one at a
+        time, so they are never all held in memory. Without ffmpeg, GIFs are written
+        with Pillow, which keeps the (palette) frames until the file is written.
+
+        Parameters
+        ----------
+        path : str | Path
+            Output file, e.g. 'season.mp4' or 'season.gif'.
+        fps : int, optional
+            Frames per second (default is 4).
+        dpi : int, optional
+            Resolution of the frames (default is 100).
+        """
+        path = Path(path)
+        writer = _writer(path, fps)
+        canvas = self.fig.canvas
+
+        with writer.saving(self.fig, path, dpi):
+            # The writer may round the figure size, so draw the background afterwards
+            self.fig.set_dpi(dpi)
+            canvas.draw()
+            background = canvas.copy_from_bbox(self.fig.bbox)
+            for frame in range(len(self)):
+                canvas.restore_region(background)
+                for artist in self._update(frame):
+                    self.fig.draw_artist(artist)
+                writer.grab_frame()
@@ -1,11 +1,28 @@
+import math
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.lines as mlines
-from matplotlib.dates import DateFormatter
+from matplotlib.collections import LineCollection
+from matplotlib.dates import (
+    AutoDateLocator,
+    ConciseDateFormatter,
+    DateFormatter,
+    date2num,
+)
 
 from rissa_plotter import util
 from rissa_plotter import CityData
 from .constants import COLORS
+from .spec import (
+    Axis,
+    Layer,
+    PlotSpec,
+    band_layer,
+    band_quantiles,
+    draw_barh,
+    draw_layers,
+)
 
 logo = util.get_logo()
 chelsea_font = util.get_chelsea_font()
@@ -37,7 +54,67 @@ class CityPlotter:
         self.years = self.data.years
         self.transparent = transparent
 
-    def plot_timeseries(self, year: int = None, station: str = None, **kwargs):
+    def _timeseries_spec(
+        self, year: int = None, station: str = None, bands: float = None
+    ) -> PlotSpec:
+        total_adults = self.data.total_adults(station=station, year=year)
+        total_aons = self.data.total_aons(station=station, year=year)
+        ymax = total_adults.max().item()
+
+        title = "Kittiwakes at City Stations"
+        if year:
+            title += f" in {year}"
+        if station:
+            title += f" - station {station}"
+
+        if year is None:
+            start = pd.Timestamp(f"{self.years[0]}-03-01")
+            end = pd.Timestamp(f"{self.years[-1]}-10-31")
+        else:
+            start, end = pd.Timestamp(f"{year}-03-01"), pd.Timestamp(f"{year}-10-31")
+
+        layers = []
+        if bands is not None:
+            for variable, key in [("adultCount", "adults"), ("aonCount", "aons")]:
+                band = self.data.bootstrap_total(
+                    variable,
+                    entity=station,
+                    year=year,
+                    quantiles=band_quantiles(bands),
+                )
+                layers.append(band_layer(band, COLORS[key]))
+                ymax = max(ymax, np.nanmax(band.values, initial=0))
+
+        layers += [
+            Layer(
+                "line",
+                total.timestamp.values,
+                total.values,
+                color=COLORS[key],
+                label=label,
+                linestyle=linestyle,
+                marker=".",
+            )
+            for total, key, label, linestyle in [
+                (total_adults, "adults", "Visible adults", "-"),
+                (total_aons, "aons", "Apparently occupied nests", "--"),
+            ]
+        ]
+        return PlotSpec(
+            title,
+            layers,
+            x=Axis(type="temporal", limits=(start, end)),
+            y=Axis("Count", limits=(0, ymax * 1.1)),
+        )
+
+    def plot_timeseries(
+        self,
+        year: int = None,
+        station: str = None,
+        bands: float = None,
+        output: str = "figure",
+        **kwargs,
+    ):
         """
         Plot time series of kittiwake counts at city stations.
 
@@ -47,126 +124,290 @@ class CityPlotter:
             Filter the data by year.
         station : str, optional
             Filter the data by station.
+        bands : float, optional
+            Shade bootstrap confidence bands of this level around the counts, e.g. 0.9
+            (see `CityData.bootstrap_total`). Default is no bands.
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `plt.subplots()`.
 
         Returns
         -------
-        matplotlib.figure.Figure
+        matplotlib.figure.Figure or dict
 
         """
-        total_adults = self.data.total_adults(station=station, year=year)
-        total_aons = self.data.total_aons(station=station, year=year)
-
-        title = "Kittiwakes at City Stations"
-        if year:
-            title += f" in {year}"
-        if station:
-            title += f" - station {station}"
+        spec = self._timeseries_spec(year, station, bands)
+        if output != "figure":
+            return spec.export(output)
 
         fig, ax = plt.subplots(**kwargs)
 
-        total_adults.plot(
-            ax=ax,
-            color=COLORS["adults"],
-            label="Visible adults",
-            linestyle="-",
-            marker=".",
-        )
+        draw_layers(ax, spec.layers)
 
-        total_aons.plot(
-            ax=ax,
-            color=COLORS["aons"],
-            label="Apparently occupied nests",
-            linestyle="--",
-            marker=".",
-        )
+        locator = AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
 
         # legend
         ax.legend(loc="upper left", fontsize=10, frameon=False)
 
         # axis layout
-        ax.set_ylabel("Count")
-        ax.set_xlabel("")
-        ax.set_ylim(0, total_adults.max() * 1.1)
-
-        if year is None:
-            start = pd.Timestamp(f"{self.years[0]}-03-01")
-            end = pd.Timestamp(f"{self.years[-1]}-10-31")
-            ax.set_xlim(start, end)
-        else:
-            ax.set_xlim(pd.Timestamp(f"{year}-03-01"), pd.Timestamp(f"{year}-10-31"))
+        ax.set_ylabel(spec.y.label)
+        ax.set_xlabel(spec.x.label)
+        ax.set_ylim(*spec.y.limits)
+        ax.set_xlim(*spec.x.limits)
 
         # general_layout
         self._style_plot(
             ax,
             fig,
-            title,
+            spec.title,
         )
 
         return fig
 
-    def compare_years(self, station: str = None, **kwargs):
+    def _station_grid_spec(
+        self, year: int = None, stations: list = None, ncols: int = 6
+    ) -> PlotSpec:
+        ds = self.data.resampled(["adultCount", "aonCount"], year=year)
+        if stations is None:
+            stations = [
+                s for s in ds["station"].values if s not in self.INVALID_STATIONS
+            ]
+        ds = ds.sel(station=stations)
+
+        title = "Kittiwakes at City Stations"
+        if year:
+            title += f" in {year}"
+
+        if year is None:
+            start = pd.Timestamp(f"{self.years[0]}-03-01")
+            end = pd.Timestamp(f"{self.years[-1]}-10-31")
+        else:
+            start, end = pd.Timestamp(f"{year}-03-01"), pd.Timestamp(f"{year}-10-31")
+
+        timestamps = ds["timestamp"].values
+        layers = [
+            Layer(
+                "line",
+                timestamps,
+                ds[variable].sel(station=station).values,
+                color=COLORS[key],
+                label=label,
+                linestyle=linestyle,
+                panel=station,
+            )
+            for station in stations
+            for variable, key, label, linestyle in [
+                ("adultCount", "adults", "Visible adults", "-"),
+                ("aonCount", "aons", "Apparently occupied nests", "--"),
+            ]
+        ]
+        ymax = np.nan_to_num(ds["adultCount"].max().item())
+        return PlotSpec(
+            title,
+            layers,
+            x=Axis(type="temporal", limits=(start, end)),
+            y=Axis("Count", limits=(0, ymax * 1.1)),
+            columns=ncols,
+        )
+
+    def station_grid(
+        self,
+        year: int = None,
+        stations: list = None,
+        ncols: int = 6,
+        output: str = "figure",
+        **kwargs,
+    ):
         """
-        Compare kittiwake counts across years on a common calendar axis.
+        Plot the time series of kittiwake counts of every city station in one figure.
+
+        The data is resampled once for all stations, and every panel is drawn as a single
+        LineCollection on shared axes.
 
         Parameters
         ----------
-        station : str, optional
-            Filter by station.
+        year : int, optional
+            Filter the data by year.
+        stations : list of str, optional
+            Stations to plot. If None, all stations except INVALID_STATIONS.
+        ncols : int, optional
+            Number of panels per row (default is 6).
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `plt.subplots()`.
 
         Returns
         -------
-        matplotlib.figure.Figure
+        matplotlib.figure.Figure or dict
 
         """
+        spec = self._station_grid_spec(year, stations, ncols)
+        if output != "figure":
+            return spec.export(output)
+
+        panels = spec.panels
+        nrows = max(math.ceil(len(panels) / ncols), 1)
+        fig, axes = plt.subplots(
+            nrows, ncols, sharex=True, sharey=True, squeeze=False, **kwargs
+        )
+        axes = axes.ravel()
+
+        for ax, panel in zip(axes, panels):
+            layers = [layer for layer in spec.layers if layer.panel == panel]
+            x = date2num(layers[0].x)
+            lines = LineCollection(
+                [np.column_stack([x, layer.y]) for layer in layers],
+                colors=[layer.color for layer in layers],
+                linestyles=[layer.linestyle for layer in layers],
+                linewidths=1,
+            )
+            ax.add_collection(lines, autolim=False)
+            ax.set_title(panel, fontsize=8)
+            ax.spines["top"].set_visible(False)
+            ax.spines["right"].set_visible(False)
+            if self.transparent:
+                ax.patch.set_alpha(0.0)
+
+        for ax in axes[len(panels) :]:
+            ax.axis("off")
+
+        # shared axis layout
+        axes[0].xaxis_date()
+        axes[0].set_xlim(*spec.x.limits)
+        axes[0].set_ylim(*spec.y.limits)
+        locator = AutoDateLocator(minticks=2, maxticks=5)
+        axes[0].xaxis.set_major_locator(locator)
+        axes[0].xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        for ax in axes[: len(panels)]:
+            ax.label_outer()
+            ax.tick_params(labelsize=7)
+        fig.supylabel(spec.y.label)
+
+        # legend
+        handles = [
+            mlines.Line2D([], [], color=layer.color, label=layer.label, ls=ls)
+            for layer, ls in zip(spec.layers[:2], ["-", "--"])
+        ]
+        fig.legend(handles=handles, loc="upper left", fontsize=8, frameon=False)
+
+        fig.suptitle(spec.title, fontsize=11, fontweight="bold")
+        if self.transparent:
+            fig.patch.set_alpha(0.0)
+
+        logo_ax = fig.add_axes([0.75, 0.90, 0.1, 0.1], anchor="NE")
+        logo_ax.imshow(logo)
+        logo_ax.axis("off")
+
+        return fig
+
+    def _compare_years_spec(self, station: str = None, bands: float = None) -> PlotSpec:
         title = "Kittiwakes at City Stations"
         if station:
             title += f" - station {station}"
 
-        years = self.years
+        totals = self.data.yearly_totals(["adultCount", "aonCount"], entity=station)
+        xaxis = util.plotting_date(totals["day_of_season"])
+
+        ymax = np.nan_to_num(totals.sel(variable="adultCount").max().item())
+
+        layers = []
+        if bands is not None:
+            for year in self.years:
+                for variable in ["adultCount", "aonCount"]:
+                    band = self.data.bootstrap_total(
+                        variable,
+                        entity=station,
+                        year=year,
+                        quantiles=band_quantiles(bands),
+                    )
+                    x = band["plot_date"].values
+                    layers.append(band_layer(band, COLORS[str(year)], x=x))
+                    ymax = max(ymax, np.nanmax(band.values, initial=0))
+
+        for year in self.years:
+            for variable, style, linestyle in [
+                ("adultCount", "Visible adults", "-"),
+                ("aonCount", "Apparently occupied nests", "--"),
+            ]:
+                layers.append(
+                    Layer(
+                        "line",
+                        xaxis,
+                        totals.sel(year=year, variable=variable).values,
+                        color=COLORS[str(year)],
+                        label=str(year),
+                        linestyle=linestyle,
+                        style=style,
+                        marker=".",
+                    )
+                )
+
+        return PlotSpec(
+            title,
+            layers,
+            x=Axis(
+                type="temporal",
+                limits=(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-10-31")),
+                format="%b-%d",
+            ),
+            y=Axis("Count", limits=(0, ymax * 1.1)),
+        )
 
-        ymax = 0
-        handles_1 = []
+    def compare_years(
+        self,
+        station: str = None,
+        bands: float = None,
+        output: str = "figure",
+        **kwargs,
+    ):
+        """
+        Compare kittiwake counts across years on a common calendar axis.
 
-        fig, ax = plt.subplots(**kwargs)
-        for year in years:
-            total_adults = self.data.total_adults(station=station, year=year)
-            total_aons = self.data.total_aons(station=station, year=year)
-            year = str(year)
-            color = COLORS[year]
-
-            xaxis = util.plotting_date(total_adults["timestamp"])
-
-            ax.plot(
-                xaxis,
-                total_adults,
-                linestyle="-",
-                color=color,
-                marker=".",
-            )
+        Parameters
+        ----------
+        station : str, optional
+            Filter by station.
+        bands : float, optional
+            Shade bootstrap confidence bands of this level around the counts, e.g. 0.9.
+            Default is no bands.
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
+        **kwargs : dict
+            Additional keyword arguments passed to `plt.subplots()`.
 
-            ax.plot(
-                xaxis,
-                total_aons,
-                linestyle="--",
-                color=color,
-                marker=".",
-            )
+        Returns
+        -------
+        matplotlib.figure.Figure or dict
+
+        """
+        spec = self._compare_years_spec(station, bands)
+        if output != "figure":
+            return spec.export(output)
 
-            yearly_max = total_adults.max().item()
-            if yearly_max > ymax:
-                ymax = yearly_max
+        handles_1 = {}
 
-            handles_1.append(
-                mlines.Line2D([], [], color=color, label=year, linestyle="-")
+        fig, ax = plt.subplots(**kwargs)
+        draw_layers(ax, spec.layers)
+
+        lines = [layer for layer in spec.layers if layer.mark == "line"]
+        for layer in lines:
+            handles_1[layer.label] = mlines.Line2D(
+                [], [], color=layer.color, label=layer.label, linestyle="-"
             )
 
         # legend 1 - years
         legend_1 = ax.legend(
-            handles=handles_1, loc="upper left", fontsize=10, frameon=False
+            handles=list(handles_1.values()),
+            loc="upper left",
+            fontsize=10,
+            frameon=False,
         )
         ax.add_artist(legend_1)
 
@@ -190,23 +431,23 @@ class CityPlotter:
         )
 
         # axis layout
-        ax.set_ylabel("Count")
-        ax.set_xlabel("")
-        ax.set_ylim(0, ymax * 1.1)
-        ax.set_xlim(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-10-31"))
-        ax.xaxis.set_major_formatter(DateFormatter("%b-%d"))
+        ax.set_ylabel(spec.y.label)
+        ax.set_xlabel(spec.x.label)
+        ax.set_ylim(*spec.y.limits)
+        ax.set_xlim(*spec.x.limits)
+        ax.xaxis.set_major_formatter(DateFormatter(spec.x.format))
         fig.autofmt_xdate()
 
         # general_layout
         self._style_plot(
             ax,
             fig,
-            title,
+            spec.title,
         )
 
         return fig
 
-    def plot_submissions_per_station(self, **kwargs):
+    def _submissions_per_station_spec(self) -> PlotSpec:
         last_year = self.years[-1]
 
         yearly_submissions = self.data.yearly_submissions()
@@ -217,18 +458,68 @@ class CityPlotter:
         selection = selection.sort_index(ascending=False)
 
         title = f"Submissions per city station in {last_year}"
-        fig, ax = plt.subplots(**kwargs)
-        selection["count"].plot.barh(ax=ax, color=util.ColorMap.c4)
+        layer = Layer(
+            "bar",
+            selection["count"].values,
+            selection.index.values,
+            color=util.ColorMap.c4,
+        )
+        return PlotSpec(
+            title,
+            [layer],
+            x=Axis("Number of submissions"),
+            y=Axis("station", type="nominal"),
+        )
+
+    def plot_submissions_per_station(self, output: str = "figure", **kwargs):
+        """
+        Plot the number of submissions per city station in the last year.
 
-        ax.set_xlabel("Number of submissions")
+        Parameters
+        ----------
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
+        **kwargs : dict
+            Additional keyword arguments passed to `plt.subplots()`.
+
+        Returns
+        -------
+        matplotlib.figure.Figure or dict
+
+        """
+        spec = self._submissions_per_station_spec()
+        if output != "figure":
+            return spec.export(output)
+
+        fig, ax = plt.subplots(**kwargs)
+        draw_barh(ax, spec)
 
         self._style_plot(
             ax,
             fig,
+            spec.title,
+        )
+        return fig
+
+    def _submissions_per_bin_spec(self, date: str, frequency="SME") -> PlotSpec:
+        counts = self.data.submissions_per_bin(frequency=frequency, date=date)
+        counts = counts.drop(index=self.INVALID_STATIONS, errors="ignore")
+
+        title = f"Semimonthly submissions per City Station - {date}"
+        layer = Layer(
+            "bar", counts["count"].values, counts.index.values, color=util.ColorMap.c4
+        )
+        return PlotSpec(
             title,
+            [layer],
+            x=Axis("Number of submissions"),
+            y=Axis("station", type="nominal"),
         )
 
-    def plot_submissions_per_bin(self, date: str, frequency="SME", **kwargs):
+    def plot_submissions_per_bin(
+        self, date: str, frequency="SME", output: str = "figure", **kwargs
+    ):
         """
         Plot the number of submissions per city station for a given semimonthly bin (if frequency is "SME").
 
@@ -236,27 +527,58 @@ class CityPlotter:
         ----------
         date : str
             The date representing the semimonthly bin to plot, in "%d-%m-%Y".
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `plt.subplots()`.
 
         Returns
         -------
-        matplotlib.figure.Figure
+        matplotlib.figure.Figure or dict
 
         """
-        counts = self.data.submissions_per_bin(frequency=frequency, date=date)
-        counts = counts.drop(index=self.INVALID_STATIONS, errors="ignore")
-
-        title = f"Semimonthly submissions per City Station - {date}"
+        spec = self._submissions_per_bin_spec(date, frequency)
+        if output != "figure":
+            return spec.export(output)
 
         fig, ax = plt.subplots(**kwargs)
-        counts["count"].plot.barh(ax=ax, color=util.ColorMap.c4)
-        ax.set_xlabel("Number of submissions")
+        draw_barh(ax, spec)
 
-        self._style_plot(ax, fig, title)
+        self._style_plot(ax, fig, spec.title)
         return fig
 
-    def plot_submissions(self, **kwargs):
+    def _submissions_spec(self) -> PlotSpec:
+        daily_submissions = self.data.daily_submissions()
+
+        layers = []
+        for year in self.data.years:
+            yearly_data = daily_submissions[daily_submissions["year"] == year]
+            color = COLORS[str(year)]
+
+            xaxis = util.plotting_date(yearly_data["timestamp"])
+            layers.append(
+                Layer("line", xaxis, yearly_data["count"].values, color, str(year))
+            )
+
+            maxx = xaxis.max()
+            maxy = yearly_data["count"].max()
+            layers.append(
+                Layer("text", [maxx], [maxy + 5], color, str(year), text=[maxy])
+            )
+
+        return PlotSpec(
+            "Kittiwake City Stations",
+            layers,
+            x=Axis(
+                type="temporal",
+                limits=(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-9-30")),
+                format="%b-%d",
+            ),
+            y=Axis("Cumulative submissions per year", limits=(0, 1400)),
+        )
+
+    def plot_submissions(self, output: str = "figure", **kwargs):
         """
         Plot cumulative daily submissions per year for Kittiwake City Stations.
         This method generates a line plot showing the cumulative number of submissions
@@ -264,43 +586,30 @@ class CityPlotter:
         and the maximum submission count for each year is annotated on the plot.
         Parameters
         ----------
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `matplotlib.pyplot.subplots`.
         Returns
         -------
-        fig : matplotlib.figure.Figure
+        fig : matplotlib.figure.Figure or dict
             The matplotlib Figure object containing the plot.
 
         """
-        years = self.data.years
-
-        title = "Kittiwake City Stations"
-        daily_submissions = self.data.daily_submissions()
+        spec = self._submissions_spec()
+        if output != "figure":
+            return spec.export(output)
 
         fig, ax = plt.subplots(**kwargs)
-        for year in years:
-            yearly_data = daily_submissions[daily_submissions["year"] == year]
-            color = COLORS[str(year)]
-
-            xaxis = util.plotting_date(yearly_data["timestamp"])
-
-            ax.plot(
-                xaxis,
-                yearly_data["count"],
-                color=color,
-                label=str(year),
-            )
-
-            maxx = xaxis.max()
-            maxy = yearly_data["count"].max()
-            ax.text(maxx, maxy + 5, s=maxy, c=color)
+        draw_layers(ax, spec.layers)
 
         # Format plot
-        ax.set_ylabel("Cumulative submissions per year")
-        ax.set_xlabel("")
-        ax.set_xlim(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-9-30"))
-        ax.set_ylim(0, 1400)
-        ax.xaxis.set_major_formatter(DateFormatter("%b-%d"))
+        ax.set_ylabel(spec.y.label)
+        ax.set_xlabel(spec.x.label)
+        ax.set_xlim(*spec.x.limits)
+        ax.set_ylim(*spec.y.limits)
+        ax.xaxis.set_major_formatter(DateFormatter(spec.x.format))
         fig.autofmt_xdate()
 
         ax.legend(frameon=False, loc="upper left")
@@ -309,7 +618,7 @@ class CityPlotter:
         self._style_plot(
             ax,
             fig,
-            title,
+            spec.title,
         )
         return fig
 
@@ -8,7 +8,16 @@ from matplotlib.dates import DateFormatter
 import matplotlib.lines as mlines
 
 from rissa_plotter import HotelData, util
-from .constants import COLORS, SUBHOTELS, CAPACITY
+from .constants import COLORS, SUBHOTELS
+from .spec import (
+    Axis,
+    Layer,
+    PlotSpec,
+    band_layer,
+    band_quantiles,
+    draw_barh,
+    draw_layers,
+)
 
 logo = util.get_logo()
 chelsea_font = util.get_chelsea_font()
@@ -29,7 +38,43 @@ class HotelPlotter:
         self.years = self.data.years
         self.transparent = transparent
 
-    def chick_counts(self, hotels: list, **kwargs):
+    def _chick_counts_spec(self, hotels: list) -> PlotSpec:
+        colors = [util.ColorMap.c2, util.ColorMap.c1, util.ColorMap.c6]
+        columns = ["one_chick", "two_chicks", "three_chicks"]
+
+        layers = []
+        for hotel in hotels:
+            subhotels = SUBHOTELS[hotel]
+            data = []
+            for subhotel in subhotels:
+                sub_data = self.data.chicks_per_nest(subhotel)
+                data.append(sub_data)
+
+            # Concatenate and aggregate
+            combined = pd.concat(data)
+            # TODO: handle case where subhotels is 1
+            data = combined.groupby(combined.index).sum()
+
+            for color, column in zip(colors, columns):
+                layers.append(
+                    Layer(
+                        "bar",
+                        data.index.values,
+                        data[column].values,
+                        color=color,
+                        label=column.replace("_", " "),
+                        panel=hotel,
+                    )
+                )
+
+        return PlotSpec(
+            "",
+            layers,
+            x=Axis(type="ordinal"),
+            y=Axis("Number of nests with chicks", limits=(0, 35)),
+        )
+
+    def chick_counts(self, hotels: list, output: str = "figure", **kwargs):
         """
         Plot stacked bar charts of chick counts per hotel. Only available for type 1 hotels (Hotel 1 to 5).
 
@@ -39,12 +84,15 @@ class HotelPlotter:
             List of hotel names to include. If None, use all available in the dataset.
         month : int, optional
             Month to filter the data on.
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         kwargs : dict
             Additional keyword arguments passed to `plt.subplots`.
         """
-
-        colors = [util.ColorMap.c2, util.ColorMap.c1, util.ColorMap.c6]
-        columns = ["one_chick", "two_chicks", "three_chicks"]
+        spec = self._chick_counts_spec(hotels)
+        if output != "figure":
+            return spec.export(output)
 
         ncols = len(hotels)
         fig, axes = plt.subplots(ncols=ncols, sharey=True, **kwargs)
@@ -52,22 +100,16 @@ class HotelPlotter:
             axes = [axes]
 
         for i, (ax, hotel) in enumerate(zip(axes, hotels)):
-            subhotels = SUBHOTELS[hotel]
-            data = []
-            for subhotel in subhotels:
-                sub_data = self.data.chicks_per_nest(subhotel)
-                data.append(sub_data)
-
-            # Concatenate and aggregate
-            combined = pd.concat(data)
-            # TODO: handle case where subhotels is 1
-            data = combined.groupby(combined.index).sum()
-            data.plot.bar(ax=ax, stacked=True, color=colors)
+            layers = [layer for layer in spec.layers if layer.panel == hotel]
+            data = pd.DataFrame(
+                {layer.label: layer.y for layer in layers}, index=layers[0].x
+            )
+            data.plot.bar(ax=ax, stacked=True, color=[layer.color for layer in layers])
 
             # Clean axis aesthetics
-            ax.set_ylabel("Number of nests with chicks")
-            ax.set_xlabel("")
-            ax.set_ylim(0, 35)
+            ax.set_ylabel(spec.y.label)
+            ax.set_xlabel(spec.x.label)
+            ax.set_ylim(*spec.y.limits)
             ax.set_title("")  # Clear default pandas title
             ax.legend().remove()
             ax.spines["top"].set_visible(False)
@@ -95,8 +137,8 @@ class HotelPlotter:
 
         # Add shared legend
         handles = [
-            mpatches.Patch(color=c, label=label.replace("_", " "))
-            for c, label in zip(colors, columns)
+            mpatches.Patch(color=layer.color, label=layer.label)
+            for layer in spec.layers[:3]
         ]
         fig.legend(
             handles=handles,
@@ -116,7 +158,43 @@ class HotelPlotter:
 
         return fig
 
-    def capacity_used(self, hotels: list, year: int, **kwargs):
+    def _capacity_used_spec(self, hotels: list, year: int) -> PlotSpec:
+        table = self.data.capacity_table()
+        season = table.isel(timestamp=(table["year"] == year).values)
+        season = season.isel(timestamp=-2)
+
+        layers = []
+        for hotel in hotels:
+            active = season["aons"].sel(group=hotel).item()
+            percentage = season["percentage"].sel(group=hotel).item()
+
+            if re.search(r"\b\d(?=\S)", hotel):
+                color = util.ColorMap.c4
+            else:
+                color = util.ColorMap.c2
+
+            if np.isnan(active):
+                active = 0
+
+            layers.append(Layer("bar", [hotel], [percentage], color))
+            layers.append(
+                Layer(
+                    "text",
+                    [hotel],
+                    [percentage + 2],
+                    "black",
+                    text=[int(math.ceil(active))],
+                )
+            )
+
+        return PlotSpec(
+            f"Capacity of hotels used for nesting, in {year}",
+            layers,
+            x=Axis(type="nominal"),
+            y=Axis("Capacity used (%)", limits=(0, 100)),
+        )
+
+    def capacity_used(self, hotels: list, year: int, output: str = "figure", **kwargs):
         """
         Plot the capacity used at a hotel.
 
@@ -126,52 +204,41 @@ class HotelPlotter:
             The year to plot. If None, plot all years.
         hotel : str, optional
             The hotel to plot. If None, plot all hotels.
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `plt.subplots()`.
         """
+        spec = self._capacity_used_spec(hotels, year)
+        if output != "figure":
+            return spec.export(output)
 
         ncols = len(hotels)
         fig, axes = plt.subplots(ncols=ncols, sharey=True, **kwargs)
         if ncols == 1:
             axes = [axes]
 
-        for i, (ax, hotel) in enumerate(zip(axes, hotels)):
-            subhotels = SUBHOTELS[hotel]
-
-            active = (
-                self.data.total_aons(hotel=subhotels, year=year)
-                .isel(timestamp=-2)
-                .item()
-            )
-            capacity = sum(CAPACITY[subhotel] for subhotel in subhotels)
-
-            percentage = active / capacity * 100
-
-            if re.search(r"\b\d(?=\S)", hotel):
-                color = util.ColorMap.c4
-            else:
-                color = util.ColorMap.c2
-
-            if np.isnan(active):
-                active = 0
-
-            ax.bar(x=hotel, height=percentage, color=color)
+        bars = spec.layers[0::2]
+        texts = spec.layers[1::2]
+        for i, (ax, hotel, bar, text) in enumerate(zip(axes, hotels, bars, texts)):
+            ax.bar(x=hotel, height=bar.y[0], color=bar.color)
             ax.text(
                 x=hotel,
-                y=percentage + 2,
-                s=int(math.ceil(active)),
+                y=text.y[0],
+                s=text.text[0],
                 ha="center",
             )
 
             # Clean axis aesthetics
-            ax.set_xlabel("")
-            ax.set_ylim(0, 100)
+            ax.set_xlabel(spec.x.label)
+            ax.set_ylim(*spec.y.limits)
             ax.set_title("")  # Clear default pandas title
             ax.spines["top"].set_visible(False)
             ax.spines["right"].set_visible(False)
 
             if i == 0:
-                ax.set_ylabel("Capacity used (%)")
+                ax.set_ylabel(spec.y.label)
             # Hide y-axis on all but the first plot
             if i != 0:
                 ax.spines["left"].set_visible(False)
@@ -190,7 +257,7 @@ class HotelPlotter:
             if self.transparent:
                 ax.patch.set_alpha(0.0)
         fig.suptitle(
-            f"Capacity of hotels used for nesting, in {year}",
+            spec.title,
             fontsize=11,
             fontweight="bold",
         )
@@ -204,7 +271,68 @@ class HotelPlotter:
 
         return fig
 
-    def compare_years(self, hotels: list = None, **kwargs):
+    def _compare_years_spec(self, hotels: list = None, bands: float = None) -> PlotSpec:
+        title = util.create_hotel_title(hotels)
+
+        subhotels = []
+        for hotel in hotels:
+            subhotels.extend(SUBHOTELS.get(hotel, []))
+
+        totals = self.data.yearly_totals(["adultCount", "chickCount"], entity=subhotels)
+        xaxis = util.plotting_date(totals["day_of_season"])
+
+        ymax = np.nan_to_num(totals.sel(variable="adultCount").max().item())
+
+        layers = []
+        if bands is not None:
+            for year in self.years:
+                for variable in ["chickCount", "adultCount"]:
+                    band = self.data.bootstrap_total(
+                        variable,
+                        entity=subhotels,
+                        year=year,
+                        quantiles=band_quantiles(bands),
+                    )
+                    x = band["plot_date"].values
+                    layers.append(band_layer(band, COLORS[str(year)], x=x))
+                    ymax = max(ymax, np.nanmax(band.values, initial=0))
+
+        for year in self.years:
+            for variable, style, linestyle in [
+                ("chickCount", "Visible chicks", "-"),
+                ("adultCount", "Visible adults", "--"),
+            ]:
+                layers.append(
+                    Layer(
+                        "line",
+                        xaxis,
+                        totals.sel(year=year, variable=variable).values,
+                        color=COLORS[str(year)],
+                        label=str(year),
+                        linestyle=linestyle,
+                        style=style,
+                        marker=".",
+                    )
+                )
+
+        return PlotSpec(
+            title,
+            layers,
+            x=Axis(
+                type="temporal",
+                limits=(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-10-31")),
+                format="%b-%d",
+            ),
+            y=Axis("Count", limits=(0, ymax * 1.1)),
+        )
+
+    def compare_years(
+        self,
+        hotels: list = None,
+        bands: float = None,
+        output: str = "figure",
+        **kwargs,
+    ):
         """
         Compare kittiwake counts across years on a common calendar axis.
 
@@ -212,62 +340,40 @@ class HotelPlotter:
         ----------
         hotel : str | list, optional
             Filter by hotel.
+        bands : float, optional
+            Shade bootstrap confidence bands of this level around the counts, e.g. 0.9.
+            Default is no bands.
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `plt.subplots()`.
 
         Returns
         -------
-        matplotlib.figure.Figure
+        matplotlib.figure.Figure or dict
         """
+        spec = self._compare_years_spec(hotels, bands)
+        if output != "figure":
+            return spec.export(output)
 
-        title = util.create_hotel_title(hotels)
-        years = self.years
-
-        ymax = 0
-        handles_1 = []
+        handles_1 = {}
 
         fig, ax = plt.subplots(**kwargs)
-        for year in years:
-
-            subhotels = []
-            for hotel in hotels:
-                subhotels.extend(SUBHOTELS.get(hotel, []))
-
-            total_adults = self.data.total_adults(hotel=subhotels, year=year)
-            # total_aons = self.data.total_aons(hotel=subhotels, year=year)
-            total_chicks = self.data.total_chicks(hotel=subhotels, year=year)
-            year = str(year)
-            color = COLORS[year]
-
-            xaxis = util.plotting_date(total_adults["timestamp"])
-
-            ax.plot(
-                xaxis,
-                total_chicks,
-                linestyle="-",
-                color=color,
-                marker=".",
-            )
+        draw_layers(ax, spec.layers)
 
-            ax.plot(
-                xaxis,
-                total_adults,
-                linestyle="--",
-                color=color,
-                marker=".",
-            )
-
-            yearly_max = total_adults.max().item()
-            if yearly_max > ymax:
-                ymax = yearly_max
-
-            handles_1.append(
-                mlines.Line2D([], [], color=color, label=year, linestyle="-")
+        lines = [layer for layer in spec.layers if layer.mark == "line"]
+        for layer in lines:
+            handles_1[layer.label] = mlines.Line2D(
+                [], [], color=layer.color, label=layer.label, linestyle="-"
             )
 
         # Legend 1 - years
         legend_1 = ax.legend(
-            handles=handles_1, loc="upper left", fontsize=10, frameon=False
+            handles=list(handles_1.values()),
+            loc="upper left",
+            fontsize=10,
+            frameon=False,
         )
         ax.add_artist(legend_1)
 
@@ -277,16 +383,10 @@ class HotelPlotter:
                 [],
                 [],
                 color="black",
-                label="Visible chicks",
-                linestyle="-",
-            ),
-            mlines.Line2D(
-                [],
-                [],
-                color="black",
-                label="Visible adults",
-                linestyle="--",
-            ),
+                label=layer.style,
+                linestyle=layer.linestyle,
+            )
+            for layer in lines[:2]
         ]
         ax.legend(
             handles=handels_2,
@@ -296,23 +396,53 @@ class HotelPlotter:
         )
 
         # axis layout
-        ax.set_ylabel("Count")
-        ax.set_xlabel("")
-        ax.set_ylim(0, ymax * 1.1)
-        ax.set_xlim(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-10-31"))
-        ax.xaxis.set_major_formatter(DateFormatter("%b-%d"))
+        ax.set_ylabel(spec.y.label)
+        ax.set_xlabel(spec.x.label)
+        ax.set_ylim(*spec.y.limits)
+        ax.set_xlim(*spec.x.limits)
+        ax.xaxis.set_major_formatter(DateFormatter(spec.x.format))
         fig.autofmt_xdate()
 
         # general_layout
         self._style_plot(
             ax,
             fig,
-            title,
+            spec.title,
         )
 
         return fig
 
-    def plot_submissions(self, **kwargs):
+    def _submissions_spec(self) -> PlotSpec:
+        daily_submissions = self.data.daily_submissions()
+
+        layers = []
+        for year in self.data.years:
+            yearly_data = daily_submissions[daily_submissions["year"] == year]
+            color = COLORS[str(year)]
+
+            xaxis = util.plotting_date(yearly_data["timestamp"])
+            layers.append(
+                Layer("line", xaxis, yearly_data["count"].values, color, str(year))
+            )
+
+            maxx = xaxis.max()
+            maxy = yearly_data["count"].max()
+            layers.append(
+                Layer("text", [maxx], [maxy + 5], color, str(year), text=[maxy])
+            )
+
+        return PlotSpec(
+            "Kittiwake Hotels",
+            layers,
+            x=Axis(
+                type="temporal",
+                limits=(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-9-30")),
+                format="%b-%d",
+            ),
+            y=Axis("Cumulative submissions per year", limits=(0, 1400)),
+        )
+
+    def plot_submissions(self, output: str = "figure", **kwargs):
         """
         Plot cumulative daily submissions per year for Kittiwake Hotels.
         This method generates a line plot showing the cumulative number of submissions
@@ -320,43 +450,30 @@ class HotelPlotter:
         and the maximum submission count for each year is annotated on the plot.
         Parameters
         ----------
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `matplotlib.pyplot.subplots`.
         Returns
         -------
-        fig : matplotlib.figure.Figure
+        fig : matplotlib.figure.Figure or dict
             The matplotlib Figure object containing the plot.
 
         """
-        years = self.data.years
-
-        title = "Kittiwake Hotels"
-        daily_submissions = self.data.daily_submissions()
+        spec = self._submissions_spec()
+        if output != "figure":
+            return spec.export(output)
 
         fig, ax = plt.subplots(**kwargs)
-        for year in years:
-            yearly_data = daily_submissions[daily_submissions["year"] == year]
-            color = COLORS[str(year)]
-
-            xaxis = util.plotting_date(yearly_data["timestamp"])
-
-            ax.plot(
-                xaxis,
-                yearly_data["count"],
-                color=color,
-                label=str(year),
-            )
-
-            maxx = xaxis.max()
-            maxy = yearly_data["count"].max()
-            ax.text(maxx, maxy + 5, s=maxy, c=color)
+        draw_layers(ax, spec.layers)
 
         # Format plot
-        ax.set_ylabel("Cumulative submissions per year")
-        ax.set_xlabel("")
-        ax.set_xlim(pd.Timestamp("2000-04-01"), pd.Timestamp("2000-9-30"))
-        ax.set_ylim(0, 1400)
-        ax.xaxis.set_major_formatter(DateFormatter("%b-%d"))
+        ax.set_ylabel(spec.y.label)
+        ax.set_xlabel(spec.x.label)
+        ax.set_xlim(*spec.x.limits)
+        ax.set_ylim(*spec.y.limits)
+        ax.xaxis.set_major_formatter(DateFormatter(spec.x.format))
         fig.autofmt_xdate()
 
         ax.legend(frameon=False, loc="upper left")
@@ -365,11 +482,28 @@ class HotelPlotter:
         self._style_plot(
             ax,
             fig,
-            title,
+            spec.title,
         )
         return fig
 
-    def plot_submissions_per_bin(self, date: str, frequency="SME", **kwargs):
+    def _submissions_per_bin_spec(self, date: str, frequency="SME") -> PlotSpec:
+        counts = self.data.submissions_per_bin(frequency=frequency, date=date)
+        counts = counts.drop(index=self.INVALID_HOTELS, errors="ignore")
+
+        title = f"Semimonthly submissions per Hotel - {date}"
+        layer = Layer(
+            "bar", counts["count"].values, counts.index.values, color=util.ColorMap.c4
+        )
+        return PlotSpec(
+            title,
+            [layer],
+            x=Axis("Number of submissions"),
+            y=Axis("hotel", type="nominal"),
+        )
+
+    def plot_submissions_per_bin(
+        self, date: str, frequency="SME", output: str = "figure", **kwargs
+    ):
         """
         Plot the number of submissions per hotel for a given semimonthly bin (if frequency is "SME").
 
@@ -377,24 +511,25 @@ class HotelPlotter:
         ----------
         date : str
             The date representing the semimonthly bin to plot, in "%d-%m-%Y".
+        output : str, optional
+            'figure' (default) for a matplotlib Figure, or 'dict' or 'vega-lite' for a
+            plot spec that is rendered by the client, see `PlotSpec`.
         **kwargs : dict
             Additional keyword arguments passed to `plt.subplots()`.
 
         Returns
         -------
-        matplotlib.figure.Figure
+        matplotlib.figure.Figure or dict
 
         """
-        counts = self.data.submissions_per_bin(frequency=frequency, date=date)
-        counts = counts.drop(index=self.INVALID_HOTELS, errors="ignore")
-
-        title = f"Semimonthly submissions per Hotel - {date}"
+        spec = self._submissions_per_bin_spec(date, frequency)
+        if output != "figure":
+            return spec.export(output)
 
         fig, ax = plt.subplots(**kwargs)
-        counts["count"].plot.barh(ax=ax, color=util.ColorMap.c4)
-        ax.set_xlabel("Number of submissions")
+        draw_barh(ax, spec)
 
-        self._style_plot(ax, fig, title)
+        self._style_plot(ax, fig, spec.title)
         return fig
 
     def _style_plot(self, ax, fig, title):
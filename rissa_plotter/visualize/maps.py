@@ -0,0 +1,372 @@
+import functools
+import math
+import os
+import urllib.error
+import urllib.request
+import warnings
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import matplotlib.image as mpimg
+import matplotlib.pyplot as plt
+
+from rissa_plotter import CityData, util
+
+logo = util.get_logo()
+chelsea_font = util.get_chelsea_font()
+plt.rcParams["font.family"] = chelsea_font.get_name()
+
+EARTH_RADIUS = 6378137.0
+POSITRON = "https://a.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png"
+TILE_SIZE = 256
+
+
+def web_mercator(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """
+    Project WGS84 coordinates to Web Mercator (EPSG:3857).
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (n, 2) with the x and y coordinates in meters.
+    """
+    latitude = np.radians(np.asarray(latitude, dtype=float))
+    longitude = np.radians(np.asarray(longitude, dtype=float))
+    x = EARTH_RADIUS * longitude
+    y = EARTH_RADIUS * np.log(np.tan(np.pi / 4 + latitude / 2))
+    return np.column_stack([x, y])
+
+
+def project_locations(locations: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add Web Mercator 'x' and 'y' columns to locations with 'Latitude' and 'Longitude' columns.
+    """
+    xy = web_mercator(locations["Latitude"], locations["Longitude"])
+    return locations.assign(x=xy[:, 0], y=xy[:, 1])
+
+
+@functools.lru_cache(maxsize=None)
+def _station_locations() -> pd.DataFrame:
+    # The shipped station locations, projected once per process
+    return project_locations(util.load_station_locations())
+
+
+class TileCache:
+    """
+    On-disk cache of XYZ basemap tiles.
+
+    Tiles are stored as `path/z/x/y.png` and downloaded only when they are missing. In
+    offline mode no network calls are made at all: missing tiles stay blank.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        Cache directory. Default is `~/.cache/rissa_plotter/tiles`.
+    url : str, optional
+        Tile URL template with `{z}`, `{x}` and `{y}` (default is CartoDB Positron).
+    offline : bool, optional
+        If True, only use tiles that are already cached (default is False).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str | Path] = None,
+        url: str = POSITRON,
+        offline: bool = False,
+    ):
+        if path is None:
+            path = Path.home() / ".cache" / "rissa_plotter" / "tiles"
+        self.path = Path(path)
+        self.url = url
+        self.offline = offline
+        self._mosaics = {}
+
+    def _download(self, file: Path, z: int, x: int, y: int) -> bool:
+        request = urllib.request.Request(
+            self.url.format(z=z, x=x, y=y), headers={"User-Agent": "rissa_plotter"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                content = response.read()
+        except (urllib.error.URLError, TimeoutError) as error:
+            warnings.warn(f"Could not download tile {z}/{x}/{y}: {error}")
+            return False
+
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = file.with_suffix(".tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, file)
+        return True
+
+    def tile(self, z: int, x: int, y: int) -> Optional[np.ndarray]:
+        """
+        Read one tile as an RGBA array, downloading it first if needed and allowed.
+
+        Returns
+        -------
+        np.ndarray or None
+            Float RGBA array of shape (256, 256, 4), or None if the tile is not available.
+        """
+        file = self.path / str(z) / str(x) / f"{y}.png"
+        if not file.exists():
+            if self.offline or not self._download(file, z, x, y):
+                return None
+
+        image = mpimg.imread(file)
+        if image.dtype == np.uint8:
+            image = image / 255
+        if image.ndim == 2:
+            image = np.repeat(image[..., None], 3, axis=2)
+        if image.shape[2] == 3:
+            image = np.dstack([image, np.ones(image.shape[:2])])
+        return image
+
+    def mosaic(
+        self, extent: tuple[float, float, float, float], zoom: int
+    ) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+        """
+        Stitch the tiles that cover a Web Mercator extent into one image.
+
+        Mosaics are kept in memory, so repeated renders of the same map only read the
+        cache once.
+
+        Parameters
+        ----------
+        extent : tuple
+            (xmin, xmax, ymin, ymax) in Web Mercator meters.
+        zoom : int
+            Zoom level of the tiles.
+
+        Returns
+        -------
+        tuple[np.ndarray, tuple]
+            The RGBA image and its (xmin, xmax, ymin, ymax) extent, as used by `imshow`.
+        """
+        n = 2**zoom
+        world = 2 * math.pi * EARTH_RADIUS
+        size = world / n
+
+        xmin, xmax, ymin, ymax = extent
+        x0 = int((xmin + world / 2) // size)
+        x1 = int((xmax + world / 2) // size)
+        y0 = int((world / 2 - ymax) // size)
+        y1 = int((world / 2 - ymin) // size)
+
+        key = (zoom, x0, x1, y0, y1)
+        if key not in self._mosaics:
+            image = np.zeros(
+                ((y1 - y0 + 1) * TILE_SIZE, (x1 - x0 + 1) * TILE_SIZE, 4), dtype=float
+            )
+            for ty in range(y0, y1 + 1):
+                for tx in range(x0, x1 + 1):
+                    tile = self.tile(zoom, tx % n, ty)
+                    if tile is None:
+                        continue
+                    row, col = (ty - y0) * TILE_SIZE, (tx - x0) * TILE_SIZE
+                    image[row : row + TILE_SIZE, col : col + TILE_SIZE] = tile
+
+            bounds = (
+                x0 * size - world / 2,
+                (x1 + 1) * size - world / 2,
+                world / 2 - (y1 + 1) * size,
+                world / 2 - y0 * size,
+            )
+            self._mosaics[key] = (image, bounds)
+        return self._mosaics[key]
+
+
+class MapPlotter:
+    def __init__(
+        self,
+        locations: Optional[pd.DataFrame] = None,
+        transparent: bool = False,
+        tiles: Optional[TileCache] = None,
+        zoom: int = 16,
+    ):
+        """
+        Plot per-station values on a basemap.
+
+        Locations are projected to Web Mercator once and basemap tiles are read from a
+        `TileCache`, so repeated renders neither reproject nor download.
+
+        Parameters
+        ----------
+        locations : pd.DataFrame, optional
+            'Latitude' and 'Longitude' per entity (index). Default are the city station
+            locations shipped with the package. Pass e.g. hotel locations to map hotels.
+        transparent : bool, optional
+            Transparent figure background (default is False).
+        tiles : TileCache, optional
+            Basemap tile cache. Default is a TileCache in the default directory.
+        zoom : int, optional
+            Zoom level of the basemap tiles (default is 16).
+        """
+        if locations is None:
+            self.locations = _station_locations()
+        else:
+            self.locations = project_locations(locations)
+        self.transparent = transparent
+        self.tiles = TileCache() if tiles is None else tiles
+        self.zoom = zoom
+
+    def scatter(
+        self,
+        ax,
+        values: Optional[pd.Series] = None,
+        sizes: tuple[float, float] = (20, 300),
+        **kwargs,
+    ):
+        """
+        Add a scatter layer of per-station values to a map.
+
+        Parameters
+        ----------
+        ax : matplotlib.axes.Axes
+            Axes of the map.
+        values : pd.Series, optional
+            Values per station (index). Stations without a location are skipped. If
+            None, all locations are drawn with the smallest size.
+        sizes : tuple[float, float], optional
+            Marker size of zero and of the largest value (default is (20, 300)).
+        **kwargs : dict
+            Additional keyword arguments passed to `ax.scatter()`.
+
+        Returns
+        -------
+        matplotlib.collections.PathCollection
+        """
+        if values is None:
+            locations = self.locations
+            s = sizes[0]
+        else:
+            values = values[values.index.isin(self.locations.index)].dropna()
+            locations = self.locations.loc[values.index]
+            vmax = values.max() if len(values) and values.max() > 0 else 1
+            s = sizes[0] + (sizes[1] - sizes[0]) * values.to_numpy(float) / vmax
+
+        return ax.scatter(locations["x"], locations["y"], s=s, **kwargs)
+
+    def plot_values(
+        self,
+        values: pd.Series,
+        title: str,
+        label: str = None,
+        color: str = util.ColorMap.c1,
+        **kwargs,
+    ):
+        """
+        Plot per-station values (e.g. counts, submissions or capacity) as scaled markers.
+
+        Parameters
+        ----------
+        values : pd.Series
+            Values per station (index).
+        title : str
+            Title of the map.
+        label : str, optional
+            Legend title of the marker sizes.
+        color : str, optional
+            Marker color (default is ColorMap.c1).
+        **kwargs : dict
+            Additional keyword arguments passed to `plt.subplots()`.
+
+        Returns
+        -------
+        matplotlib.figure.Figure
+        """
+        fig, ax = plt.subplots(**kwargs)
+
+        self.scatter(ax, color=util.ColorMap.c3, alpha=0.5, zorder=2)
+        layer = self.scatter(
+            ax, values, color=color, alpha=0.8, edgecolor="white", zorder=3
+        )
+
+        handles, labels = layer.legend_elements(
+            "sizes", num=4, func=lambda s: self._size_to_value(s, values)
+        )
+        ax.legend(
+            handles,
+            labels,
+            title=label,
+            loc="upper left",
+            fontsize=8,
+            frameon=False,
+        )
+
+        self._add_basemap(ax)
+        self._style_plot(ax, fig, title)
+        return fig
+
+    def plot_submissions(self, city_data: CityData, year: int = None, **kwargs):
+        """
+        Plot the number of submissions per city station in a year (default the last year).
+        """
+        year = city_data.years[-1] if year is None else year
+        submissions = city_data.yearly_submissions()
+        submissions = submissions[submissions["year"] == year]
+        values = submissions.set_index("station")["count"]
+
+        return self.plot_values(
+            values,
+            title=f"Submissions per city station in {year}",
+            label="Submissions",
+            **kwargs,
+        )
+
+    def plot_counts(
+        self,
+        city_data: CityData,
+        variable: str = "adultCount",
+        year: int = None,
+        **kwargs,
+    ):
+        """
+        Plot the highest resampled count per city station in a year (default the last year).
+        """
+        year = city_data.years[-1] if year is None else year
+        ds = city_data.resampled([variable], year=year)
+        values = ds[variable].max(dim="timestamp").to_series()
+
+        labels = {"adultCount": "Visible adults", "aonCount": "AONs"}
+        label = labels.get(variable, variable)
+        return self.plot_values(
+            values,
+            title=f"{label} per city station in {year}",
+            label=label,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _size_to_value(size, values: pd.Series, sizes=(20, 300)):
+        vmax = values.max() if len(values) and values.max() > 0 else 1
+        return (size - sizes[0]) / (sizes[1] - sizes[0]) * vmax
+
+    def _add_basemap(self, ax, margin: float = 0.1):
+        x, y = self.locations["x"], self.locations["y"]
+        dx = (x.max() - x.min()) * margin or 100
+        dy = (y.max() - y.min()) * margin or 100
+        extent = (x.min() - dx, x.max() + dx, y.min() - dy, y.max() + dy)
+
+        image, bounds = self.tiles.mosaic(extent, self.zoom)
+        ax.imshow(image, extent=bounds, interpolation="bilinear", zorder=0)
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+        ax.set_aspect("equal")
+
+    def _style_plot(self, ax, fig, title):
+        """
+        Shared styling for maps.
+        """
+        ax.axis("off")
+        ax.set_title(title, fontsize=11, fontweight="bold")
+
+        # transparant background
+        if self.transparent:
+            fig.patch.set_alpha(0.0)
+
+        # Add logo
+        logo_ax = fig.add_axes([0.75, 0.05, 0.15, 0.15], anchor="SE")
+        logo_ax.imshow(logo)
+        logo_ax.axis("off")
@@ -0,0 +1,208 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+
+METHODS = ["lttb", "minmax"]
+
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").view(np.int64).astype(float)
+    return values.to_numpy(dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets.
+
+    The first and last point are kept. The points in between are split into
+    `n_buckets` - 2 buckets of equal size, and from every bucket the point is kept that
+    forms the largest triangle with the previously kept point and the mean of the next
+    bucket.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Positions of the points, sorted by `x`.
+    n_buckets : int
+        Number of points to keep.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted positions of the kept points.
+    """
+    n = len(x)
+    if n_buckets >= n or n_buckets < 3:
+        return np.arange(n)
+
+    x = x - x[0]
+    edges = np.linspace(1, n - 1, n_buckets - 1).astype(int)
+    edges = np.append(edges, n)
+
+    selected = np.empty(n_buckets, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_buckets - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        mean_x = x[next_start:next_end].mean()
+        mean_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - mean_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (mean_y - y[a])
+        )
+        a = start + area.argmax()
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Select the lowest and highest point of every bucket.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Positions of the points, sorted by `x`.
+    n_buckets : int
+        Number of buckets of equal width between the lowest and highest `x`.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted positions of the kept points, at most two per bucket.
+    """
+    n = len(x)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+
+    span = x[-1] - x[0]
+    if span == 0:
+        buckets = np.zeros(n, dtype=np.int64)
+    else:
+        buckets = ((x - x[0]) / span * n_buckets).astype(np.int64)
+        buckets = buckets.clip(0, n_buckets - 1)
+
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    first = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    last = np.r_[first[1:] - 1, n - 1]
+    return np.unique(order[np.r_[first, last]])
+
+
+def downsample(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    n_buckets: int,
+    by: Optional[str] = None,
+    method: str = "lttb",
+) -> pd.DataFrame:
+    """
+    Downsample observations per entity, keeping their shape and extremes.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Observations with columns `x` and `y`.
+    x, y : str
+        Names of the position columns, `x` may hold datetime64 values.
+    n_buckets : int
+        Number of buckets per entity, e.g. the width of the axes in pixels.
+    by : str, optional
+        Name of the entity column (e.g. 'station'). If None, all rows are one entity.
+    method : str, optional
+        'lttb' (default) keeps one point per bucket with Largest-Triangle-Three-Buckets
+        plus the lowest and highest point of every entity. 'minmax' keeps the lowest and
+        highest point of every bucket.
+
+    Returns
+    -------
+    pd.DataFrame
+        The kept rows of `df`, sorted by entity and `x`.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Method should be one of {METHODS}, got '{method}'")
+
+    df = df.dropna(subset=[x, y]).sort_values(x, kind="stable")
+    groups = [df] if by is None else [group for _, group in df.groupby(by)]
+
+    selected = []
+    for group in groups:
+        xs, ys = _as_float(group[x]), group[y].to_numpy(dtype=float)
+        if method == "lttb":
+            keep = lttb_indices(xs, ys, n_buckets)
+            keep = np.union1d(keep, [ys.argmin(), ys.argmax()]) if len(ys) else keep
+        else:
+            keep = minmax_indices(xs, ys, n_buckets)
+        selected.append(group.iloc[keep])
+
+    if not selected:
+        return df
+    return pd.concat(selected)
+
+
+def plot_raw_data(
+    ax,
+    df: pd.DataFrame,
+    x: str = "timestamp",
+    y: str = "adultCount",
+    by: Optional[str] = None,
+    method: str = "lttb",
+    width: Optional[int] = None,
+    color: str | dict = "grey",
+    **kwargs,
+):
+    """
+    Scatter raw observations on `ax`, downsampled to the resolution of the axes.
+
+    Every entity is reduced to about one point per pixel column (see `downsample`), and
+    all points are drawn as one collection, so drawing time and the size of vector
+    output do not grow with the number of observations. If the x limits of `ax` are
+    set, only the observations within them are drawn.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes to draw on.
+    df : pd.DataFrame
+        Observations with columns `x` and `y`.
+    x, y : str, optional
+        Names of the position columns (default are 'timestamp' and 'adultCount').
+    by : str, optional
+        Name of the entity column (e.g. 'station'). If None, all rows are one entity.
+    method : str, optional
+        'lttb' (default) or 'minmax', see `downsample`.
+    width : int, optional
+        Number of buckets per entity. If None, the width of `ax` in pixels.
+    color : str or dict, optional
+        Color of the points, or a color per entity (default is 'grey').
+    **kwargs : dict
+        Additional keyword arguments passed to `ax.scatter()`, e.g. `s` and `label`.
+
+    Returns
+    -------
+    matplotlib.collections.PathCollection
+    """
+    if width is None:
+        width = ax.get_window_extent().width
+    n_buckets = max(int(width), 3)
+
+    if not ax.get_autoscalex_on():
+        start, end = ax.get_xlim()
+        if pd.api.types.is_datetime64_any_dtype(df[x]):
+            start, end = (pd.Timestamp(mdates.num2date(v)) for v in (start, end))
+            start, end = start.tz_localize(None), end.tz_localize(None)
+        df = df[(df[x] >= start) & (df[x] <= end)]
+
+    data = downsample(df, x, y, n_buckets, by=by, method=method)
+
+    if isinstance(color, dict):
+        color = data[by].map(color).to_list()
+
+    return ax.scatter(data[x], data[y], color=color, **kwargs)
@@ -0,0 +1,186 @@
+import functools
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import Collection
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+from PIL import Image
+
+from rissa_plotter import CityData, HotelData, util
+from .city import CityPlotter
+from .hotels import HotelPlotter
+
+logo = util.get_logo()
+
+# Width of an A4 page in inches, and the default size of a report figure
+A4_WIDTH = 8.27
+FIGSIZE = (A4_WIDTH, 11.69 / 2.5)
+
+# Width in pixels of the logo embedded in a report, about 500 dpi on an A4 figure
+LOGO_WIDTH = 600
+
+
+class Page(NamedTuple):
+    """
+    One figure of a report.
+
+    Attributes
+    ----------
+    kind : str
+        'city' or 'hotel', the plotter that draws the figure.
+    method : str
+        Plot method of the plotter, e.g. 'plot_timeseries'.
+    kwargs : dict, optional
+        Arguments of the plot method. The figure size defaults to `FIGSIZE`.
+    """
+
+    kind: str
+    method: str
+    kwargs: dict = {}
+
+
+def season_pages(year: int, hotels: list = ("Hotel 3", "Hotel 4", "Hotel 5")):
+    """
+    The pages of the end-of-season report of `year`.
+    """
+    hotels = list(hotels)
+    return [
+        Page("city", "plot_timeseries", {"year": year}),
+        Page("city", "station_grid", {"year": year}),
+        Page("city", "compare_years"),
+        Page("hotel", "capacity_used", {"hotels": hotels, "year": year}),
+        Page("hotel", "chick_counts", {"hotels": hotels}),
+        Page("hotel", "compare_years", {"hotels": hotels}),
+        Page("city", "plot_submissions"),
+        Page("hotel", "plot_submissions"),
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _report_logo() -> np.ndarray:
+    # Downsampled once to 8-bit RGBA, the format in which the PDF embeds images
+    image = Image.fromarray((logo * 255).round().astype(np.uint8))
+    height = round(image.height * LOGO_WIDTH / image.width)
+    return np.asarray(image.resize((LOGO_WIDTH, height), Image.Resampling.LANCZOS))
+
+
+class _SharedImage(AxesImage):
+    """
+    Image that hands the same array to the renderer in every figure.
+
+    The PDF backend embeds every image array once per file, so all pages of a report
+    reference a single copy of the logo.
+    """
+
+    def __init__(self, ax, array: np.ndarray, extent: tuple):
+        super().__init__(ax, interpolation="none", extent=extent)
+        self.set_data(array)
+        self.shared = array
+
+    def make_image(self, renderer, magnification=1.0, unsampled=False):
+        image, left, bottom, transform = super().make_image(
+            renderer, magnification, unsampled
+        )
+        # The unsampled image is a per-figure copy of the shared array
+        if unsampled and image is not None:
+            image = self.shared
+        return image, left, bottom, transform
+
+
+def _share_logo(fig):
+    """
+    Replace the logos that the plotters draw on `fig` by the shared report logo.
+    """
+    for ax in fig.axes:
+        for image in list(ax.images):
+            if image.get_array().shape == logo.shape:
+                extent = image.get_extent()
+                image.remove()
+                ax.add_image(_SharedImage(ax, _report_logo(), extent))
+
+
+def _n_points(artist) -> int:
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())
+    vertices = sum(len(path.vertices) for path in artist.get_paths())
+    return max(len(artist.get_offsets()), vertices)
+
+
+def _rasterize_dense(fig, max_points: int):
+    """
+    Rasterize the lines and collections of `fig` with more than `max_points` points.
+    """
+    for artist in fig.findobj(lambda a: isinstance(a, (Line2D, Collection))):
+        if _n_points(artist) > max_points:
+            artist.set_rasterized(True)
+
+
+def save_report(
+    path: str | Path,
+    pages: list[Page],
+    city_data: Optional[CityData] = None,
+    hotel_data: Optional[HotelData] = None,
+    title: Optional[str] = None,
+    dpi: int = 200,
+    max_points: int = 5000,
+    transparent: bool = False,
+) -> Path:
+    """
+    Render plotter figures into one multi-page PDF.
+
+    Text stays vector text in the Chelsea font, which is subset and embedded once for
+    the whole file. The logo is embedded once and referenced from every page. Lines
+    and collections with more than `max_points` points are rasterized at `dpi`;
+    everything else stays vector graphics.
+
+    Parameters
+    ----------
+    path : str | Path
+        Output PDF file.
+    pages : list[Page]
+        Figures of the report, in order, e.g. `season_pages(2025)`.
+    city_data : CityData, optional
+        Data of the 'city' pages.
+    hotel_data : HotelData, optional
+        Data of the 'hotel' pages.
+    title : str, optional
+        Title in the metadata of the PDF.
+    dpi : int, optional
+        Resolution of rasterized artists (default is 200).
+    max_points : int, optional
+        Rasterize lines and collections with more points than this (default is 5000).
+    transparent : bool, optional
+        Transparent page backgrounds (default is False).
+
+    Returns
+    -------
+    Path
+        The output file.
+    """
+    path = Path(path)
+    plotters = {}
+    if city_data is not None:
+        plotters["city"] = CityPlotter(city_data, transparent=transparent)
+    if hotel_data is not None:
+        plotters["hotel"] = HotelPlotter(hotel_data, transparent=transparent)
+
+    missing = {page.kind for page in pages} - set(plotters)
+    if missing:
+        raise ValueError(f"No data given for the {', '.join(sorted(missing))} pages")
+
+    metadata = {"Title": title} if title is not None else {}
+    # TrueType fonts are embedded as subsets, once per file
+    with plt.rc_context({"pdf.fonttype": 42}), PdfPages(path, metadata=metadata) as pdf:
+        for page in pages:
+            fig = getattr(plotters[page.kind], page.method)(
+                **{"figsize": FIGSIZE, **page.kwargs}
+            )
+            _share_logo(fig)
+            _rasterize_dense(fig, max_points)
+            pdf.savefig(fig, dpi=dpi)
+            plt.close(fig)
+    return path
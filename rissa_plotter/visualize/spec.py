@@ -0,0 +1,385 @@
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+VEGA_LITE_SCHEMA = "https://vega.github.io/schema/vega-lite/v5.json"
+
+OUTPUTS = ["figure", "dict", "vega-lite"]
+
+# Opacity of shaded bands
+BAND_ALPHA = 0.2
+
+# matplotlib linestyles as Vega-Lite stroke dash patterns
+DASHES = {"-": [1, 0], "--": [6, 3], ":": [1, 3], "-.": [6, 3, 1, 3]}
+
+
+class Axis(NamedTuple):
+    """
+    Layout of one axis of a plot.
+
+    Attributes
+    ----------
+    label : str
+        Axis label.
+    type : str
+        'temporal', 'quantitative', 'ordinal' or 'nominal'.
+    limits : tuple, optional
+        Lower and upper limit of the axis.
+    format : str, optional
+        strftime-style format of the tick labels of a temporal axis, e.g. '%b-%d'.
+    """
+
+    label: str = ""
+    type: str = "quantitative"
+    limits: Optional[tuple] = None
+    format: Optional[str] = None
+
+
+class Layer(NamedTuple):
+    """
+    One series of a plot, drawn as lines, bars, texts or shaded bands.
+
+    Attributes
+    ----------
+    mark : str
+        'line', 'bar', 'text' or 'band'.
+    x, y : array-like
+        Positions of the series. For horizontal bars, `x` holds the values and `y` the categories.
+        For bands, `y` holds the lower bound.
+    color : str
+        Color of the series.
+    label : str, optional
+        Legend entry of the color.
+    linestyle : str, optional
+        matplotlib linestyle of a line (default is '-').
+    style : str, optional
+        Legend entry of the linestyle, e.g. 'Visible adults'.
+    marker : str, optional
+        matplotlib marker of the points of a line.
+    text : array-like, optional
+        Texts of a text series, one per position.
+    panel : str, optional
+        Name of the panel of a plot with several panels (e.g. one per hotel).
+    y2 : array-like, optional
+        Upper bound of a band.
+    """
+
+    mark: str
+    x: Any
+    y: Any
+    color: str
+    label: Optional[str] = None
+    linestyle: str = "-"
+    style: Optional[str] = None
+    marker: Optional[str] = None
+    text: Any = None
+    panel: Optional[str] = None
+    y2: Any = None
+
+
+def _to_json(values: Any) -> list:
+    """
+    Convert positions or values to a list of JSON types: ISO strings for dates, None for missing values.
+    """
+    values = pd.Index(np.atleast_1d(np.asarray(values)))
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return [None if pd.isna(v) else v.isoformat() for v in values]
+    return [
+        None if pd.isna(v) else v if isinstance(v, (str, int, float)) else str(v)
+        for v in values.tolist()
+    ]
+
+
+class PlotSpec:
+    """
+    Declarative description of a plot: its series, colors, title and axes.
+
+    The plot methods of `CityPlotter` and `HotelPlotter` prepare a PlotSpec and either
+    draw it with matplotlib or return it as a plain dict or a Vega-Lite specification, so
+    that a browser can render the same plot without rasterizing it on the server.
+
+    Parameters
+    ----------
+    title : str
+        Title of the plot.
+    layers : list[Layer]
+        Series of the plot, in drawing order.
+    x, y : Axis
+        Layout of the axes.
+    columns : int, optional
+        Number of panels per row. If None, all panels are in one row.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        layers: list[Layer],
+        x: Axis,
+        y: Axis,
+        columns: Optional[int] = None,
+    ):
+        self.title = title
+        self.layers = layers
+        self.x = x
+        self.y = y
+        self.columns = columns
+
+    @property
+    def panels(self) -> list[str]:
+        return list(dict.fromkeys(l.panel for l in self.layers if l.panel is not None))
+
+    def export(self, output: str) -> dict:
+        """
+        Export the spec as 'dict' (see `to_dict`) or 'vega-lite' (see `to_vega_lite`).
+        """
+        if output == "dict":
+            return self.to_dict()
+        if output == "vega-lite":
+            return self.to_vega_lite()
+        raise ValueError(f"Output should be one of {OUTPUTS}, got '{output}'")
+
+    def _axis_dict(self, axis: Axis) -> dict:
+        limits = None if axis.limits is None else _to_json(axis.limits)
+        return {**axis._asdict(), "limits": limits}
+
+    def to_dict(self) -> dict:
+        """
+        Convert the spec to a dict of JSON types.
+
+        Returns
+        -------
+        dict
+            The title, the axes and one entry per layer with its positions and style.
+        """
+        layers = []
+        for layer in self.layers:
+            entry = {**layer._asdict(), "x": _to_json(layer.x), "y": _to_json(layer.y)}
+            for field in ("text", "y2"):
+                if entry[field] is not None:
+                    entry[field] = _to_json(entry[field])
+            layers.append(entry)
+
+        return {
+            "title": self.title,
+            "x": self._axis_dict(self.x),
+            "y": self._axis_dict(self.y),
+            "columns": self.columns,
+            "layers": layers,
+        }
+
+    def _rows(self) -> list[dict]:
+        rows = []
+        for i, layer in enumerate(self.layers):
+            x, y = _to_json(layer.x), _to_json(layer.y)
+            text = _to_json(layer.text) if layer.text is not None else [None] * len(x)
+            y2 = _to_json(layer.y2) if layer.y2 is not None else [None] * len(x)
+            for xi, yi, ti, y2i in zip(x, y, text, y2):
+                rows.append(
+                    {
+                        "layer": i,
+                        "x": xi,
+                        "y": yi,
+                        "y2": y2i,
+                        "text": ti,
+                        "color": layer.color,
+                        "label": layer.label,
+                        "linestyle": layer.linestyle,
+                        "style": layer.style,
+                        "panel": layer.panel,
+                    }
+                )
+        return rows
+
+    def _encode_axis(self, field: str, axis: Axis, categories: list) -> dict:
+        encoding = {"field": field, "type": axis.type, "title": axis.label or None}
+        if axis.limits is not None:
+            encoding["scale"] = {"domain": _to_json(axis.limits)}
+        if axis.format is not None:
+            encoding["axis"] = {"format": axis.format}
+        if axis.type in ("nominal", "ordinal"):
+            # matplotlib draws categories on the y axis from the bottom up
+            encoding["sort"] = categories[::-1] if field == "y" else categories
+        return encoding
+
+    def _encode_color(self, layers: list[Layer]) -> dict:
+        if any(layer.label is None for layer in layers):
+            return {"field": "color", "type": "nominal", "scale": None, "legend": None}
+
+        colors = dict(zip((l.label for l in layers), (l.color for l in layers)))
+        return {
+            "field": "label",
+            "type": "nominal",
+            "scale": {"domain": list(colors), "range": list(colors.values())},
+            "title": None,
+        }
+
+    def _encode_dash(self, layers: list[Layer]) -> dict:
+        if any(layer.style is not None for layer in layers):
+            styles = dict(zip((l.style for l in layers), (l.linestyle for l in layers)))
+            field, legend = "style", {}
+        else:
+            styles = {l.linestyle: l.linestyle for l in layers}
+            field, legend = "linestyle", {"legend": None}
+
+        return {
+            "field": field,
+            "type": "nominal",
+            "scale": {
+                "domain": list(styles),
+                "range": [DASHES.get(style, DASHES["-"]) for style in styles.values()],
+            },
+            "title": None,
+            **legend,
+        }
+
+    def to_vega_lite(self) -> dict:
+        """
+        Convert the spec to a Vega-Lite specification with the data inlined.
+
+        Bands, lines, bars and texts each become one Vega-Lite layer. Bars at the same position
+        are stacked, and plots with several panels are faceted into columns (wrapped
+        after `columns` panels).
+
+        Returns
+        -------
+        dict
+            A Vega-Lite (v5) specification.
+        """
+        categories = {
+            field: list(
+                dict.fromkeys(
+                    value
+                    for layer in self.layers
+                    for value in _to_json(getattr(layer, field))
+                )
+            )
+            for field in ("x", "y")
+        }
+        position = {
+            "x": self._encode_axis("x", self.x, categories["x"]),
+            "y": self._encode_axis("y", self.y, categories["y"]),
+        }
+
+        layers = []
+        for mark in ("band", "bar", "line", "text"):
+            selection = [layer for layer in self.layers if layer.mark == mark]
+            if not selection:
+                continue
+
+            indices = [i for i, layer in enumerate(self.layers) if layer.mark == mark]
+            encoding = {**position, "color": self._encode_color(selection)}
+            spec = {"mark": {"type": mark, "clip": True}}
+
+            if mark == "band":
+                # bands are shaded in the color of their line, without legend entry
+                encoding["color"] = {
+                    "field": "color",
+                    "type": "nominal",
+                    "scale": None,
+                    "legend": None,
+                }
+                encoding["y2"] = {"field": "y2"}
+                encoding["detail"] = {"field": "layer", "type": "nominal"}
+                spec["mark"] = {"type": "area", "clip": True, "opacity": BAND_ALPHA}
+            elif mark == "line":
+                encoding["strokeDash"] = self._encode_dash(selection)
+                encoding["detail"] = {"field": "layer", "type": "nominal"}
+                spec["mark"]["point"] = any(l.marker is not None for l in selection)
+            elif mark == "text":
+                encoding["text"] = {"field": "text"}
+                # centered above bars, left-aligned like matplotlib elsewhere
+                categorical = self.x.type in ("nominal", "ordinal")
+                align = "center" if categorical else "left"
+                spec["mark"].update(align=align, baseline="bottom")
+
+            spec["transform"] = [{"filter": {"field": "layer", "oneOf": indices}}]
+            spec["encoding"] = encoding
+            layers.append(spec)
+
+        layered = {"layer": layers}
+        if any(layer.mark == "band" for layer in self.layers):
+            # keep the legend of the lines, which the unscaled band colors would hide
+            layered["resolve"] = {"scale": {"color": "independent"}}
+
+        chart = {
+            "$schema": VEGA_LITE_SCHEMA,
+            "title": self.title,
+            "data": {"values": self._rows()},
+        }
+        if self.panels and self.columns is not None:
+            chart["facet"] = {"field": "panel", "sort": self.panels, "title": None}
+            chart["columns"] = self.columns
+            chart["spec"] = layered
+        elif self.panels:
+            chart["facet"] = {
+                "column": {"field": "panel", "sort": self.panels, "title": None}
+            }
+            chart["spec"] = layered
+        else:
+            chart.update(layered)
+        return chart
+
+
+def band_quantiles(level: float) -> tuple[float, float]:
+    """
+    Lower and upper quantile of a central confidence band, e.g. (0.05, 0.95) for 0.9.
+    """
+    return round((1 - level) / 2, 6), round((1 + level) / 2, 6)
+
+
+def band_layer(bands, color: str, x: Any = None) -> Layer:
+    """
+    Create a band layer between the outer quantiles of bootstrap bands.
+
+    Parameters
+    ----------
+    bands : xr.DataArray
+        Bands with dimensions (timestamp, quantile), see
+        `KittiwalkersData.bootstrap_total`.
+    color : str
+        Color of the band, usually that of its line.
+    x : array-like, optional
+        Positions of the band. Default are the timestamps of `bands`.
+    """
+    x = bands["timestamp"].values if x is None else x
+    lower, upper = bands.isel(quantile=0).values, bands.isel(quantile=-1).values
+    return Layer("band", x, lower, color=color, y2=upper)
+
+
+def draw_layers(ax, layers: list[Layer]):
+    """
+    Draw the band, line and text layers of a spec on matplotlib axes.
+    """
+    for layer in layers:
+        if layer.mark == "band":
+            ax.fill_between(
+                layer.x,
+                layer.y,
+                layer.y2,
+                color=layer.color,
+                alpha=BAND_ALPHA,
+                linewidth=0,
+            )
+        elif layer.mark == "line":
+            ax.plot(
+                layer.x,
+                layer.y,
+                color=layer.color,
+                label=layer.label,
+                linestyle=layer.linestyle,
+                marker=layer.marker,
+            )
+        elif layer.mark == "text":
+            for x, y, text in zip(layer.x, layer.y, layer.text):
+                ax.text(x, y, s=text, c=layer.color)
+
+
+def draw_barh(ax, spec: PlotSpec):
+    """
+    Draw the single horizontal bar layer of a spec on matplotlib axes.
+    """
+    (layer,) = spec.layers
+    counts = pd.Series(layer.x, index=pd.Index(layer.y, name=spec.y.label))
+    counts.plot.barh(ax=ax, color=layer.color)
+    ax.set_xlabel(spec.x.label)
@@ -0,0 +1,52 @@
+import pytest
+
+
+def city_doc(i: int, year: int = 2025) -> dict:
+    return {
+        "timestamp": f"{year}-06-{1 + i % 28:02d}T10:{i % 60:02d}:00Z",
+        "station": f"{1 + i % 6:02d}",
+        "adultCount": i % 20,
+        "aonCount": str(i % 7),
+        "groupSize": 2,
+    }
+
+
+def hotel_t1_doc(i: int, year: int = 2025) -> dict:
+    states = ["1 chick visible", "Apparently occupied nest", "empty"]
+    return {
+        "timestamp": f"{year}-07-{1 + i % 28:02d} 11:{i % 60:02d}:00",
+        "hotel": ["Hotel 3 (green)", "Hotel 5.1A"][i % 2],
+        "ledgeStatuses": str({f"L{k}": states[(i + k) % 3] for k in range(4)}),
+        "groupSize": "1",
+        "userId": f"u{i % 3}",
+    }
+
+
+def hotel_t2_doc(i: int) -> dict:
+    return {
+        "timestamp": f"2025-07-{1 + i % 28:02d}T12:{i % 60:02d}:00Z",
+        "hotel": ["Hotel 6L", "Hotel 8"][i % 2],
+        "adultCount": i % 9,
+        "aonCount": i % 5,
+        "chickCount": i % 4,
+    }
+
+
+@pytest.fixture
+def documents() -> dict[str, dict[str, dict]]:
+    """
+    Documents per submission collection, keyed by document id.
+    """
+    return {
+        "submissionsKittiwakesCity": {f"c{i}": city_doc(i) for i in range(60)},
+        "submissionsKittiwakesCity2324": {
+            f"l{i}": city_doc(i, 2024) for i in range(40)
+        },
+        "submissionsKittiwakesHotels": {f"h{i}": hotel_t1_doc(i) for i in range(30)},
+        "submissionsKittiwakesHotels2324": {
+            f"o{i}": hotel_t1_doc(i, 2024) for i in range(20)
+        },
+        "submissionsKittiwakesGeneralHotels": {
+            f"g{i}": hotel_t2_doc(i) for i in range(20)
+        },
+    }
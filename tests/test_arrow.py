@@ -0,0 +1,58 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rissa_plotter import CityData
+from rissa_plotter.readers import open_arrow_table, save_arrow_table
+
+
+def city_data(n: int) -> CityData:
+    rng = np.random.default_rng(n)
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2025-05-01")
+            + pd.to_timedelta(np.sort(rng.integers(0, 90 * 86400, n)), "s"),
+            "station": rng.choice(["01", "02", "05a"], n),
+            "adultCount": rng.integers(0, 20, n),
+            "aonCount": rng.integers(0, 10, n),
+        }
+    )
+    return CityData.from_dataframe(df)
+
+
+def test_round_trip(tmp_path):
+    data = city_data(100)
+    save_arrow_table(data, tmp_path)
+    opened = open_arrow_table(tmp_path)
+    assert isinstance(opened, CityData)
+    pd.testing.assert_frame_equal(
+        opened.submissions.astype(data.submissions.dtypes),
+        data.submissions.reset_index(drop=True),
+    )
+
+
+def test_old_versions_removed(tmp_path):
+    for n in range(5):
+        save_arrow_table(city_data(10 + n), tmp_path)
+    versions = [path for path in tmp_path.iterdir() if path.is_dir()]
+    assert len(versions) == 2
+    assert len(open_arrow_table(tmp_path).submissions) == 14
+
+
+def test_tables_of_one_version(tmp_path):
+    # Every version has its own size, so mixing the tables of two is detected
+    save_arrow_table(city_data(10), tmp_path)
+    stop = threading.Event()
+
+    def write():
+        for n in range(11, 40):
+            save_arrow_table(city_data(n), tmp_path)
+        stop.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not stop.is_set():
+        opened = open_arrow_table(tmp_path)
+        assert len(opened.data) == len(opened.submissions)
+    writer.join()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rissa_plotter.util import SubmissionIndex, drop_duplicate_submissions
+
+
+def submissions(minutes, counts=2, station="01"):
+    timestamps = pd.Timestamp("2024-06-01 10:00") + pd.to_timedelta(minutes, "min")
+    return pd.DataFrame(
+        {"timestamp": timestamps, "station": station, "adultCount": counts}
+    )
+
+
+def test_near_duplicates_do_not_chain():
+    df = submissions([0, 6, 12, 18])
+    kept, dropped = drop_duplicate_submissions(df, "station", ["adultCount"])
+    assert kept["timestamp"].tolist() == list(df["timestamp"].iloc[[0, 2]])
+    assert dropped["timestamp"].tolist() == list(df["timestamp"].iloc[[1, 3]])
+
+
+def test_dropped_report():
+    df = pd.concat(
+        [
+            submissions([0, 0, 3, 30]),
+            submissions([0], counts=5),
+            submissions([1], station="02"),
+        ],
+        ignore_index=True,
+    )
+    kept, dropped = drop_duplicate_submissions(df, "station", ["adultCount"])
+    assert kept.index.tolist() == [0, 3, 4, 5]
+    assert dropped.index.tolist() == [1, 2]
+    assert dropped["duplicate"].tolist() == ["exact", "near"]
+    pd.testing.assert_frame_equal(dropped.drop(columns="duplicate"), df.loc[[1, 2]])
+
+
+def test_index_across_batches():
+    index = SubmissionIndex("station", ["adultCount"])
+    index.add(submissions([0]))
+    kept, dropped = index.add(submissions([0, 4, 30]))
+    assert dropped["duplicate"].tolist() == ["exact", "near"]
+    assert len(kept) == 1 and len(index) == 2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_equals_incremental(seed):
+    rng = np.random.default_rng(seed)
+    df = submissions(
+        np.sort(rng.integers(0, 120, size=200)),
+        counts=rng.integers(0, 3, size=200),
+        station=rng.choice(["01", "02", "05a"], size=200),
+    )
+
+    kept, dropped = drop_duplicate_submissions(df, "station", ["adultCount"])
+
+    index = SubmissionIndex("station", ["adultCount"])
+    incremental = [index.add(df.iloc[[row]]) for row in range(len(df))]
+    pd.testing.assert_frame_equal(kept, pd.concat([rows for rows, _ in incremental]))
+    pd.testing.assert_frame_equal(dropped, pd.concat([rows for _, rows in incremental]))
+
+
+def test_batch_in_timestamp_order():
+    df = submissions([12, 6, 18, 0])
+    kept, _ = drop_duplicate_submissions(df, "station", ["adultCount"])
+    assert kept.index.tolist() == [0, 3]
@@ -0,0 +1,159 @@
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from conftest import city_doc, hotel_t1_doc
+from rissa_plotter.readers import AsyncFireBase
+from rissa_plotter.readers.tables import (
+    CITY_TABLES,
+    HOTEL_TABLES,
+    _combine_city_tables,
+    _combine_hotel_tables,
+    open_city_table_async,
+    open_hotel_table_async,
+)
+
+
+class FakeAsyncQuery:
+    """
+    Query with the cursor methods of Firestore's AsyncQuery, over documents in memory.
+    """
+
+    def __init__(self, collection, order=None, limit=None, after=None):
+        self.collection = collection
+        self.order = order
+        self.count = limit
+        self.after = after
+
+    def order_by(self, field: str) -> "FakeAsyncQuery":
+        return FakeAsyncQuery(self.collection, field, self.count, self.after)
+
+    def limit(self, count: int) -> "FakeAsyncQuery":
+        return FakeAsyncQuery(self.collection, self.order, count, self.after)
+
+    def start_after(self, document) -> "FakeAsyncQuery":
+        return FakeAsyncQuery(self.collection, self.order, self.count, document.id)
+
+    async def get(self) -> list:
+        assert self.order == "__name__"
+        self.collection.requests += 1
+        self.collection.client.log.append(self.collection.name)
+        # yield to the event loop, so that concurrent reads interleave
+        await asyncio.sleep(0)
+        keys = sorted(key for key in self.collection.docs if key > (self.after or ""))
+        return [
+            SimpleNamespace(
+                id=key, to_dict=lambda key=key: dict(self.collection.docs[key])
+            )
+            for key in keys[: self.count]
+        ]
+
+
+class FakeAsyncCollection(FakeAsyncQuery):
+    def __init__(self, client: "FakeAsyncClient", name: str, docs: dict):
+        super().__init__(self)
+        self.client = client
+        self.name = name
+        self.docs = dict(docs)
+        self.requests = 0
+
+
+class FakeAsyncClient:
+    def __init__(self, documents: dict[str, dict]):
+        self.collections = {
+            name: FakeAsyncCollection(self, name, docs)
+            for name, docs in documents.items()
+        }
+        # Collection of every request, in the order they were made
+        self.log = []
+
+    def collection(self, name: str) -> FakeAsyncCollection:
+        return self.collections[name]
+
+
+def full_load(documents: dict[str, dict]) -> dict[str, pd.DataFrame]:
+    # documents in the order of their id, as read by AsyncFireBase
+    return {
+        name: pd.DataFrame([docs[key] for key in sorted(docs)])
+        for name, docs in documents.items()
+    }
+
+
+def assert_data_equal(data, expected):
+    for name in ["data", "submissions"]:
+        pd.testing.assert_frame_equal(getattr(data, name), getattr(expected, name))
+
+
+@pytest.mark.parametrize("page_size", [7, 10, 500])
+def test_read_table_pages(documents, page_size):
+    # 60 and 40 documents: a last page that is exactly page_size long for 10
+    client = FakeAsyncClient(documents)
+    fb = AsyncFireBase(None, page_size=page_size, client=client)
+    tables = asyncio.run(fb.read_tables(*CITY_TABLES))
+
+    expected = full_load(documents)
+    for table in CITY_TABLES:
+        pd.testing.assert_frame_equal(tables[table], expected[table])
+        n = len(documents[table])
+        # one more request when the last page is full, which returns nothing
+        assert client.collection(table).requests == n // page_size + 1
+
+    # the collections are read concurrently
+    assert set(client.log[:2]) == set(CITY_TABLES)
+
+
+def test_iter_table_pages(documents):
+    fb = AsyncFireBase(None, page_size=25, client=FakeAsyncClient(documents))
+
+    async def pages():
+        return [page async for page in fb.iter_table("submissionsKittiwakesCity")]
+
+    assert [len(page) for page in asyncio.run(pages())] == [25, 25, 10]
+
+
+def test_read_empty_table(documents):
+    documents["submissionsKittiwakesCity2324"] = {}
+    fb = AsyncFireBase(None, client=FakeAsyncClient(documents))
+    with pytest.raises(ValueError, match="No data found"):
+        asyncio.run(fb.read_tables(*CITY_TABLES))
+
+
+def test_client_is_not_closed(documents):
+    client = FakeAsyncClient(documents)
+
+    async def read():
+        async with AsyncFireBase(None, client=client) as fb:
+            await fb.read_table("submissionsKittiwakesCity")
+        return fb
+
+    fb = asyncio.run(read())
+    assert fb.connection is client
+
+
+def test_open_tables_async(documents):
+    # more than one page of the default size; the hotel pages are exactly full
+    documents["submissionsKittiwakesCity"] = {
+        f"c{i:04d}": city_doc(i) for i in range(1234)
+    }
+    documents["submissionsKittiwakesHotels"] = {
+        f"h{i:04d}": hotel_t1_doc(i) for i in range(1000)
+    }
+    client = FakeAsyncClient(documents)
+    tables = full_load(documents)
+
+    city = asyncio.run(open_city_table_async(None, client=client))
+    expected = _combine_city_tables(
+        {table: tables[table] for table in CITY_TABLES}, save=False, deduplicate=True
+    )
+    assert_data_equal(city, expected)
+
+    hotel = asyncio.run(open_hotel_table_async(None, client=client))
+    expected = _combine_hotel_tables(
+        {table: tables[table] for table in HOTEL_TABLES}, save=False, deduplicate=True
+    )
+    assert_data_equal(hotel, expected)
+
+    assert client.collection("submissionsKittiwakesCity").requests == 3
+    assert client.collection("submissionsKittiwakesHotels").requests == 3
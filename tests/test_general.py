@@ -0,0 +1,34 @@
+import pandas as pd
+
+from rissa_plotter.util import parse_timestamps
+
+
+def test_parse_timestamps_formats():
+    values = pd.Series(
+        [
+            "2024-06-05 10:00:00",
+            "2024-06-13T10:00:00+02:00",
+            "2024-06-14T08:30:00Z",
+            None,
+        ]
+    )
+    expected = pd.Series(
+        pd.to_datetime(
+            [
+                "2024-06-05 10:00",
+                "2024-06-13 08:00",
+                "2024-06-14 08:30",
+                None,
+            ]
+        ).as_unit("ns")
+    )
+    pd.testing.assert_series_equal(parse_timestamps(values), expected)
+
+
+def test_parse_timestamps_mixed_day_month_order():
+    # the first value is guessed month first, which the second does not match
+    values = pd.Series(["05/06/2024 10:00", "13/06/2024 10:00"])
+    expected = pd.Series(
+        pd.to_datetime(["2024-05-06 10:00", "2024-06-13 10:00"]).as_unit("ns")
+    )
+    pd.testing.assert_series_equal(parse_timestamps(values), expected)
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rissa_plotter.util import kernels, max_nestcount
+
+BACKENDS = [
+    "numpy",
+    pytest.param(
+        "numba",
+        marks=pytest.mark.skipif(
+            "numba" not in kernels.BACKENDS, reason="numba is not installed"
+        ),
+    ),
+]
+
+
+@pytest.fixture(params=BACKENDS, autouse=True)
+def backend(request):
+    previous = kernels.BACKEND
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+# The implementations the kernels replaced
+
+
+def nearest_bin_reference(values, bins):
+    return np.abs(values[:, None] - bins[None, :]).argmin(axis=1)
+
+
+def grouped_quantile_reference(codes, values, n_groups, q):
+    df = pd.DataFrame({"code": codes, "value": values})
+    df = df[df["code"] >= 0]
+    quantiles = df.groupby("code")["value"].quantile(q, interpolation="linear")
+    return quantiles.reindex(range(n_groups)).to_numpy()
+
+
+def grouped_argmax_reference(codes, primary, secondary, n_groups):
+    df = pd.DataFrame({"nestCount": primary, "three_chicks": secondary})
+    result = np.full(n_groups, -1)
+    for group, selection in df.groupby(codes):
+        result[group] = max_nestcount(selection, ["nestCount"]).name
+    return result
+
+
+def sorted_by_group(codes, values):
+    order = np.lexsort((values, codes))
+    return codes[order], values[order]
+
+
+def test_nearest_bin_random(rng):
+    bins = np.sort(rng.choice(10**6, size=50, replace=False))
+    values = rng.integers(-1000, 10**6 + 1000, size=2000)
+    np.testing.assert_array_equal(
+        kernels.nearest_bin(values, bins), nearest_bin_reference(values, bins)
+    )
+
+
+def test_nearest_bin_midpoints():
+    bins = np.array([0, 10, 20, 40])
+    # ties at the midpoints between bins go to the earlier bin
+    values = np.array([5, 15, 30, -5, 45, 0, 40])
+    expected = nearest_bin_reference(values, bins)
+    np.testing.assert_array_equal(kernels.nearest_bin(values, bins), expected)
+    np.testing.assert_array_equal(expected, [0, 1, 2, 0, 3, 0, 3])
+
+
+def test_nearest_bin_single_bin():
+    values = np.array([-5, 0, 5])
+    np.testing.assert_array_equal(kernels.nearest_bin(values, np.array([3])), 0)
+
+
+@pytest.mark.parametrize("q", [0.0, 0.25, 0.5, 0.75, 1.0])
+def test_grouped_quantile_random(rng, q):
+    codes = rng.integers(-1, 40, size=3000)
+    values = rng.integers(0, 20, size=3000).astype(float)
+    values[rng.random(3000) < 0.1] = np.nan
+    np.testing.assert_allclose(
+        kernels.grouped_quantile(codes, values, 45, q),
+        grouped_quantile_reference(codes, values, 45, q),
+    )
+
+
+@pytest.mark.parametrize("q", [0.0, 0.75, 1.0])
+def test_grouped_quantile_edge_cases(q):
+    # group 1 is empty, group 2 only has missing values, group 3 has one value
+    codes = np.array([0, 0, 0, 2, 2, 3, -1])
+    values = np.array([3.0, 1.0, 2.0, np.nan, np.nan, 7.0, 100.0])
+    result = kernels.grouped_quantile(codes, values, 5, q)
+    np.testing.assert_allclose(result, grouped_quantile_reference(codes, values, 5, q))
+    assert np.isnan(result[[1, 2, 4]]).all()
+    assert result[3] == 7.0
+
+
+def test_grouped_quantile_no_values():
+    result = kernels.grouped_quantile(np.array([], dtype=int), np.array([]), 3, 0.5)
+    assert result.shape == (3,) and np.isnan(result).all()
+
+
+@pytest.mark.parametrize("q", [0.0, 0.25, 0.5, 0.75, 1.0])
+def test_sorted_quantile_random(rng, q):
+    codes = rng.integers(0, 40, size=3000)
+    values = rng.integers(0, 20, size=3000).astype(float)
+    codes, values = sorted_by_group(codes, values)
+    expected = grouped_quantile_reference(codes, values, 45, q)
+    np.testing.assert_allclose(kernels.sorted_quantile(codes, values, 45, q), expected)
+
+    # groups may be interleaved as long as every group is in ascending order
+    interleaved = rng.permutation(codes)
+    values_interleaved = np.empty_like(values)
+    values_interleaved[np.argsort(interleaved, kind="stable")] = values
+    np.testing.assert_allclose(
+        kernels.sorted_quantile(interleaved, values_interleaved, 45, q), expected
+    )
+
+
+@pytest.mark.parametrize("q", [0.0, 0.5, 1.0])
+def test_sorted_quantile_edge_cases(q):
+    # group 1 is empty, group 2 has one value
+    codes = np.array([0, 2, 0, 0, 3, 3])
+    values = np.array([1.0, 5.0, 2.0, 4.0, 1.0, 1.0])
+    result = kernels.sorted_quantile(codes, values, 5, q)
+    np.testing.assert_allclose(result, grouped_quantile_reference(codes, values, 5, q))
+    assert np.isnan(result[[1, 4]]).all()
+
+
+def test_grouped_argmax_random(rng):
+    codes = rng.integers(0, 30, size=1000)
+    primary = rng.integers(0, 5, size=1000).astype(float)
+    secondary = rng.integers(0, 3, size=1000).astype(float)
+    np.testing.assert_array_equal(
+        kernels.grouped_argmax(codes, primary, secondary, 35),
+        grouped_argmax_reference(codes, primary, secondary, 35),
+    )
+
+
+def test_grouped_argmax_edge_cases():
+    # group 0: tie on primary, broken by secondary; group 1: full tie, first row;
+    # group 2: missing primary values are smallest; group 3 is empty
+    codes = np.array([0, 0, 0, 1, 1, 2, 2, 4])
+    primary = np.array([3.0, 3.0, 1.0, 2.0, 2.0, np.nan, 0.0, 1.0])
+    secondary = np.array([0.0, 1.0, 5.0, 1.0, 1.0, 9.0, 0.0, 2.0])
+    result = kernels.grouped_argmax(codes, primary, secondary, 5)
+    np.testing.assert_array_equal(result, [1, 3, 6, -1, 7])
+    np.testing.assert_array_equal(
+        result, grouped_argmax_reference(codes, primary, secondary, 5)
+    )
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from conftest import city_doc, hotel_t2_doc
+from rissa_plotter.readers import LiveTables
+from rissa_plotter.readers.tables import (
+    CITY_TABLES,
+    HOTEL_TABLES,
+    _combine_city_tables,
+    _combine_hotel_tables,
+)
+
+
+class FakeCollection:
+    """
+    Collection with Firestore's `on_snapshot`: all documents first, then the changes.
+    """
+
+    def __init__(self, docs: dict):
+        self.docs = dict(docs)
+        self.listeners = []
+
+    def on_snapshot(self, callback):
+        self.listeners.append(callback)
+        changes = [self._change("ADDED", key, data) for key, data in self.docs.items()]
+        callback(list(self.docs.values()), changes, None)
+        return SimpleNamespace(unsubscribe=lambda: self.listeners.remove(callback))
+
+    @staticmethod
+    def _change(kind, key, data):
+        document = SimpleNamespace(id=key, to_dict=lambda: dict(data or {}))
+        return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+    def set(self, key: str, data: dict):
+        kind = "MODIFIED" if key in self.docs else "ADDED"
+        self.docs[key] = data
+        self._notify(kind, key, data)
+
+    def delete(self, key: str):
+        self._notify("REMOVED", key, self.docs.pop(key))
+
+    def _notify(self, kind, key, data):
+        for callback in self.listeners:
+            callback(list(self.docs.values()), [self._change(kind, key, data)], None)
+
+
+class FakeClient:
+    def __init__(self, collections: dict[str, FakeCollection]):
+        self.collections = collections
+
+    def collection(self, name: str) -> FakeCollection:
+        return self.collections[name]
+
+
+@pytest.fixture
+def collections(documents):
+    return {name: FakeCollection(docs) for name, docs in documents.items()}
+
+
+def assert_matches_full_load(city, hotel, collections):
+    """
+    Compare with loading all documents of the collections at once.
+    """
+    tables = {
+        name: pd.DataFrame(list(collection.docs.values()))
+        for name, collection in collections.items()
+    }
+    expected_city = _combine_city_tables(
+        {table: tables[table] for table in CITY_TABLES}, save=False, deduplicate=True
+    )
+    expected_hotel = _combine_hotel_tables(
+        {table: tables[table] for table in HOTEL_TABLES}, save=False, deduplicate=True
+    )
+    for data, expected in [(city, expected_city), (hotel, expected_hotel)]:
+        for name in ["data", "submissions"]:
+            pd.testing.assert_frame_equal(
+                getattr(data, name).reset_index(drop=True),
+                getattr(expected, name).reset_index(drop=True),
+            )
+
+
+def test_first_snapshot(collections):
+    with LiveTables(client=FakeClient(collections), interval=0.05) as live:
+        city, hotel = live.wait(0, timeout=10)
+    assert_matches_full_load(city, hotel, collections)
+
+
+def test_changes_are_published_in_one_batch(collections):
+    published = []
+    live = LiveTables(
+        client=FakeClient(collections),
+        publish=lambda city, hotel: published.append((city, hotel)),
+        interval=0.5,
+    )
+    with live:
+        live.wait(0, timeout=10)
+        city_collection = collections["submissionsKittiwakesCity"]
+        city_collection.set("new", city_doc(99))
+        city_collection.set("c5", dict(city_collection.docs["c5"], adultCount=55))
+        city_collection.delete("c6")
+        collections["submissionsKittiwakesGeneralHotels"].set("new", hotel_t2_doc(99))
+        city, hotel = live.wait(1, timeout=10)
+
+    assert live.version == 1
+    assert len(published) == 2
+    assert published[-1] == (city, hotel)
+    assert_matches_full_load(city, hotel, collections)
+
+
+def test_empty_first_snapshot(collections):
+    # the tables of empty collections are merged as empty DataFrames
+    collections["submissionsKittiwakesCity2324"] = FakeCollection({})
+    collections["submissionsKittiwakesGeneralHotels"] = FakeCollection({})
+    with LiveTables(client=FakeClient(collections), interval=0.5) as live:
+        city, hotel = live.wait(0, timeout=10)
+        assert list(city.years) == [2025]
+        assert len(hotel.data) > 0
+
+        collections["submissionsKittiwakesCity2324"].set("l0", city_doc(0, 2024))
+        collections["submissionsKittiwakesGeneralHotels"].set("g0", hotel_t2_doc(0))
+        city, hotel = live.wait(1, timeout=10)
+
+    assert list(city.years) == [2024, 2025]
+    assert_matches_full_load(city, hotel, collections)